@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Time the CLI commands and core functions against a synthetic skills tree.
+
+Each benchmark runs --warmup + --repeat times and records every run. The
+fastest run is what gets compared: background load only ever adds time, so the
+minimum is the least noisy estimate. Results go to JSON (--out). With a stored
+baseline (--baseline, written by --update-baseline) the run fails when a
+benchmark is both --threshold slower (relative) and --min-delta-ms slower
+(absolute) than the baseline, so noise on millisecond-scale benchmarks does not
+trip the gate.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+TEMPLATES_DIR = BENCH_DIR.parent / "templates"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from gen_skill_tree import MANIFEST_NAME, TreeParams, add_tree_args, generate_tree, params_from_args  # noqa: E402
+
+from _shared.frontmatter import extract_frontmatter  # noqa: E402
+from _shared.imports import imported_top_levels  # noqa: E402
+from _shared.templating import compile_template, render  # noqa: E402
+from security_scan import get_engine, scan_file  # noqa: E402
+
+DEFAULT_OUT = BENCH_DIR / "results" / "latest.json"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+RESULTS_SCHEMA = 1
+
+@dataclass
+class Bench:
+    name: str
+    kind: str  # "command" | "function"
+    run: Callable[[], None]
+
+def time_runs(fn: Callable[[], None], repeat: int, warmup: int) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return runs
+
+def command(args: List[str]) -> Callable[[], None]:
+    def run() -> None:
+        p = subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if p.returncode != 0:
+            raise RuntimeError(f"{Path(args[0]).name} exited {p.returncode}: {p.stderr.strip()[-300:]}")
+    return run
+
+def tree_files(tree: Path) -> List[Path]:
+    return sorted(p for p in tree.rglob("*") if p.is_file() and p.name != MANIFEST_NAME and not p.name.startswith(".skill-forge"))
+
+def largest_skill(tree: Path) -> Path:
+    skills = [p for p in sorted(tree.iterdir()) if p.is_dir()]
+    return max(skills, key=lambda s: sum(f.stat().st_size for f in s.rglob("*") if f.is_file()))
+
+def build_benches(tree: Path, scratch: Path, jobs: int) -> List[Bench]:
+    skill = largest_skill(tree)
+    script = lambda name: str(SCRIPTS_DIR / name)
+    benches = [
+        Bench("cmd:validate_skill", "command", command([script("validate_skill.py"), str(skill), "--no-cache"])),
+        Bench("cmd:security_scan", "command", command([script("security_scan.py"), str(skill), "--no-cache"])),
+        Bench("cmd:package_skill", "command", command([script("package_skill.py"), str(skill), "--out", str(scratch / "bench.zip")])),
+        Bench("cmd:audit_skills", "command", command([script("audit_skills.py"), "--skills-dir", str(tree), "--no-cache", "--jobs", str(jobs)])),
+        # Warm-up runs fill the result cache, so the timed runs measure cache hits.
+        Bench("cmd:audit_skills_cached", "command", command([script("audit_skills.py"), "--skills-dir", str(tree), "--jobs", str(jobs)])),
+    ]
+
+    files = tree_files(tree)
+    skill_mds = [p.read_text(encoding="utf-8") for p in files if p.name == "SKILL.md"]
+    py_files = [p for p in files if p.suffix == ".py"]
+    templates = [p.read_text(encoding="utf-8") for p in sorted(TEMPLATES_DIR.rglob("*.tpl"))]
+    variables = {name: f"value-{name.lower()}" for text in templates for name in compile_template(text).names}
+    engine = get_engine()
+
+    def frontmatter() -> None:
+        for text in skill_mds:
+            extract_frontmatter(text)
+
+    def scan() -> None:
+        for p in files:
+            scan_file(p, engine)
+
+    def templating() -> None:
+        compile_template.cache_clear()  # measure compile + render, as a fresh forge run does
+        for text in templates:
+            render(text, variables)
+
+    def imports() -> None:
+        for p in py_files:
+            imported_top_levels(p)
+
+    benches += [
+        Bench("fn:extract_frontmatter", "function", frontmatter),
+        Bench("fn:scan_file", "function", scan),
+        Bench("fn:render", "function", templating),
+        Bench("fn:imported_top_levels", "function", imports),
+    ]
+    return benches
+
+def summarize(runs: List[float]) -> Dict[str, Any]:
+    return {
+        "median_s": statistics.median(runs),
+        "min_s": min(runs),
+        "max_s": max(runs),
+        "runs_s": runs,
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_s: float) -> List[Dict[str, Any]]:
+    rows = []
+    base_b = baseline.get("benchmarks", {})
+    for name, cur in results["benchmarks"].items():
+        base = base_b.get(name)
+        if base is None:
+            rows.append({"name": name, "current_s": cur["min_s"], "baseline_s": None, "change": None, "status": "new"})
+            continue
+        b, c = base["min_s"], cur["min_s"]
+        change = (c - b) / b if b > 0 else 0.0
+        if change > threshold and c - b > min_delta_s:
+            status = "regressed"
+        elif change < -threshold and b - c > min_delta_s:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "current_s": c, "baseline_s": b, "change": change, "status": status})
+    for name in sorted(base_b.keys() - results["benchmarks"].keys()):
+        rows.append({"name": name, "current_s": None, "baseline_s": base_b[name]["min_s"], "change": None, "status": "missing"})
+    return rows
+
+def _ms(seconds: Optional[float]) -> str:
+    return "—" if seconds is None else f"{seconds * 1000:.1f}"
+
+def print_table(results: Dict[str, Any], rows: Optional[List[Dict[str, Any]]]) -> None:
+    if rows is None:
+        for name, r in results["benchmarks"].items():
+            print(f"  {name:<28} {_ms(r['min_s']):>10} ms  (median {_ms(r['median_s'])})")
+        return
+    print(f"  {'benchmark':<28} {'best ms':>10} {'baseline':>10} {'change':>8}")
+    for row in rows:
+        change = "" if row["change"] is None else f"{row['change'] * 100:+.1f}%"
+        flag = {"regressed": "  ❌", "improved": "  ✅", "new": "  (new)", "missing": "  (missing)"}.get(row["status"], "")
+        print(f"  {row['name']:<28} {_ms(row['current_s']):>10} {_ms(row['baseline_s']):>10} {change:>8}{flag}")
+
+def prepare_tree(path: Optional[str], params: TreeParams, scratch: Path) -> Path:
+    """Generate the tree, reusing --tree when it was built with the same params."""
+    tree = Path(path).expanduser().resolve() if path else scratch / "skills"
+    manifest = tree / MANIFEST_NAME
+    if tree.exists():
+        try:
+            if json.loads(manifest.read_text(encoding="utf-8"))["params"] == asdict(params):
+                return tree
+        except (OSError, ValueError, KeyError):
+            raise SystemExit(f"{tree} exists but is not a generated benchmark tree; pick another --tree")
+    generate_tree(tree, params, force=True)
+    return tree
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark skill-forge commands and core functions.")
+    ap.add_argument("--tree", help="Keep the synthetic tree here and reuse it across runs (default: a temp dir)")
+    ap.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default: 5)")
+    ap.add_argument("--warmup", type=int, default=1, help="Untimed runs before timing (default: 1)")
+    ap.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="--jobs passed to audit_skills.py (default: CPU count)")
+    ap.add_argument("--only", action="append", default=[], metavar="SUBSTR", help="Run only benchmarks whose name contains SUBSTR (repeatable)")
+    ap.add_argument("--out", default=str(DEFAULT_OUT), help=f"Results JSON (default: {DEFAULT_OUT.relative_to(BENCH_DIR.parent)})")
+    ap.add_argument("--baseline", default=str(DEFAULT_BASELINE), help=f"Baseline JSON to compare against (default: {DEFAULT_BASELINE.relative_to(BENCH_DIR.parent)})")
+    ap.add_argument("--update-baseline", action="store_true", help="Write this run's results as the new baseline")
+    ap.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown that counts as a regression (default: 0.25)")
+    ap.add_argument("--min-delta-ms", type=float, default=10.0, help="Ignore slowdowns smaller than this, in ms (default: 10)")
+    add_tree_args(ap)
+    args = ap.parse_args()
+    if args.repeat < 1 or args.warmup < 0:
+        raise SystemExit("--repeat must be >= 1 and --warmup >= 0")
+
+    params = params_from_args(args)
+    scratch = Path(tempfile.mkdtemp(prefix="skill-forge-bench-"))
+    try:
+        tree = prepare_tree(args.tree, params, scratch)
+        benches = [b for b in build_benches(tree, scratch, args.jobs) if not args.only or any(s in b.name for s in args.only)]
+        results: Dict[str, Any] = {
+            "schema": RESULTS_SCHEMA,
+            "meta": {
+                "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "jobs": args.jobs,
+                "repeat": args.repeat,
+                "warmup": args.warmup,
+                "tree": json.loads((tree / MANIFEST_NAME).read_text(encoding="utf-8")),
+            },
+            "benchmarks": {},
+        }
+        for bench in benches:
+            print(f"… {bench.name}", file=sys.stderr)
+            runs = time_runs(bench.run, args.repeat, args.warmup)
+            results["benchmarks"][bench.name] = {"kind": bench.kind, **summarize(runs)}
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    rows = None
+    if baseline_path.exists() and not args.update_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("tree", {}).get("params") != results["meta"]["tree"]["params"]:
+            raise SystemExit(f"❌ {baseline_path} was recorded with different tree parameters; rerun with matching flags or --update-baseline")
+        rows = compare(results, baseline, args.threshold, args.min_delta_ms / 1000)
+        if args.only:  # filtered-out benchmarks are not "missing"
+            rows = [r for r in rows if r["status"] != "missing"]
+
+    print_table(results, rows)
+    print(f"\nResults: {out}")
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(out, baseline_path)
+        print(f"Baseline updated: {baseline_path}")
+    elif rows is None:
+        print(f"No baseline at {baseline_path}; run with --update-baseline to record one.")
+    else:
+        regressed = [r["name"] for r in rows if r["status"] == "regressed"]
+        if regressed:
+            raise SystemExit(f"❌ {len(regressed)} benchmark(s) regressed beyond {args.threshold:.0%} / {args.min_delta_ms:g} ms: {', '.join(regressed)}")
+        print("✅ No regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -3,31 +3,140 @@
 Rules:
 - write raw artifacts under workspace/
 - print only small summaries/previews (never dump huge payloads to stdout)
+
+Writers stream to a temp file next to the target and rename it into place, so a
+reader (or a concurrent run) never sees a torn artifact. A filename ending in
+.gz (or compress=True) is gzip-compressed on the way out.
 """
 from __future__ import annotations
 
+import gzip
+import io
 import json
+import os
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Tuple
+from typing import IO, Any, Iterable, Iterator, List
 
 WORKSPACE_DIR = Path("workspace")
+WRITE_CHUNK_CHARS = 64 * 1024
 
 def ensure_workspace() -> Path:
     WORKSPACE_DIR.mkdir(parents=True, exist_ok=True)
     return WORKSPACE_DIR
 
-def write_text(filename: str, text: str) -> Path:
+def workspace_path(filename: str, compress: bool = False) -> Path:
     ensure_workspace()
-    path = WORKSPACE_DIR / filename
-    path.write_text(text, encoding="utf-8")
+    if compress and not filename.endswith(".gz"):
+        filename += ".gz"
+    return WORKSPACE_DIR / filename
+
+def _text_sink(raw: IO[bytes], path: Path) -> IO[str]:
+    sink: IO[bytes] = raw
+    if path.suffix == ".gz":
+        # mtime=0: identical content gives identical bytes across runs.
+        sink = gzip.GzipFile(filename=path.name[:-3], mode="wb", fileobj=raw, mtime=0)  # type: ignore[assignment]
+    return io.TextIOWrapper(sink, encoding="utf-8", newline="\n")
+
+@contextmanager
+def atomic_open(path: Path) -> Iterator[IO[str]]:
+    """Text handle on a temp file that replaces `path` only if the block succeeds."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    raw = open(tmp, "xb")
+    try:
+        with _text_sink(raw, path) as f:
+            yield f
+        raw.close()  # the gzip layer leaves its fileobj open
+        os.replace(tmp, path)
+    except BaseException:
+        raw.close()
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def write_text(filename: str, text: str, *, compress: bool = False) -> Path:
+    path = workspace_path(filename, compress)
+    with atomic_open(path) as f:
+        f.write(text)
     return path
 
-def write_json(filename: str, obj: Any) -> Path:
-    ensure_workspace()
-    path = WORKSPACE_DIR / filename
-    path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+def write_json(filename: str, obj: Any, *, indent: int = 2, compress: bool = False) -> Path:
+    """Stream `obj` to disk without building the whole JSON string first."""
+    path = workspace_path(filename, compress)
+    encoder = json.JSONEncoder(ensure_ascii=False, indent=indent)
+    with atomic_open(path) as f:
+        buf: List[str] = []
+        size = 0
+        for chunk in encoder.iterencode(obj):
+            buf.append(chunk)
+            size += len(chunk)
+            if size >= WRITE_CHUNK_CHARS:
+                f.write("".join(buf))
+                buf, size = [], 0
+        f.write("".join(buf))
     return path
 
+class NdjsonWriter:
+    """One compact JSON value per line.
+
+    New files are written atomically (visible only after close()). With
+    append=True each record goes to the existing file in a single write, which
+    is what lets several runs append to one log without interleaving lines.
+    """
+
+    def __init__(self, path: Path, *, append: bool = False):
+        self.path = path
+        self.append = append
+        self.count = 0
+        self._ctx = None
+        if append:
+            self._raw = open(path, "ab")
+            self._f = _text_sink(self._raw, path)
+        else:
+            self._ctx = atomic_open(path)
+            self._f = self._ctx.__enter__()
+
+    def write(self, obj: Any) -> None:
+        self._f.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if self.append:
+            self._f.flush()
+        self.count += 1
+
+    def write_many(self, objs: Iterable[Any]) -> None:
+        for obj in objs:
+            self.write(obj)
+
+    def close(self, error: BaseException | None = None) -> None:
+        if self._ctx is not None:
+            ctx, self._ctx = self._ctx, None
+            if error is None:
+                ctx.__exit__(None, None, None)
+            else:
+                try:
+                    ctx.__exit__(type(error), error, error.__traceback__)
+                except BaseException:
+                    pass  # temp file removed; the caller re-raises the original error
+        elif self.append and not self._f.closed:
+            self._f.close()
+            self._raw.close()
+
+    def __enter__(self) -> "NdjsonWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close(exc)
+
+def open_ndjson(filename: str, *, append: bool = False, compress: bool = False) -> NdjsonWriter:
+    return NdjsonWriter(workspace_path(filename, compress), append=append)
+
+def append_ndjson(filename: str, records: Iterable[Any], *, compress: bool = False) -> Path:
+    with open_ndjson(filename, append=True, compress=compress) as w:
+        w.write_many(records)
+    return w.path
+
 def safe_preview_text(text: str, max_bytes: int = 512) -> str:
     b = text.encode("utf-8", errors="replace")
     if len(b) <= max_bytes:
@@ -36,5 +145,12 @@ def safe_preview_text(text: str, max_bytes: int = 512) -> str:
     return cut.decode("utf-8", errors="ignore") + "…"
 
 def safe_preview_json(obj: Any, max_bytes: int = 512) -> str:
-    s = json.dumps(obj, ensure_ascii=False, indent=2)
-    return safe_preview_text(s, max_bytes=max_bytes)
+    """Same output as dumping with indent=2 and truncating, but stops encoding at the budget."""
+    parts: List[str] = []
+    size = 0
+    for chunk in json.JSONEncoder(ensure_ascii=False, indent=2).iterencode(obj):
+        parts.append(chunk)
+        size += len(chunk.encode("utf-8", errors="replace"))
+        if size > max_bytes:
+            break
+    return safe_preview_text("".join(parts), max_bytes=max_bytes)
@@ -1,22 +1,220 @@
 #!/usr/bin/env python3
+"""Summarise the staged diff without loading it all.
+
+1. `git diff --staged --numstat` gives a cheap per-file summary (+/- lines).
+2. The diff itself is streamed through Popen line by line. Each file's hunks go
+   to workspace/staged_diff/NNN_<file>.diff (capped per file), and git is
+   stopped once the total budget is used.
+3. Files whose churn exceeds --huge-file-lines (lockfiles, generated code) are
+   excluded from the diff entirely and only appear in the summary.
+4. What is printed is capped at STDOUT_BUDGET; the rest stays in workspace/.
+"""
 from __future__ import annotations
 
+import argparse
+import re
 import subprocess
-from _fs import write_text, safe_preview_text
+from typing import Dict, List, Optional, Tuple
+
+from _fs import WORKSPACE_DIR, write_json, write_text, safe_preview_text
+
+DIFF_DIR = "staged_diff"
+# Fixed prefixes: diff.noprefix / diff.mnemonicPrefix would otherwise change the headers.
+DIFF_ARGS = ["git", "diff", "--staged", "--no-renames", "--no-color", "--no-ext-diff", "--src-prefix=a/", "--dst-prefix=b/"]
+STDOUT_BUDGET = 1024
+PREVIEW_MIN_BYTES = 256
+NEXT_HINT = "Next: Use this preview to write a concise commit summary line (<50 chars) and a short body (what + why)."
+# git's C-style quoting (paths with quotes, backslashes, control or, with
+# core.quotePath, non-ASCII bytes); anything else is a three-digit octal byte.
+_C_ESCAPES = {ord("a"): 7, ord("b"): 8, ord("t"): 9, ord("n"): 10, ord("v"): 11, ord("f"): 12, ord("r"): 13, ord('"'): 34, ord("\\"): 92}
+
+def staged_numstat() -> List[Dict[str, object]]:
+    """[{path, added, deleted, binary}] for every staged file."""
+    if subprocess.run(["git", "rev-parse", "--git-dir"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode != 0:
+        raise SystemExit("Not inside a git repository. Run this from your repo.")
+    proc = subprocess.run(DIFF_ARGS + ["--numstat", "-z"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise SystemExit(f"git diff failed: {safe_preview_text(proc.stderr.decode('utf-8', 'replace').strip(), max_bytes=300)}")
+    files = []
+    for record in proc.stdout.decode("utf-8", "replace").split("\0"):
+        if not record:
+            continue
+        added, deleted, path = record.split("\t", 2)
+        binary = added == "-"
+        files.append({"path": path, "added": 0 if binary else int(added), "deleted": 0 if binary else int(deleted), "binary": binary})
+    return files
+
+def _unquote(s: bytes, i: int) -> Tuple[Optional[bytes], int]:
+    """Decode the C-quoted string opening at s[i]; returns (bytes or None, index after it)."""
+    out = bytearray()
+    i += 1
+    while i < len(s):
+        c = s[i]
+        if c == 0x22:  # closing quote
+            return bytes(out), i + 1
+        if c == 0x5C:  # backslash
+            esc = s[i + 1:i + 2]
+            octal = s[i + 1:i + 4]
+            if esc and esc[0] in _C_ESCAPES:
+                out.append(_C_ESCAPES[esc[0]])
+                i += 2
+            elif len(octal) == 3 and all(0x30 <= b <= 0x37 for b in octal):
+                out.append(int(octal, 8))
+                i += 4
+            else:
+                return None, i
+            continue
+        out.append(c)
+        i += 1
+    return None, i
+
+def _header_path(raw: bytes) -> Optional[str]:
+    # "diff --git a/<p> b/<p>": without renames both sides are the same path.
+    # Either both sides are C-quoted ("a/<p>" "b/<p>") or neither is.
+    rest = raw[len(b"diff --git "):].rstrip(b"\r\n")
+    if rest.startswith(b'"'):
+        a, i = _unquote(rest, 0)
+        if a is None or rest[i:i + 2] != b' "':
+            return None
+        b, end = _unquote(rest, i + 1)
+        if b is None or end != len(rest):
+            return None
+    else:
+        half = (len(rest) - 1) // 2
+        a, b = rest[:half], rest[half + 1:]
+        if rest[half:half + 1] != b" ":
+            return None
+    if a.startswith(b"a/") and b.startswith(b"b/") and a[2:] == b[2:] and len(a) > 2:
+        return a[2:].decode("utf-8", "replace")
+    return None
+
+def _artifact_name(index: int, path: str) -> str:
+    return f"{DIFF_DIR}/{index:03d}_{re.sub(r'[^A-Za-z0-9._-]+', '_', path)[-80:]}.diff"
+
+def stream_diff(excludes: List[str], *, preview_lines: int, max_file_bytes: int, max_total_bytes: int) -> Tuple[List[str], Dict[str, Dict[str, object]], bool]:
+    """Stream the staged diff into per-file artifacts.
+
+    Returns (preview lines, {path: {artifact, bytes, truncated}}, stopped early?).
+    """
+    # numstat paths are relative to the repo root, so the pathspecs are too.
+    args = DIFF_ARGS + ["--", ":/"] + [f":(exclude,literal,top){p}" for p in excludes]
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    assert proc.stdout is not None
+
+    preview: List[str] = []
+    captured: Dict[str, Dict[str, object]] = {}
+    total = 0
+    stopped = False
+    current: Optional[str] = None
+    chunk: List[str] = []
+    chunk_bytes = 0
+
+    def flush() -> None:
+        if current is not None:
+            info = captured[current]
+            info["artifact"] = str(write_text(str(info["artifact"]), "".join(chunk)))
+            info["bytes"] = chunk_bytes
+
+    try:
+        for raw in proc.stdout:
+            line = raw.decode("utf-8", "replace")
+            if len(preview) < preview_lines:
+                preview.append(line.rstrip("\n"))
+            if line.startswith("diff --git "):
+                flush()
+                current = _header_path(raw) or f"file-{len(captured) + 1}"
+                captured[current] = {"artifact": _artifact_name(len(captured) + 1, current), "bytes": 0, "truncated": False}
+                chunk, chunk_bytes = [], 0
+            if current is None:
+                continue
+            size = len(raw)
+            if chunk_bytes + size > max_file_bytes:
+                if not captured[current]["truncated"]:
+                    captured[current]["truncated"] = True
+                    chunk.append("… (truncated: see --max-file-bytes)\n")
+                continue
+            chunk.append(line)
+            chunk_bytes += size
+            total += size
+            if total >= max_total_bytes:
+                stopped = True
+                captured[current]["truncated"] = True
+                break
+        flush()
+    finally:
+        if proc.poll() is None:
+            proc.kill()  # budget reached: don't let git render the rest
+        proc.stdout.close()
+        proc.wait()
+    return preview, captured, stopped
+
+def _printed_bytes(lines: List[str]) -> int:
+    return sum(len(line.encode("utf-8", errors="replace")) + 1 for line in lines)
 
 def main() -> None:
-    diff = subprocess.run(["git", "diff", "--staged"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True).stdout
-    if not diff.strip():
+    ap = argparse.ArgumentParser(description="Summarise the staged diff into workspace/ artifacts.")
+    ap.add_argument("--preview-lines", type=int, default=120, help="Lines kept in staged_diff_preview.txt (default: 120)")
+    ap.add_argument("--max-file-bytes", type=int, default=64 * 1024, help="Per-file hunk artifact cap (default: 64 KiB)")
+    ap.add_argument("--max-total-bytes", type=int, default=4 * 1024 * 1024, help="Stop reading the diff after this much (default: 4 MiB)")
+    ap.add_argument("--huge-file-lines", type=int, default=2000, help="Summarise, don't diff, files with more changed lines (default: 2000)")
+    ap.add_argument("--top", type=int, default=10, help="Files listed in the printed summary (default: 10)")
+    args = ap.parse_args()
+
+    files = staged_numstat()
+    if not files:
         print("No staged changes. Stage files first, then rerun.")
         return
 
-    preview = "\n".join(diff.splitlines()[:120])
-    path = write_text("staged_diff_preview.txt", preview)
+    huge = [f["path"] for f in files if not f["binary"] and int(f["added"]) + int(f["deleted"]) > args.huge_file_lines]
+    for stale in (WORKSPACE_DIR / DIFF_DIR).glob("*.diff") if (WORKSPACE_DIR / DIFF_DIR).is_dir() else []:
+        stale.unlink()
+    (WORKSPACE_DIR / DIFF_DIR).mkdir(parents=True, exist_ok=True)
+
+    preview, captured, stopped = stream_diff(huge, preview_lines=args.preview_lines, max_file_bytes=args.max_file_bytes, max_total_bytes=args.max_total_bytes)
+
+    for f in files:
+        path = str(f["path"])
+        if path in huge:
+            f["status"] = "summarised (huge)"
+        elif path in captured:
+            f.update(captured[path])
+            f["status"] = "truncated" if captured[path]["truncated"] else "captured"
+        else:
+            f["status"] = "binary" if f["binary"] else "not captured (budget)"
+    summary = {
+        "files": len(files),
+        "added": sum(int(f["added"]) for f in files),
+        "deleted": sum(int(f["deleted"]) for f in files),
+        "stopped_early": stopped,
+        "per_file": files,
+    }
+    summary_path = write_json("staged_summary.json", summary)
+    preview_text = "\n".join(preview)
+    preview_path = write_text("staged_diff_preview.txt", preview_text)
+
+    # Everything printed fits in STDOUT_BUDGET: the file list is cut before the
+    # preview drops below PREVIEW_MIN_BYTES, and the preview gets what is left.
+    header = f"✅ Staged: {summary['files']} file(s), +{summary['added']} -{summary['deleted']}" + (" (diff budget reached)" if stopped else "")
+    artifacts = safe_preview_text(f"Artifacts: {summary_path}, {preview_path}, {WORKSPACE_DIR / DIFF_DIR}/", max_bytes=200)
+    more_reserve = _printed_bytes([f"  … {len(files)} more in {summary_path}"])
+    fixed = _printed_bytes([header, artifacts, "Preview (capped):", "", "", NEXT_HINT])
+    listed: List[str] = []
+    for f in sorted(files, key=lambda f: -(int(f["added"]) + int(f["deleted"])))[:args.top]:
+        line = f"  {safe_preview_text(str(f['path']), max_bytes=100)}: +{f['added']} -{f['deleted']} [{f['status']}]"
+        if fixed + _printed_bytes(listed + [line]) + more_reserve + PREVIEW_MIN_BYTES > STDOUT_BUDGET:
+            break
+        listed.append(line)
+    if len(listed) < len(files):
+        listed.append(f"  … {len(files) - len(listed)} more in {summary_path}")
+    preview_budget = max(0, STDOUT_BUDGET - fixed - _printed_bytes(listed) - len("…".encode("utf-8")))
 
-    print(f"✅ Saved staged diff preview to: {path}")
+    print(header)
+    for line in listed:
+        print(line)
+    print(artifacts)
     print("Preview (capped):")
-    print(safe_preview_text(preview, max_bytes=768))
-    print("\nNext: Use this preview to write a concise commit summary line (<50 chars) and a short body (what + why).")
+    print(safe_preview_text(preview_text, max_bytes=preview_budget))
+    print("\n" + NEXT_HINT)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# One small JSON file per skills directory, shared by validate/scan/audit.
+CACHE_FILENAME = ".skill-forge-cache.json"
+CACHE_SCHEMA = 1
+
+class _Miss:
+    def __repr__(self) -> str:
+        return "MISS"
+
+MISS: Any = _Miss()
+
+def fingerprint(*parts: Any) -> str:
+    """Stable short digest of whatever inputs a cached result depends on."""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:16]
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class FileCache:
+    """Per-file result cache keyed by path, size, mtime and content hash.
+
+    Each entry holds results for several kinds ("scan", "syntax", ...), each tagged
+    with the version of the rules that produced it. A size/mtime match is trusted
+    as-is; if only the mtime moved, the content hash decides whether results survive.
+    """
+
+    def __init__(self, path: Optional[Path], entries: Optional[Dict[str, Any]] = None, *, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._entries: Dict[str, Any] = entries if entries is not None else {}
+        self._checked: Dict[str, bool] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def disabled(cls) -> "FileCache":
+        return cls(None, enabled=False)
+
+    @classmethod
+    def load(cls, path: Path) -> "FileCache":
+        entries: Dict[str, Any] = {}
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(raw, dict) and raw.get("schema") == CACHE_SCHEMA:
+                entries = raw.get("entries") or {}
+        except (OSError, ValueError):
+            pass
+        return cls(path, entries)
+
+    @classmethod
+    def for_skills_dir(cls, skills_dir: Path, *, enabled: bool = True) -> "FileCache":
+        if not enabled:
+            return cls.disabled()
+        return cls.load(skills_dir / CACHE_FILENAME)
+
+    def _entry(self, file: Path, load: Optional[Callable[[], bytes]] = None) -> Optional[Dict[str, Any]]:
+        """Return the entry for `file` after bringing its signature up to date.
+
+        `load` lets a caller that already holds the file's bytes avoid a second read.
+        """
+        key = str(file)
+        entry = self._entries.get(key)
+        if self._checked.get(key):
+            return entry
+        self._checked[key] = True
+        try:
+            st = file.stat()
+        except OSError:
+            if entry is not None:
+                del self._entries[key]
+                self._dirty = True
+            return None
+        if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            return entry
+        digest = hashlib.sha256(load()).hexdigest() if load else _sha256_file(file)
+        if entry and entry.get("size") == st.st_size and entry.get("sha256") == digest:
+            entry["mtime_ns"] = st.st_mtime_ns
+        else:
+            entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest, "results": {}}
+            self._entries[key] = entry
+        self._dirty = True
+        return entry
+
+    def recheck(self) -> None:
+        """Forget which files were already stat-checked, so the next lookup sees edits.
+
+        One-shot commands never need this; a long-lived process calls it per request.
+        """
+        self._checked.clear()
+
+    def get(self, file: Path, kind: str, version: str, load: Optional[Callable[[], bytes]] = None) -> Any:
+        if not self.enabled:
+            return MISS
+        entry = self._entry(file, load)
+        slot = entry["results"].get(kind) if entry else None
+        if slot is None or slot.get("v") != version:
+            self.misses += 1
+            return MISS
+        self.hits += 1
+        return slot["value"]
+
+    def put(self, file: Path, kind: str, version: str, value: Any, load: Optional[Callable[[], bytes]] = None) -> None:
+        if not self.enabled:
+            return
+        entry = self._entry(file, load)
+        if entry is None:
+            return
+        entry["results"][kind] = {"v": version, "value": value}
+        self._dirty = True
+
+    def memo(self, file: Path, kind: str, version: str, compute: Callable[[], Any], load: Optional[Callable[[], bytes]] = None) -> Any:
+        value = self.get(file, kind, version, load)
+        if value is MISS:
+            value = compute()
+            self.put(file, kind, version, value, load)
+        return value
+
+    def subset(self, root: Path) -> Dict[str, Any]:
+        """Entries for files under `root` (to hand to a worker process)."""
+        prefix = str(root) + os.sep
+        return {k: v for k, v in self._entries.items() if k.startswith(prefix)}
+
+    def entries(self) -> Dict[str, Any]:
+        return self._entries
+
+    def merge(self, entries: Dict[str, Any]) -> None:
+        if entries:
+            self._entries.update(entries)
+            self._dirty = True
+
+    def evict_missing(self) -> int:
+        gone = [k for k in self._entries if not os.path.exists(k)]
+        for k in gone:
+            del self._entries[k]
+        if gone:
+            self._dirty = True
+        return len(gone)
+
+    def save(self) -> None:
+        if not self.enabled or self.path is None:
+            return
+        self.evict_missing()
+        if not self._dirty:
+            return
+        payload = json.dumps({"schema": CACHE_SCHEMA, "entries": self._entries}, separators=(",", ":"))
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            # Cache is an optimisation; a read-only skills dir must not fail the run.
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        self._dirty = False
@@ -4,8 +4,7 @@ import ast
 from pathlib import Path
 from typing import Set
 
-def imported_top_levels(py_path: Path) -> Set[str]:
-    tree = ast.parse(py_path.read_text(encoding="utf-8"))
+def imported_top_levels_from_tree(tree: ast.AST) -> Set[str]:
     mods: Set[str] = set()
     for node in ast.walk(tree):
         if isinstance(node, ast.Import):
@@ -15,3 +14,6 @@ def imported_top_levels(py_path: Path) -> Set[str]:
             if node.module:
                 mods.add(node.module.split(".")[0])
     return mods
+
+def imported_top_levels(py_path: Path) -> Set[str]:
+    return imported_top_levels_from_tree(ast.parse(py_path.read_text(encoding="utf-8")))
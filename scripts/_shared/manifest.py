@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from _shared.snapshot import SkillFile
+from _shared.tokens import estimate_tokens, estimate_tokens_for_bytes, skill_md_split
+
+# Package manifest: written by package_skill.py as the first (STORED) member,
+# <skill>/.skill-forge-manifest.json, and again as the zip comment. A reader only
+# needs the end-of-central-directory record to get it; see read_zip_manifest.
+
+MANIFEST_FORMAT = "skill-forge-manifest"
+MANIFEST_VERSION = 1
+MANIFEST_FILENAME = ".skill-forge-manifest.json"
+SPEC_FIELDS = ("name", "title", "description", "archetype", "risk_level", "entry_point", "triggers", "anti_triggers")
+
+_EOCD = struct.Struct("<IHHHHIIH")
+_EOCD_SIG = b"PK\x05\x06"
+_CENTRAL = struct.Struct("<IHHHHHHIIIHHHHHII")
+_LOCAL = struct.Struct("<IHHHHHIIIHH")
+_MAX_COMMENT = 0xFFFF
+SNIFF_BYTES = 8192
+_CHUNK = 1024 * 1024
+_ZIP64_OFFSET = 0xFFFFFFFF
+
+def _compact(obj: Any) -> bytes:
+    # Sorted keys, no whitespace: identical inputs give identical bytes (reproducible zips).
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def file_digest(f: SkillFile) -> Tuple[str, int, bool]:
+    """(sha256, size, looks like text) for one file.
+
+    Files the snapshot memoises are hashed from its bytes, so the packager
+    archives exactly what was hashed without reading the file again. Larger
+    files are hashed in chunks and never held whole.
+    """
+    if f.memoised:
+        data = f.data
+        return hashlib.sha256(data).hexdigest(), len(data), b"\0" not in data[:SNIFF_BYTES]
+    h = hashlib.sha256()
+    size = 0
+    text = True
+    with f.path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK), b""):
+            if size < SNIFF_BYTES and b"\0" in chunk[:SNIFF_BYTES - size]:
+                text = False
+            h.update(chunk)
+            size += len(chunk)
+    return h.hexdigest(), size, text
+
+def build_manifest(skill: str, files: List[Tuple[str, SkillFile]], *, level: int, store_ratio: float) -> Dict[str, Any]:
+    """Manifest for `files` ((rel, SkillFile) pairs, rel relative to the skill root)."""
+    entries: Dict[str, Dict[str, Any]] = {}
+    text_bytes = 0
+    frontmatter: Optional[Dict[str, str]] = None
+    spec: Dict[str, Any] = {}
+    skill_md_tokens = frontmatter_tokens = 0
+    for rel, f in files:
+        digest, size, text = file_digest(f)
+        entries[rel] = {"sha256": digest, "size": size}
+        if text:
+            text_bytes += size
+        if rel == "SKILL.md":
+            skill_md_tokens = estimate_tokens_for_bytes(size)
+            try:
+                fm = f.frontmatter
+            except UnicodeDecodeError:
+                fm = None
+            if fm is not None:
+                frontmatter = fm.data
+                frontmatter_tokens = estimate_tokens(skill_md_split(f.text, fm.end_line)[0])
+        elif rel == "skill.spec.json":
+            try:
+                loaded = f.json()
+            except (UnicodeDecodeError, ValueError):
+                loaded = None
+            if isinstance(loaded, dict):
+                spec = {k: loaded[k] for k in SPEC_FIELDS if k in loaded}
+    return {
+        "format": MANIFEST_FORMAT,
+        "version": MANIFEST_VERSION,
+        "skill": skill,
+        "settings": {"level": level, "store": store_ratio},
+        "frontmatter": frontmatter,
+        "spec": spec,
+        "files": entries,
+        "total_bytes": sum(e["size"] for e in entries.values()),
+        "context": {
+            # frontmatter: always in context for discovery; SKILL.md: on activation;
+            # text: upper bound if every text file were read.
+            "frontmatter_tokens": frontmatter_tokens,
+            "skill_md_tokens": skill_md_tokens,
+            "text_tokens": estimate_tokens_for_bytes(text_bytes),
+        },
+    }
+
+def manifest_bytes(manifest: Dict[str, Any]) -> bytes:
+    return _compact(manifest)
+
+def manifest_comment(manifest: Dict[str, Any]) -> bytes:
+    """The manifest as a zip comment, shrunk until it fits in 64 KiB.
+
+    First the file table is dropped; if long frontmatter or spec fields still do
+    not fit, only what identifies the archive and its settings is kept. Either
+    way the full manifest is in the first member (files_in_member).
+    """
+    full = _compact(manifest)
+    if len(full) <= _MAX_COMMENT:
+        return full
+    slim = {k: v for k, v in manifest.items() if k != "files"}
+    slim["files_in_member"] = True
+    slim["file_count"] = len(manifest.get("files", {}))
+    comment = _compact(slim)
+    if len(comment) <= _MAX_COMMENT:
+        return comment
+    keep = ("format", "version", "skill", "settings", "files_in_member", "file_count")
+    return _compact({k: slim[k] for k in keep if k in slim})
+
+def parse_comment(comment: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(comment.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if isinstance(data, dict) and data.get("format") == MANIFEST_FORMAT:
+        return data
+    return None
+
+def _find_eocd(f: BinaryIO) -> Tuple[Tuple[int, ...], bytes]:
+    """(EOCD fields, comment) from the archive tail; raises ValueError if there is none."""
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    tail_len = min(size, _EOCD.size + _MAX_COMMENT)
+    f.seek(size - tail_len)
+    tail = f.read(tail_len)
+    idx = tail.rfind(_EOCD_SIG)
+    while idx >= 0:
+        if idx + _EOCD.size <= len(tail):
+            fields = _EOCD.unpack_from(tail, idx)
+            if idx + _EOCD.size + fields[7] == len(tail):
+                return fields, tail[idx + _EOCD.size:]
+        idx = tail.rfind(_EOCD_SIG, 0, idx)
+    raise ValueError("no end-of-central-directory record (not a zip?)")
+
+def _first_member(f: BinaryIO, eocd: Tuple[int, ...]) -> Tuple[str, bytes]:
+    """Name and raw bytes of the first central-directory entry; must be STORED."""
+    if eocd[6] == _ZIP64_OFFSET:
+        # zip64 archive (package_skill's fallback for very large skills): the real
+        # directory offset is in the zip64 records, which zipfile already parses.
+        try:
+            zf = zipfile.ZipFile(f)
+            info = zf.infolist()[0]
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename}: manifest member is compressed")
+            return info.filename, zf.read(info)
+        except (zipfile.BadZipFile, IndexError) as e:
+            raise ValueError(f"bad zip64 central directory: {e}") from e
+    f.seek(eocd[6])
+    rec = f.read(_CENTRAL.size)
+    fields = _CENTRAL.unpack(rec)
+    if fields[0] != 0x02014B50:
+        raise ValueError("bad central directory")
+    method, csize, name_len, offset = fields[4], fields[8], fields[10], fields[16]
+    name = f.read(name_len).decode("utf-8", errors="replace")
+    if method != 0:
+        raise ValueError(f"{name}: manifest member is compressed")
+    f.seek(offset)
+    local = _LOCAL.unpack(f.read(_LOCAL.size))
+    f.seek(local[9] + local[10], os.SEEK_CUR)
+    return name, f.read(csize)
+
+def read_zip_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    """Package manifest from the zip comment (one read of the tail), or None.
+
+    If the comment had to drop the file table, the STORED first member is read
+    too; nothing is ever decompressed.
+    """
+    with path.open("rb") as f:
+        eocd, comment = _find_eocd(f)
+        manifest = parse_comment(comment)
+        if manifest is None or not manifest.get("files_in_member"):
+            return manifest
+        name, raw = _first_member(f, eocd)
+        if not name.endswith("/" + MANIFEST_FILENAME):
+            return manifest
+        full = parse_comment(raw)
+        return full if full is not None else manifest
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import ast
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from _shared.frontmatter import Frontmatter, extract_frontmatter
+from _shared.timing import phase
+
+_UNSET: Any = object()
+
+# Bytes and text of files larger than this are never kept: every access re-reads
+# them, so a snapshot of a tree with large fixtures does not pin them in memory.
+# Parse results (frontmatter, JSON, AST) are still memoised.
+MEMO_MAX_BYTES = 1024 * 1024
+
+class SkillFile:
+    """One file in a skill, read and parsed at most once.
+
+    Every accessor is lazy and memoised: bytes, decoded text, frontmatter,
+    JSON and AST (bytes and text only up to MEMO_MAX_BYTES). Errors are
+    memoised too, so a file that fails to decode or parse is not retried by
+    the next caller.
+    """
+
+    def __init__(self, path: Path, rel: str = ""):
+        self.path = path
+        self.rel = rel or path.name
+        self._stat: Optional[os.stat_result] = None
+        self._data: Optional[bytes] = None
+        self._text: Any = _UNSET
+        self._lossy: Optional[str] = None
+        self._frontmatter: Any = _UNSET
+        self._json: Any = _UNSET
+        self._tree: Any = _UNSET
+        # Values derived from the content by some caller (e.g. link targets), primed from an index.
+        self.derived: Dict[str, Any] = {}
+
+    @property
+    def stat(self) -> os.stat_result:
+        if self._stat is None:
+            self._stat = self.path.stat()
+        return self._stat
+
+    @property
+    def size(self) -> int:
+        return self.stat.st_size
+
+    @property
+    def memoised(self) -> bool:
+        """Whether bytes and text are kept once read (small files only)."""
+        return self.size <= MEMO_MAX_BYTES
+
+    def read(self) -> bytes:
+        """The file's bytes without memoising them (reused if already loaded)."""
+        if self._data is not None:
+            return self._data
+        with phase("read", self.path):
+            return self.path.read_bytes()
+
+    @property
+    def data(self) -> bytes:
+        if self._data is not None:
+            return self._data
+        data = self.read()
+        if len(data) <= MEMO_MAX_BYTES:
+            self._data = data
+        return data
+
+    @property
+    def text(self) -> str:
+        """Strict UTF-8 text; raises UnicodeDecodeError like Path.read_text."""
+        text = self._text
+        if text is _UNSET:
+            data = self.data
+            try:
+                text = data.decode("utf-8")
+            except UnicodeDecodeError as e:
+                text = e
+            if len(data) <= MEMO_MAX_BYTES:
+                self._text = text
+        if isinstance(text, Exception):
+            raise text
+        return text
+
+    @property
+    def lossy_text(self) -> str:
+        """UTF-8 text with undecodable bytes replaced (what the scanner wants)."""
+        if self._lossy is not None:
+            return self._lossy
+        try:
+            lossy = self.text
+        except UnicodeDecodeError:
+            lossy = self.data.decode("utf-8", errors="replace")
+        if self.memoised:
+            self._lossy = lossy
+        return lossy
+
+    @property
+    def frontmatter(self) -> Optional[Frontmatter]:
+        if self._frontmatter is _UNSET:
+            text = self.text
+            with phase("frontmatter", self.path):
+                self._frontmatter = extract_frontmatter(text)
+        return self._frontmatter
+
+    def json(self) -> Any:
+        if self._json is _UNSET:
+            try:
+                text = self.text
+                with phase("json_parse", self.path):
+                    self._json = json.loads(text)
+            except ValueError as e:
+                self._json = e
+        if isinstance(self._json, Exception):
+            raise self._json
+        return self._json
+
+    def prime(self, *, frontmatter: Any = _UNSET, json: Any = _UNSET, **derived: Any) -> None:
+        """Seed parse results from an index instead of reading the file.
+
+        Only call this after checking the index entry still matches the file's stat.
+        """
+        if frontmatter is not _UNSET:
+            self._frontmatter = Frontmatter(**frontmatter) if frontmatter else None
+        if json is not _UNSET:
+            self._json = json
+        self.derived.update(derived)
+
+    @property
+    def tree(self) -> ast.AST:
+        """Parsed module; re-raises the original SyntaxError on every access."""
+        if self._tree is _UNSET:
+            try:
+                text = self.text
+                with phase("ast_parse", self.path):
+                    self._tree = ast.parse(text)
+            except Exception as e:
+                self._tree = e
+        if isinstance(self._tree, Exception):
+            raise self._tree
+        return self._tree
+
+class SkillSnapshot:
+    """A skill folder walked once; files are SkillFile objects keyed by posix relative path.
+
+    Validation, scanning and packaging all take an optional snapshot, so when they
+    run in one process each file is read and parsed at most once.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._files: Optional[Dict[str, SkillFile]] = None
+
+    def _walk(self) -> Dict[str, SkillFile]:
+        if self._files is None:
+            files: Dict[str, SkillFile] = {}
+            with phase("walk", self.root):
+                for p in sorted(self.root.rglob("*")):
+                    if p.is_dir():
+                        continue
+                    rel = p.relative_to(self.root).as_posix()
+                    files[rel] = SkillFile(p, rel)
+            self._files = files
+        return self._files
+
+    def files(self) -> Iterator[SkillFile]:
+        return iter(self._walk().values())
+
+    def get(self, rel: str) -> Optional[SkillFile]:
+        return self._walk().get(rel)
+
+    def exists(self, rel: str) -> bool:
+        return rel in self._walk()
+
+    def glob(self, directory: str, suffix: str) -> List[SkillFile]:
+        """Direct children of `directory` ending in `suffix` (like Path.glob("*" + suffix))."""
+        prefix = directory.rstrip("/") + "/"
+        return [f for rel, f in self._walk().items() if rel.startswith(prefix) and "/" not in rel[len(prefix):] and rel.endswith(suffix)]
@@ -1,23 +1,89 @@
 from __future__ import annotations
 
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+
+PLACEHOLDER_RE = re.compile(r"\{\{([A-Za-z_][A-Za-z0-9_]*)\}\}")
+
+class TemplateError(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    # Alternating literal / placeholder-name segments, starting and ending with a literal.
+    segments: Tuple[str, ...]
+    names: frozenset
+
+    @property
+    def is_static(self) -> bool:
+        return not self.names
+
+    def render(self, variables: Dict[str, str], source: str = "template") -> str:
+        if self.is_static:
+            return self.segments[0]
+        missing = self.names - variables.keys()
+        if missing:
+            raise TemplateError(f"{source}: no value for {', '.join('{{' + n + '}}' for n in sorted(missing))}")
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            parts[i] = variables[parts[i]]
+        return "".join(parts)
+
+@lru_cache(maxsize=256)
+def compile_template(text: str) -> CompiledTemplate:
+    segments = PLACEHOLDER_RE.split(text)
+    return CompiledTemplate(tuple(segments), frozenset(segments[1::2]))
 
 def render(text: str, variables: Dict[str, str]) -> str:
-    out = text
-    for k, v in variables.items():
-        out = out.replace("{{" + k + "}}", v)
-    return out
+    return compile_template(text).render(variables)
 
-def copy_template_tree(template_root: Path, dest_root: Path, variables: Dict[str, str]) -> None:
-    for src in template_root.rglob("*"):
+@dataclass(frozen=True)
+class TemplateEntry:
+    src: Path
+    rel_out: Path  # destination path relative to the skill root (.tpl stripped)
+    template: Optional[CompiledTemplate]  # None: copy the file as-is
+
+@lru_cache(maxsize=None)
+def load_template_tree(template_root: Path) -> Tuple[TemplateEntry, ...]:
+    """Walk and compile a template directory once per process.
+
+    `.tpl` files are read and compiled; everything else is copied byte-for-byte.
+    """
+    entries: List[TemplateEntry] = []
+    for src in sorted(template_root.rglob("*")):
         if src.is_dir():
             continue
         rel = src.relative_to(template_root)
-        # Strip .tpl extension
-        name = rel.name[:-4] if rel.name.endswith(".tpl") else rel.name
-        out_path = dest_root / rel.parent / name
-        out_path.parent.mkdir(parents=True, exist_ok=True)
+        if rel.name.endswith(".tpl"):
+            # Strip .tpl extension
+            compiled = compile_template(src.read_text(encoding="utf-8"))
+            entries.append(TemplateEntry(src, rel.parent / rel.name[:-4], compiled))
+        else:
+            entries.append(TemplateEntry(src, rel, None))
+    return tuple(entries)
 
-        content = src.read_text(encoding="utf-8")
-        out_path.write_text(render(content, variables), encoding="utf-8")
+def _copy(src: Path, dst: Path, hardlink: bool) -> None:
+    if hardlink:
+        try:
+            if dst.exists():
+                dst.unlink()
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # cross-device or unsupported: fall back to a copy
+    shutil.copyfile(src, dst)
+
+def copy_template_tree(template_root: Path, dest_root: Path, variables: Dict[str, str], *, hardlink: bool = False) -> None:
+    """Materialise a template tree; unknown {{VAR}} placeholders raise TemplateError."""
+    for entry in load_template_tree(template_root):
+        out_path = dest_root / entry.rel_out
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        if entry.template is None or entry.template.is_static:
+            _copy(entry.src, out_path, hardlink)
+        else:
+            out_path.write_text(entry.template.render(variables, str(entry.src)), encoding="utf-8")
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+TIMINGS_FILENAME = "skill-forge-timings.json"
+
+# (phase, item, start, duration, pid, tid). start is wall-clock seconds, so events
+# recorded in pool workers line up with the parent's on one timeline.
+Event = Tuple[str, str, float, float, int, int]
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+_NULL_PHASE = _NullPhase()
+
+class _Phase:
+    __slots__ = ("rec", "name", "item", "t0")
+
+    def __init__(self, rec: "Recorder", name: str, item: str):
+        self.rec = rec
+        self.name = name
+        self.item = item
+
+    def __enter__(self) -> None:
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.rec.record(self.name, self.item, self.t0, time.perf_counter() - self.t0)
+
+class Recorder:
+    """Collects (phase, item) timings when enabled; a no-op context manager otherwise.
+
+    Phases nest (scan -> read), so per-phase totals are inclusive. list.append is
+    atomic, so threads (forge, package) can record without a lock.
+
+    Long-lived processes (serve.py) set max_events: past it, the oldest half of
+    the events is folded into per-phase totals and dropped, so memory stays
+    bounded while phase totals stay exact. Per-item reports and traces then
+    only cover the most recent events.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.events: List[Event] = []
+        self.max_events: Optional[int] = None
+        self.folded = 0
+        self._folded_totals: Dict[str, Dict[str, float]] = {}
+        self._fold_lock = threading.Lock()
+        # perf_counter is precise but has no fixed epoch; anchor it to the wall clock once.
+        self._epoch = time.time() - time.perf_counter()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def phase(self, name: str, item: Any = "") -> Any:
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name, str(item))
+
+    def record(self, name: str, item: str, t0: float, dur: float) -> None:
+        self.events.append((name, item, self._epoch + t0, dur, os.getpid(), threading.get_native_id()))
+        if self.max_events is not None and len(self.events) > self.max_events:
+            self._fold()
+
+    def _fold(self) -> None:
+        with self._fold_lock:
+            if self.max_events is None or len(self.events) <= self.max_events:
+                return
+            half = len(self.events) // 2
+            # Slice then delete the same prefix: appends from other threads land at the end.
+            old = self.events[:half]
+            del self.events[:half]
+            _add_totals(self._folded_totals, old)
+            self.folded += len(old)
+
+    def drain(self) -> List[Event]:
+        """Hand recorded events to the caller (a pool worker shipping them to the parent)."""
+        events, self.events = self.events, []
+        return events
+
+    def merge(self, events: List[Event]) -> None:
+        self.events.extend(tuple(e) for e in events)  # type: ignore[misc]
+
+    # --- reports ---
+
+    def phase_totals(self) -> Dict[str, Dict[str, float]]:
+        totals = {name: dict(t) for name, t in self._folded_totals.items()}
+        _add_totals(totals, self.events)
+        return dict(sorted(totals.items(), key=lambda kv: -kv[1]["total_s"]))
+
+    def summary_lines(self, wall_s: float, max_phases: int = 12, max_items: int = 5) -> List[str]:
+        totals = self.phase_totals()
+        count = len(self.events) + self.folded
+        kept = f", items from the last {len(self.events)}" if self.folded else ""
+        lines = [f"⏱  Timings: {wall_s * 1000:.1f} ms wall, {count} event(s){kept} (phase totals are inclusive)"]
+        for name, t in list(totals.items())[:max_phases]:
+            lines.append(f"  {name:<20} {t['total_s'] * 1000:>10.1f} ms  n={int(t['count']):<6} max={t['max_s'] * 1000:.1f} ms")
+        if len(totals) > max_phases:
+            lines.append(f"  … {len(totals) - max_phases} more phase(s)")
+        slowest = sorted((e for e in self.events if e[1]), key=lambda e: -e[3])[:max_items]
+        if slowest:
+            lines.append("  Slowest items:")
+            lines.extend(f"    {e[3] * 1000:>8.1f} ms  {e[0]}  {e[1]}" for e in slowest)
+        return lines
+
+    def to_json(self, tool: str, wall_s: float) -> Dict[str, Any]:
+        start = min((e[2] for e in self.events), default=0.0)
+        return {
+            "tool": tool,
+            "argv": sys.argv[1:],
+            "wall_s": wall_s,
+            "phases": self.phase_totals(),
+            "folded_events": self.folded,
+            "events": [
+                {"phase": n, "item": i, "start_s": round(s - start, 6), "dur_s": round(d, 6), "pid": p, "tid": t}
+                for n, i, s, d, p, t in sorted(self.events, key=lambda e: e[2])
+            ],
+        }
+
+    def trace_events(self) -> Dict[str, Any]:
+        """Chrome trace-event JSON (chrome://tracing, Perfetto, speedscope)."""
+        events = [
+            {"name": n, "cat": n, "ph": "X", "ts": round(s * 1e6), "dur": max(1, round(d * 1e6)), "pid": p, "tid": t, "args": {"item": i} if i else {}}
+            for n, i, s, d, p, t in self.events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def _add_totals(totals: Dict[str, Dict[str, float]], events: List[Event]) -> None:
+    for name, _, _, dur, _, _ in events:
+        t = totals.setdefault(name, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+        t["count"] += 1
+        t["total_s"] += dur
+        t["max_s"] = max(t["max_s"], dur)
+
+# One recorder per process; library code records into it unconditionally.
+TIMINGS = Recorder()
+
+def phase(name: str, item: Any = "") -> Any:
+    return TIMINGS.phase(name, item)
+
+def add_timing_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--timings", action="store_true", help="Print a per-phase timing summary (stderr) and write per-file timings to --timings-out")
+    ap.add_argument("--timings-out", default=TIMINGS_FILENAME, metavar="FILE", help=f"Per-file timings JSON for --timings (default: {TIMINGS_FILENAME})")
+    ap.add_argument("--trace", metavar="FILE", help="Write a trace-event JSON timeline (open in Perfetto or chrome://tracing)")
+    ap.add_argument("--profile", metavar="FILE", help="Write a cProfile/pstats dump of this process (view with python -m pstats FILE)")
+
+def start_timing(args: argparse.Namespace, tool: str) -> None:
+    """Enable whatever --timings/--trace/--profile asked for; reports are written at exit.
+
+    Exit hooks run on SystemExit too, so failing validations still get their report.
+    """
+    if not (args.timings or args.trace or args.profile):
+        return
+    t0 = time.perf_counter()
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if args.timings or args.trace:
+        TIMINGS.enable()
+
+    def finish() -> None:
+        wall = time.perf_counter() - t0
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"Profile written: {args.profile}", file=sys.stderr)
+        if not TIMINGS.enabled:
+            return
+        TIMINGS.record(tool, "", t0, wall)
+        if args.timings:
+            print("\n".join(TIMINGS.summary_lines(wall)), file=sys.stderr)
+            _write_json(Path(args.timings_out), TIMINGS.to_json(tool, wall))
+            print(f"Timings written: {args.timings_out}", file=sys.stderr)
+        if args.trace:
+            _write_json(Path(args.trace), TIMINGS.trace_events())
+            print(f"Trace written: {args.trace}", file=sys.stderr)
+
+    atexit.register(finish)
+
+def _write_json(path: Path, obj: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(obj, separators=(",", ":")) + "\n", encoding="utf-8")
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+# Rough context-size estimate: ~4 characters (or UTF-8 bytes) per token for
+# English prose and code. Good for budgets and ranking, not for billing.
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def estimate_tokens_for_bytes(size: int) -> int:
+    return -(-size // CHARS_PER_TOKEN)
+
+def skill_md_split(text: str, frontmatter_end: int) -> Tuple[str, str]:
+    """(frontmatter, body) of SKILL.md text; `frontmatter_end` is the closing --- line index."""
+    lines = text.splitlines(keepends=True)
+    return "".join(lines[:frontmatter_end + 1]), "".join(lines[frontmatter_end + 1:])
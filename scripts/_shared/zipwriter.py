@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import os
+import struct
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+from _shared.timing import phase
+
+# Minimal zip writer for members that are already compressed. zipfile can only
+# compress as it writes; this lets callers deflate in parallel (or reuse bytes
+# from an older archive) and still emit a standard archive in a fixed order.
+
+STORED = 0
+DEFLATED = 8
+
+_LOCAL = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL = struct.Struct("<IHHHHHHIIIHHHHHII")
+_EOCD = struct.Struct("<IHHHHIIH")
+
+_VERSION = 20  # 2.0: deflate, no zip64
+_UNIX = 3
+_UTF8_FLAG = 0x800
+_LIMIT = 0xFFFFFFFF
+
+ALREADY_COMPRESSED_SUFFIXES = {
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".whl", ".jar",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".mp4", ".woff", ".woff2",
+}
+
+def dos_datetime(epoch: float) -> Tuple[int, int]:
+    t = time.gmtime(epoch)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1  # 1980-01-01 00:00:00
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+def reproducible_datetime() -> Tuple[int, int]:
+    """Fixed member timestamp: $SOURCE_DATE_EPOCH if set, else 1980-01-01."""
+    try:
+        return dos_datetime(int(os.environ["SOURCE_DATE_EPOCH"]))
+    except (KeyError, ValueError):
+        return dos_datetime(0)
+
+def zip_info(name: str, method: int, mode: int = 0o644) -> zipfile.ZipInfo:
+    """ZipInfo with the same fixed timestamp and Unix mode RawZipWriter writes."""
+    time_, date = reproducible_datetime()
+    info = zipfile.ZipInfo(name, ((date >> 9) + 1980, (date >> 5) & 0xF, date & 0x1F,
+                                  time_ >> 11, (time_ >> 5) & 0x3F, (time_ & 0x1F) * 2))
+    info.create_system = _UNIX
+    info.compress_type = method
+    info.external_attr = (0o100000 | mode) << 16
+    return info
+
+def fits_without_zip64(entries: Iterable[Tuple[str, int]]) -> bool:
+    """Whether members with these (name, uncompressed size) pairs surely fit RawZipWriter.
+
+    Conservative: assumes nothing shrinks and allows for deflate's worst-case
+    growth, so it can be answered before anything is compressed.
+    """
+    count = offset = 0
+    for name, size in entries:
+        count += 1
+        bound = size + size // 1000 + 64
+        if bound > _LIMIT:
+            return False
+        offset += _LOCAL.size + _CENTRAL.size + 2 * len(name.encode("utf-8")) + bound
+    return count <= 0xFFFF and offset + _EOCD.size <= _LIMIT
+
+@dataclass
+class RawMember:
+    name: str
+    method: int
+    crc: int
+    file_size: int
+    data: bytes  # already compressed with `method`
+    mode: int = 0o644
+
+def compress_member(name: str, raw: bytes, *, level: int = 6, store_ratio: float = 0.95, mode: int = 0o644,
+                    crc: Optional[int] = None) -> RawMember:
+    """Deflate `raw`, falling back to STORED when deflate does not pay off.
+
+    A member is stored when level is 0, its suffix marks it as already compressed,
+    or the deflated size is not below `store_ratio` of the original. Pass `crc`
+    if the caller already has zlib.crc32(raw).
+    """
+    crc = zlib.crc32(raw) if crc is None else crc
+    suffix = os.path.splitext(name)[1].lower()
+    if level > 0 and raw and suffix not in ALREADY_COMPRESSED_SUFFIXES:
+        with phase("compress", name):
+            c = zlib.compressobj(level, zlib.DEFLATED, -15)
+            packed = c.compress(raw) + c.flush()
+        if len(packed) < len(raw) * store_ratio:
+            return RawMember(name, DEFLATED, crc, len(raw), packed, mode)
+    return RawMember(name, STORED, crc, len(raw), raw, mode)
+
+def read_raw_member(f: BinaryIO, info: zipfile.ZipInfo, mode: int = 0o644) -> RawMember:
+    """Copy a member's compressed bytes out of an existing archive without inflating them."""
+    f.seek(info.header_offset)
+    header = f.read(_LOCAL.size)
+    fields = _LOCAL.unpack(header)
+    if fields[0] != 0x04034B50:
+        raise ValueError(f"{info.filename}: bad local header")
+    f.seek(fields[9] + fields[10], os.SEEK_CUR)  # name + extra
+    data = f.read(info.compress_size)
+    return RawMember(info.filename, info.compress_type, info.CRC, info.file_size, data, mode)
+
+class RawZipWriter:
+    """Append pre-compressed members to a binary stream, then write the directory."""
+
+    def __init__(self, fileobj: BinaryIO, date_time: Optional[Tuple[int, int]] = None):
+        self._f = fileobj
+        self._time, self._date = date_time or reproducible_datetime()
+        self._central: List[bytes] = []
+        self._offset = 0
+
+    def _write(self, b: bytes) -> None:
+        self._f.write(b)
+        self._offset += len(b)
+
+    def add(self, m: RawMember) -> None:
+        if max(m.file_size, len(m.data), self._offset) > _LIMIT:
+            raise ValueError(f"{m.name}: archive would need zip64, which this writer does not support")
+        name = m.name.encode("utf-8")
+        flags = 0 if name.isascii() else _UTF8_FLAG
+        header_offset = self._offset
+        self._write(_LOCAL.pack(0x04034B50, _VERSION, flags, m.method, self._time, self._date,
+                                m.crc, len(m.data), m.file_size, len(name), 0))
+        self._write(name)
+        self._write(m.data)
+        self._central.append(_CENTRAL.pack(
+            0x02014B50, (_UNIX << 8) | _VERSION, _VERSION, flags, m.method, self._time, self._date,
+            m.crc, len(m.data), m.file_size, len(name), 0, 0, 0, 0,
+            (0o100000 | m.mode) << 16, header_offset,
+        ) + name)
+
+    def close(self, comment: bytes = b"") -> None:
+        if len(comment) > 0xFFFF:
+            raise ValueError("zip comment longer than 65535 bytes")
+        cd_offset = self._offset
+        for rec in self._central:
+            self._write(rec)
+        n = len(self._central)
+        if n > 0xFFFF:
+            raise ValueError("too many members for a non-zip64 archive")
+        self._write(_EOCD.pack(0x06054B50, 0, 0, n, n, self._offset - cd_offset, cd_offset, len(comment)))
+        self._write(comment)
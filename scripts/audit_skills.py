@@ -1,32 +1,145 @@
 #!/usr/bin/env python3
+"""Validate + scan every skill folder under a directory.
+
+By default validation and scanning run in-process as library calls, with skills
+spread across a process pool (one worker per core unless --jobs says otherwise).
+--subprocess keeps the original behaviour of launching one interpreter per check.
+"""
 from __future__ import annotations
 
 import argparse
-from pathlib import Path
+import os
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from _shared.cache import FileCache
+from _shared.snapshot import SkillSnapshot
+from _shared.timing import TIMINGS, Event, add_timing_args, phase, start_timing
+from catalog import Catalog, prime_snapshot
+
+from security_scan import ScanLimits, add_limit_args, get_engine, limits_from_args, report_lines as scan_report_lines, scan_skill
+from validate_skill import validate_skill
+
+@dataclass
+class SkillAudit:
+    name: str
+    ok: bool
+    validation: List[str] = field(default_factory=list)
+    scan: List[str] = field(default_factory=list)
+    cache_entries: Dict[str, Any] = field(default_factory=dict)
+    timing_events: List[Event] = field(default_factory=list)
+
+def audit_skill(skill: Path, cache: Optional[FileCache] = None, rule_files: Tuple[str, ...] = (), limits: ScanLimits = ScanLimits(), primer: Optional[Dict[str, Any]] = None) -> SkillAudit:
+    cache = cache or FileCache.disabled()
+    # One snapshot per skill: validation and scanning share every read and parse.
+    snapshot = SkillSnapshot(skill)
+    if primer:
+        prime_snapshot(snapshot, primer)
+    with phase("audit_skill", skill.name):
+        try:
+            result = validate_skill(skill, cache, snapshot)
+            ok, validation = result.ok, result.report_lines()
+        except Exception as e:
+            ok, validation = False, [f"❌ Validation crashed: {e!r}"]
+        try:
+            scan = scan_report_lines(scan_skill(skill, cache, get_engine(rule_files), limits, snapshot))
+        except Exception as e:
+            scan = [f"⚠️  Security scan crashed: {e!r}"]
+    return SkillAudit(name=skill.name, ok=ok, validation=validation, scan=scan)
+
+def _audit_worker(job: Tuple[Path, bool, Dict[str, Any], Tuple[str, ...], ScanLimits, Dict[str, Any], bool]) -> SkillAudit:
+    skill, use_cache, entries, rule_files, limits, primer, timed = job
+    if timed:
+        TIMINGS.enable()
+    cache = FileCache(None, entries, enabled=use_cache)
+    audit = audit_skill(skill, cache, rule_files, limits, primer)
+    # Ship updated entries (and timings) back; only the parent writes the cache and reports.
+    audit.cache_entries = cache.entries() if use_cache else {}
+    audit.timing_events = TIMINGS.drain()
+    return audit
+
+def audit_all(skills: List[Path], jobs: int, cache: Optional[FileCache] = None, rule_files: Tuple[str, ...] = (), limits: ScanLimits = ScanLimits(), catalog: Optional[Catalog] = None) -> List[SkillAudit]:
+    cache = cache or FileCache.disabled()
+    primers = {s: catalog.primer(s) if catalog else {} for s in skills}
+    if jobs <= 1 or len(skills) <= 1:
+        return [audit_skill(s, cache, rule_files, limits, primers[s]) for s in skills]
+    work = [(s, cache.enabled, cache.subset(s), rule_files, limits, primers[s], TIMINGS.enabled) for s in skills]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(skills))) as pool:
+        # map() preserves input order, so the report stays sorted by skill name.
+        audits = list(pool.map(_audit_worker, work, chunksize=max(1, len(skills) // (jobs * 4))))
+    for audit in audits:
+        cache.merge(audit.cache_entries)
+        TIMINGS.merge(audit.timing_events)
+        audit.cache_entries, audit.timing_events = {}, []
+    return audits
 
 def run(cmd: list[str]) -> int:
     p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
     print(p.stdout.rstrip())
     return p.returncode
 
+def audit_via_subprocess(skills: List[Path], no_cache: bool = False, rule_files: Tuple[str, ...] = (), limits: ScanLimits = ScanLimits()) -> int:
+    extra = ["--no-cache"] if no_cache else []
+    scan_extra = [arg for f in rule_files for arg in ("--rules", f)]
+    scan_extra += ["--max-bytes", str(limits.max_bytes), "--stream-threshold", str(limits.stream_threshold)]
+    failures = 0
+    for skill in skills:
+        print(f"\n=== {skill.name} ===")
+        rc1 = run([sys.executable, str(Path(__file__).parent / "validate_skill.py"), str(skill), *extra])
+        run([sys.executable, str(Path(__file__).parent / "security_scan.py"), str(skill), *extra, *scan_extra])
+        if rc1 != 0:
+            failures += 1
+    return failures
+
 def main() -> None:
     ap = argparse.ArgumentParser(description="Validate + scan all skills under a directory.")
     ap.add_argument("--skills-dir", default=".claude/skills", help="Directory containing skill folders")
+    ap.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Worker processes for the in-process audit (default: CPU count)")
+    ap.add_argument("--subprocess", action="store_true", help="Run validate_skill.py / security_scan.py as separate processes per skill (legacy mode)")
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and do not update the per-file result cache")
+    ap.add_argument("--rules", action="append", default=[], metavar="FILE", help="Extra JSON rule pack for the security scan (repeatable)")
+    ap.add_argument("--catalog", action="store_true", help="Refresh the skills-dir catalog and reuse its frontmatter/spec parses")
+    add_limit_args(ap)
+    add_timing_args(ap)
     args = ap.parse_args()
+    start_timing(args, "audit_skills")
+    limits = limits_from_args(args)
 
     skills_dir = Path(args.skills_dir).expanduser().resolve()
     if not skills_dir.exists():
         raise SystemExit(f"Not found: {skills_dir}")
 
-    failures = 0
-    for skill in sorted([p for p in skills_dir.iterdir() if p.is_dir()]):
-        print(f"\n=== {skill.name} ===")
-        rc1 = run([sys.executable, str(Path(__file__).parent / "validate_skill.py"), str(skill)])
-        run([sys.executable, str(Path(__file__).parent / "security_scan.py"), str(skill)])
-        if rc1 != 0:
-            failures += 1
+    skills = sorted([p for p in skills_dir.iterdir() if p.is_dir()])
+    rule_files = tuple(str(Path(f).expanduser().resolve()) for f in args.rules)
+    try:
+        get_engine(rule_files)  # fail fast on a bad rule pack, before any workers start
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    if args.subprocess:
+        failures = audit_via_subprocess(skills, no_cache=args.no_cache, rule_files=rule_files, limits=limits)
+    else:
+        cache = FileCache.for_skills_dir(skills_dir, enabled=not args.no_cache)
+        catalog = Catalog.for_skills_dir(skills_dir) if args.catalog else None
+        if catalog is not None:
+            catalog.refresh(skills_dir)
+        try:
+            audits = audit_all(skills, args.jobs, cache, rule_files, limits, catalog)
+        finally:
+            if catalog is not None:
+                catalog.close()
+        cache.save()
+        failures = 0
+        for audit in audits:
+            print(f"\n=== {audit.name} ===")
+            print("\n".join(audit.validation))
+            print("\n".join(audit.scan))
+            if not audit.ok:
+                failures += 1
 
     if failures:
         raise SystemExit(f"\n❌ Audit finished with {failures} validation failure(s).")
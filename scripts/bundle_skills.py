@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Pack many skill folders into one content-addressed bundle, or extract one.
+
+Bundle layout (a standard zip):
+- bundle.json         which files each skill has, by sha256
+- blobs/<sha256>      each distinct file content, compressed once
+
+Identical files shared across skills (vendored _fs.py, reference docs, fixtures)
+are stored a single time. `extract` rebuilds the usual <skill-name>/ roots.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from _shared.manifest import file_digest
+from _shared.snapshot import SkillFile
+from _shared.timing import add_timing_args, phase, start_timing
+from _shared.zipwriter import RawMember, compress_member, fits_without_zip64
+from package_skill import bounded_map, collect_files, normalized_mode, read_hashed, write_zip, write_zip64
+
+BUNDLE_FORMAT = "skill-forge-bundle"
+BUNDLE_VERSION = 1
+MANIFEST_NAME = "bundle.json"
+
+def build_bundle(skill_dirs: List[Path], out: Path, *, level: int, store_ratio: float, jobs: int) -> Tuple[int, int]:
+    """Write the bundle; returns (files, distinct blobs)."""
+    skills: Dict[str, Dict[str, dict]] = {}
+    blob_files: Dict[str, SkillFile] = {}
+    n_files = 0
+    for skill_dir in sorted(skill_dirs, key=lambda p: p.name):
+        if skill_dir.name in skills:
+            raise SystemExit(f"Duplicate skill name in bundle: {skill_dir.name}")
+        files: Dict[str, dict] = {}
+        for _, f in collect_files(skill_dir):
+            with phase("hash", f.path):
+                digest = file_digest(f)[0]
+            blob_files.setdefault(digest, f)
+            files[f.rel] = {"sha256": digest, "size": f.size, "mode": normalized_mode(f)}
+            n_files += 1
+        skills[skill_dir.name] = {"files": files}
+
+    manifest = {"format": BUNDLE_FORMAT, "version": BUNDLE_VERSION, "skills": skills}
+    manifest_bytes = json.dumps(manifest, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    blobs = sorted(blob_files.items(), key=lambda item: item[0])
+
+    def blob(item: Tuple[str, SkillFile]) -> RawMember:
+        digest, f = item
+        return compress_member(f"blobs/{digest}", read_hashed(f, digest), level=level, store_ratio=store_ratio)
+
+    # Same as package_skill: blobs are written as they are compressed, with a
+    # bounded window in flight, and zipfile takes over when zip64 is needed.
+    if not fits_without_zip64([(MANIFEST_NAME, len(manifest_bytes))] + [(f"blobs/{d}", f.size) for d, f in blobs]):
+        sources = ((f"blobs/{d}", read_hashed(f, d), 0o644, level) for d, f in blobs)
+        write_zip64(out, itertools.chain([(MANIFEST_NAME, manifest_bytes, 0o644, level)], sources), store_ratio)
+        return n_files, len(blobs)
+    members = bounded_map(blob, ((item, item[1].size) for item in blobs), jobs)
+    try:
+        write_zip(out, itertools.chain([compress_member(MANIFEST_NAME, manifest_bytes, level=level, store_ratio=store_ratio)], members))
+    finally:
+        members.close()
+    return n_files, len(blobs)
+
+def extract_bundle(bundle: Path, dest: Path) -> Tuple[int, int]:
+    """Recreate every <skill-name>/ tree under dest; returns (skills, files)."""
+    dest = dest.resolve()
+    with zipfile.ZipFile(bundle) as zf:
+        manifest = json.loads(zf.read(MANIFEST_NAME))
+        if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version") != BUNDLE_VERSION:
+            raise SystemExit(f"Not a supported skill bundle: {bundle}")
+
+        # Group targets by blob so shared content is inflated once.
+        targets: Dict[str, List[Tuple[Path, int]]] = {}
+        for skill, entry in manifest["skills"].items():
+            for rel, meta in entry["files"].items():
+                out = (dest / skill / rel).resolve()
+                if dest not in out.parents:
+                    raise SystemExit(f"Refusing to extract outside destination: {skill}/{rel}")
+                targets.setdefault(meta["sha256"], []).append((out, int(meta.get("mode", 0o644))))
+
+        n_files = 0
+        for digest, outs in sorted(targets.items()):
+            with phase("extract", outs[0][0].name):
+                data = zf.read(f"blobs/{digest}")
+                if hashlib.sha256(data).hexdigest() != digest:
+                    raise SystemExit(f"Corrupt bundle: blob {digest} does not match its hash")
+                for out, mode in outs:
+                    out.parent.mkdir(parents=True, exist_ok=True)
+                    out.write_bytes(data)
+                    os.chmod(out, mode)
+                    n_files += 1
+    return len(manifest["skills"]), n_files
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Pack skill folders into one deduplicated bundle, or extract one.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    pk = sub.add_parser("pack", help="Bundle skill folders")
+    pk.add_argument("skill_dirs", nargs="+", help="Skill folders, or one directory of skill folders")
+    pk.add_argument("--out", required=True, help="Output bundle path")
+    pk.add_argument("--level", type=int, default=6, choices=range(0, 10), metavar="0-9", help="Deflate level (default: 6)")
+    pk.add_argument("--store-threshold", type=float, default=0.95, help="Store blobs unless deflate shrinks them below this ratio (default: 0.95)")
+    pk.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Compression threads (default: CPU count)")
+
+    ex = sub.add_parser("extract", help="Rebuild <skill-name>/ folders from a bundle")
+    ex.add_argument("bundle", help="Bundle zip")
+    ex.add_argument("--dest", default=".", help="Destination directory (default: current directory)")
+    for p in (pk, ex):
+        add_timing_args(p)
+
+    args = ap.parse_args()
+    start_timing(args, f"bundle_skills {args.cmd}")
+
+    if args.cmd == "pack":
+        dirs = [Path(d).expanduser().resolve() for d in args.skill_dirs]
+        for d in dirs:
+            if not d.is_dir():
+                raise SystemExit(f"Not a directory: {d}")
+        if len(dirs) == 1 and not (dirs[0] / "SKILL.md").exists():
+            dirs = [p for p in dirs[0].iterdir() if p.is_dir() and (p / "SKILL.md").exists()]
+        missing = [d.name for d in dirs if not (d / "SKILL.md").exists()]
+        if missing:
+            raise SystemExit(f"Missing SKILL.md in: {missing}")
+        if not dirs:
+            raise SystemExit("No skill folders found")
+        out = Path(args.out).expanduser().resolve()
+        try:
+            n_files, n_blobs = build_bundle(dirs, out, level=args.level, store_ratio=args.store_threshold, jobs=args.jobs)
+        except ValueError as e:
+            raise SystemExit(f"Bundling failed: {e}")
+        print(f"✅ Bundled {len(dirs)} skill(s): {out}")
+        print(f"   Files: {n_files}  Distinct blobs: {n_blobs}  Size: {out.stat().st_size} bytes")
+        return
+
+    bundle = Path(args.bundle).expanduser().resolve()
+    if not bundle.exists():
+        raise SystemExit(f"Not found: {bundle}")
+    n_skills, n_files = extract_bundle(bundle, Path(args.dest).expanduser())
+    print(f"✅ Extracted {n_skills} skill(s), {n_files} file(s) to: {Path(args.dest).expanduser().resolve()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Indexed catalog of every skill under a skills directory (stdlib sqlite3).
+
+The index holds frontmatter fields, skill.spec.json fields, parsed allowed-tools,
+triggers and per-file hashes. Refresh is incremental: files whose size and mtime
+are unchanged are not re-read, and SKILL.md / skill.spec.json are only re-parsed
+when they change.
+
+Examples:
+  python scripts/catalog.py --skills-dir .claude/skills --archetype api-wrapper
+  python scripts/catalog.py --allows Write --risk high --no-refresh
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from _shared.cache import fingerprint
+from _shared.frontmatter import parse_allowed_tools
+from _shared.snapshot import SkillSnapshot
+from _shared.timing import add_timing_args, phase, start_timing
+from package_skill import EXCLUDE_DIRS
+from validate_skill import link_targets
+
+CATALOG_FILENAME = ".skill-forge-catalog.sqlite"
+CATALOG_SCHEMA = "1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS skills(
+    dir TEXT PRIMARY KEY,
+    name TEXT, title TEXT, description TEXT, license TEXT, allowed_tools TEXT,
+    archetype TEXT, risk_level TEXT, entry_point TEXT,
+    frontmatter TEXT, spec TEXT, links TEXT,
+    skill_md_size INTEGER, skill_md_mtime_ns INTEGER,
+    spec_size INTEGER, spec_mtime_ns INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS tools(skill TEXT, tool TEXT, PRIMARY KEY(skill, tool));
+CREATE TABLE IF NOT EXISTS triggers(skill TEXT, kind TEXT, text TEXT);
+CREATE TABLE IF NOT EXISTS files(skill TEXT, rel TEXT, size INTEGER, mtime_ns INTEGER, sha256 TEXT, PRIMARY KEY(skill, rel));
+CREATE INDEX IF NOT EXISTS skills_archetype ON skills(archetype);
+CREATE INDEX IF NOT EXISTS skills_risk ON skills(risk_level);
+CREATE INDEX IF NOT EXISTS tools_tool ON tools(tool);
+CREATE INDEX IF NOT EXISTS triggers_skill ON triggers(skill);
+"""
+
+def _sig(st: Any) -> Tuple[int, int]:
+    return st.st_size, st.st_mtime_ns
+
+class Catalog:
+    def __init__(self, path: Path):
+        self.path = path
+        self.db = sqlite3.connect(str(path))
+        self.db.row_factory = sqlite3.Row
+        row = None
+        try:
+            row = self.db.execute("SELECT value FROM meta WHERE key='schema'").fetchone()
+        except sqlite3.OperationalError:
+            pass
+        if row is None or row["value"] != CATALOG_SCHEMA:
+            for t in ("meta", "skills", "tools", "triggers", "files"):
+                self.db.execute(f"DROP TABLE IF EXISTS {t}")
+        self.db.executescript(SCHEMA)
+        self.db.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('schema', ?)", (CATALOG_SCHEMA,))
+        self.db.commit()
+
+    @classmethod
+    def for_skills_dir(cls, skills_dir: Path) -> "Catalog":
+        return cls(skills_dir / CATALOG_FILENAME)
+
+    def close(self) -> None:
+        self.db.close()
+
+    # --- refresh -----------------------------------------------------------
+
+    def refresh(self, skills_dir: Path) -> Dict[str, int]:
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        present = sorted(p for p in skills_dir.iterdir() if p.is_dir() and (p / "SKILL.md").exists())
+        known = {r["dir"] for r in self.db.execute("SELECT dir FROM skills")}
+        with self.db:
+            for skill_dir in present:
+                with phase("catalog_refresh", skill_dir.name):
+                    changed = self._refresh_skill(skill_dir)
+                if skill_dir.name not in known:
+                    stats["added"] += 1
+                elif changed:
+                    stats["updated"] += 1
+                else:
+                    stats["unchanged"] += 1
+            for gone in known - {p.name for p in present}:
+                self._delete(gone)
+                stats["removed"] += 1
+        return stats
+
+    def _delete(self, skill: str) -> None:
+        for t, col in (("skills", "dir"), ("tools", "skill"), ("triggers", "skill"), ("files", "skill")):
+            self.db.execute(f"DELETE FROM {t} WHERE {col}=?", (skill,))
+
+    def _refresh_skill(self, skill_dir: Path) -> bool:
+        skill = skill_dir.name
+        snapshot = SkillSnapshot(skill_dir)
+        old = {r["rel"]: r for r in self.db.execute("SELECT rel, size, mtime_ns, sha256 FROM files WHERE skill=?", (skill,))}
+        seen = set()
+        changed = False
+        for f in snapshot.files():
+            if any(part in EXCLUDE_DIRS for part in Path(f.rel).parts):
+                continue
+            try:
+                size, mtime = _sig(f.stat)
+            except OSError:
+                continue
+            seen.add(f.rel)
+            prev = old.get(f.rel)
+            if prev is not None and prev["size"] == size and prev["mtime_ns"] == mtime:
+                continue
+            digest = hashlib.sha256(f.data).hexdigest()
+            self.db.execute("INSERT OR REPLACE INTO files(skill, rel, size, mtime_ns, sha256) VALUES (?, ?, ?, ?, ?)", (skill, f.rel, size, mtime, digest))
+            changed = changed or prev is None or prev["sha256"] != digest
+        for rel in set(old) - seen:
+            self.db.execute("DELETE FROM files WHERE skill=? AND rel=?", (skill, rel))
+            changed = True
+
+        row = self.db.execute("SELECT skill_md_size, skill_md_mtime_ns, spec_size, spec_mtime_ns FROM skills WHERE dir=?", (skill,)).fetchone()
+        md = snapshot.get("SKILL.md")
+        spec_file = snapshot.get("skill.spec.json")
+        md_sig = _sig(md.stat) if md else (None, None)
+        spec_sig = _sig(spec_file.stat) if spec_file else (None, None)
+        if row is not None and (row["skill_md_size"], row["skill_md_mtime_ns"]) == md_sig and (row["spec_size"], row["spec_mtime_ns"]) == spec_sig:
+            return changed
+
+        fm_data: Dict[str, str] = {}
+        fm_json: Optional[str] = None
+        links: List[str] = []
+        spec: Dict[str, Any] = {}
+        spec_json: Optional[str] = None
+        errors: List[str] = []
+        if md is not None:
+            try:
+                fm = md.frontmatter
+                if fm is not None:
+                    fm_data = fm.data
+                    fm_json = json.dumps(asdict(fm))
+                else:
+                    errors.append("SKILL.md has no frontmatter")
+                links = link_targets(md.text)
+            except Exception as e:
+                errors.append(f"SKILL.md: {e}")
+        if spec_file is not None:
+            try:
+                loaded = spec_file.json()
+                if isinstance(loaded, dict):
+                    spec = loaded
+                    spec_json = json.dumps(spec)
+                else:
+                    errors.append("skill.spec.json: not an object")
+            except Exception as e:
+                errors.append(f"skill.spec.json: {e}")
+
+        allowed = parse_allowed_tools(fm_data.get("allowed-tools", ""))
+        self.db.execute(
+            "INSERT OR REPLACE INTO skills(dir, name, title, description, license, allowed_tools, archetype, risk_level, entry_point, "
+            "frontmatter, spec, links, skill_md_size, skill_md_mtime_ns, spec_size, spec_mtime_ns, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (skill, fm_data.get("name"), spec.get("title"), fm_data.get("description") or spec.get("description"),
+             fm_data.get("license"), ", ".join(allowed), spec.get("archetype"), spec.get("risk_level"), spec.get("entry_point"),
+             fm_json, spec_json, json.dumps(links), *md_sig, *spec_sig, "; ".join(errors) or None),
+        )
+        self.db.execute("DELETE FROM tools WHERE skill=?", (skill,))
+        self.db.executemany("INSERT OR IGNORE INTO tools(skill, tool) VALUES (?, ?)", [(skill, t) for t in allowed])
+        self.db.execute("DELETE FROM triggers WHERE skill=?", (skill,))
+        for kind in ("triggers", "anti_triggers"):
+            items = spec.get(kind) or []
+            if isinstance(items, list):
+                self.db.executemany("INSERT INTO triggers(skill, kind, text) VALUES (?, ?, ?)", [(skill, kind, str(t)) for t in items])
+        return True
+
+    # --- queries -----------------------------------------------------------
+
+    def query(self, *, archetype: Optional[str] = None, risk: Optional[str] = None, allows: Optional[List[str]] = None,
+              name: Optional[str] = None, trigger: Optional[str] = None, limit: Optional[int] = None) -> List[sqlite3.Row]:
+        sql = "SELECT * FROM skills WHERE 1=1"
+        params: List[Any] = []
+        if archetype:
+            sql += " AND archetype=?"
+            params.append(archetype)
+        if risk:
+            sql += " AND risk_level=?"
+            params.append(risk)
+        for tool in allows or []:
+            sql += " AND dir IN (SELECT skill FROM tools WHERE tool=?)"
+            params.append(tool)
+        if name:
+            sql += " AND (dir GLOB ? OR name GLOB ?)"
+            params += [name, name]
+        if trigger:
+            sql += " AND dir IN (SELECT skill FROM triggers WHERE kind='triggers' AND text LIKE ?)"
+            params.append(f"%{trigger}%")
+        sql += " ORDER BY dir"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.db.execute(sql, params).fetchall()
+
+    def content_key(self) -> str:
+        """Changes whenever any indexed SKILL.md or skill.spec.json changes (or skills come and go)."""
+        rows = self.db.execute("SELECT dir, skill_md_size, skill_md_mtime_ns, spec_size, spec_mtime_ns FROM skills ORDER BY dir").fetchall()
+        return fingerprint([tuple(r) for r in rows])
+
+    def trigger_docs(self) -> List[Dict[str, Any]]:
+        """Per skill: description, triggers and anti-triggers, plus the signatures they came from."""
+        docs: Dict[str, Dict[str, Any]] = {}
+        for r in self.db.execute("SELECT dir, description, skill_md_size, skill_md_mtime_ns, spec_size, spec_mtime_ns FROM skills ORDER BY dir"):
+            docs[r["dir"]] = {
+                "skill": r["dir"], "description": r["description"] or "", "triggers": [], "anti_triggers": [],
+                "sig": [r["skill_md_size"], r["skill_md_mtime_ns"], r["spec_size"], r["spec_mtime_ns"]],
+            }
+        for r in self.db.execute("SELECT skill, kind, text FROM triggers ORDER BY rowid"):
+            if r["skill"] in docs and r["kind"] in ("triggers", "anti_triggers"):
+                docs[r["skill"]][r["kind"]].append(r["text"])
+        return list(docs.values())
+
+    def primer(self, skill_dir: Path) -> Dict[str, Any]:
+        """Indexed parse results for one skill, tagged with the file signatures they came from.
+
+        Picklable, so audit can hand it to worker processes; see prime_snapshot.
+        """
+        row = self.db.execute("SELECT * FROM skills WHERE dir=?", (skill_dir.name,)).fetchone()
+        if row is None:
+            return {}
+        primer: Dict[str, Any] = {}
+        if row["frontmatter"] is not None:
+            primer["SKILL.md"] = {"sig": [row["skill_md_size"], row["skill_md_mtime_ns"]], "frontmatter": json.loads(row["frontmatter"]), "links": json.loads(row["links"] or "[]")}
+        if row["spec"] is not None:
+            primer["skill.spec.json"] = {"sig": [row["spec_size"], row["spec_mtime_ns"]], "json": json.loads(row["spec"])}
+        return primer
+
+def prime_snapshot(snapshot: SkillSnapshot, primer: Dict[str, Any]) -> None:
+    """Seed a snapshot with catalog parse results whose file signature is still current."""
+    for rel, entry in primer.items():
+        f = snapshot.get(rel)
+        if f is None:
+            continue
+        try:
+            if list(_sig(f.stat)) != entry["sig"]:
+                continue
+        except OSError:
+            continue
+        f.prime(**{k: v for k, v in entry.items() if k != "sig"})
+
+def format_row(row: sqlite3.Row) -> str:
+    flag = "  ⚠️ " + row["error"] if row["error"] else ""
+    return f"- {row['dir']}  archetype={row['archetype'] or '?'} risk={row['risk_level'] or '?'} tools=[{row['allowed_tools']}]{flag}"
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Build and query an index of all skills under a directory.")
+    ap.add_argument("--skills-dir", default=".claude/skills", help="Directory containing skill folders")
+    ap.add_argument("--db", help=f"Catalog path (default: <skills-dir>/{CATALOG_FILENAME})")
+    ap.add_argument("--no-refresh", action="store_true", help="Query the existing index without rescanning the tree")
+    ap.add_argument("--archetype", help="Only skills with this archetype")
+    ap.add_argument("--risk", choices=["low", "medium", "high"], help="Only skills with this risk level")
+    ap.add_argument("--allows", action="append", metavar="TOOL", help="Only skills whose allowed-tools include TOOL (repeatable)")
+    ap.add_argument("--name", help="Glob on folder or frontmatter name, e.g. 'git-*'")
+    ap.add_argument("--trigger", help="Substring match against skill.spec.json triggers")
+    ap.add_argument("--limit", type=int, default=50, help="Max rows printed (default: 50; 0 for all)")
+    ap.add_argument("--json", action="store_true", help="Print matching rows as JSON lines")
+    add_timing_args(ap)
+    args = ap.parse_args()
+    start_timing(args, "catalog")
+
+    skills_dir = Path(args.skills_dir).expanduser().resolve()
+    if not skills_dir.exists():
+        raise SystemExit(f"Not found: {skills_dir}")
+
+    catalog = Catalog(Path(args.db).expanduser().resolve()) if args.db else Catalog.for_skills_dir(skills_dir)
+    try:
+        if not args.no_refresh:
+            stats = catalog.refresh(skills_dir)
+            print(f"Catalog refreshed: added={stats['added']} updated={stats['updated']} unchanged={stats['unchanged']} removed={stats['removed']}")
+        with phase("catalog_query"):
+            rows = catalog.query(archetype=args.archetype, risk=args.risk, allows=args.allows, name=args.name, trigger=args.trigger)
+    finally:
+        catalog.close()
+
+    shown = rows[: args.limit] if args.limit else rows
+    if args.json:
+        for row in shown:
+            print(json.dumps({k: row[k] for k in ("dir", "name", "archetype", "risk_level", "entry_point", "allowed_tools", "error")}))
+    else:
+        print(f"Matches: {len(rows)}")
+        for row in shown:
+            print(format_row(row))
+    if len(shown) < len(rows):
+        print(f"... {len(rows) - len(shown)} more (raise --limit)")
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,19 @@
 from __future__ import annotations
 
 import argparse
+import csv
+import io
 import json
+import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, List, Tuple
 
-from _shared.templating import copy_template_tree
+from _shared.templating import TemplateError, copy_template_tree, load_template_tree
 from _shared.safe_delete import safe_rmtree
+from _shared.timing import add_timing_args, phase, start_timing
 
 NAME_RE = re.compile(r"^[a-z0-9-]{1,64}$")
 
@@ -72,6 +77,134 @@ def allowed_tools_for(risk: str) -> str:
         base.append("Write")
     return ", ".join(base)
 
+def generate_skill(skill_dir: Path, *, name: str, title: str, description: str, archetype: str, risk: str) -> None:
+    """Write one skill folder from its archetype template plus skill.spec.json."""
+    skill_dir.mkdir(parents=True, exist_ok=True)
+
+    variables: Dict[str, str] = {
+        "SKILL_NAME": name,
+        "SKILL_TITLE": title,
+        "DESCRIPTION": description,
+        "RISK_LEVEL": risk,
+        "ALLOWED_TOOLS": allowed_tools_for(risk),
+        "ARCHETYPE": archetype,
+        "ENTRY_POINT": ARCHETYPES[archetype]["entry_point"],
+    }
+
+    template_dir = Path(__file__).parent.parent / "templates" / archetype
+    with phase("render_tree", name):
+        copy_template_tree(template_dir, skill_dir, variables)
+
+    spec = {
+        "name": name,
+        "title": title,
+        "description": description,
+        "archetype": archetype,
+        "risk_level": risk,
+        "entry_point": ARCHETYPES[archetype]["entry_point"],
+        "triggers": ["TODO: add trigger 1", "TODO: add trigger 2", "TODO: add trigger 3"],
+        "anti_triggers": ["TODO: add anti-trigger 1", "TODO: add anti-trigger 2"],
+        "acceptance_tests": ["TODO: add acceptance test 1", "TODO: add acceptance test 2", "TODO: add acceptance test 3"],
+    }
+    (skill_dir / "skill.spec.json").write_text(json.dumps(spec, indent=2), encoding="utf-8")
+
+def read_manifest(path: Path) -> List[Dict[str, str]]:
+    """Rows from a .csv (header row) or JSONL manifest, each tagged with its source line."""
+    rows: List[Dict[str, str]] = []
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for row in reader:
+            row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+            row["_line"] = str(reader.line_num)
+            rows.append(row)
+        return rows
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            rows.append({"_line": str(lineno), "_error": f"invalid JSON: {e}"})
+            continue
+        if not isinstance(obj, dict):
+            rows.append({"_line": str(lineno), "_error": "row must be a JSON object"})
+            continue
+        row = {k: str(v).strip() for k, v in obj.items() if v is not None}
+        row["_line"] = str(lineno)
+        rows.append(row)
+    return rows
+
+def plan_row(row: Dict[str, str]) -> Dict[str, str]:
+    """Normalise one manifest row the way non-interactive mode does; raises ValueError."""
+    if "_error" in row:
+        raise ValueError(row["_error"])
+    title = row.get("title", "")
+    name = row.get("name", "") or slugify(title)
+    if not name:
+        raise ValueError("row needs name or title")
+    if not NAME_RE.match(name):
+        raise ValueError(f"invalid name {name!r}. Must match ^[a-z0-9-]{{1,64}}$")
+    description = row.get("description", "")
+    if not description:
+        raise ValueError("row needs description")
+    archetype = row.get("archetype", "") or "api-wrapper"
+    if archetype not in ARCHETYPES:
+        raise ValueError(f"unknown archetype {archetype!r}")
+    risk = (row.get("risk", "") or row.get("risk_level", "") or "low").lower()
+    if risk not in {"low", "medium", "high"}:
+        raise ValueError(f"invalid risk {risk!r}")
+    return {"name": name, "title": title or name.replace("-", " ").title(), "description": description, "archetype": archetype, "risk": risk}
+
+def forge_row(plan: Dict[str, str], out_root: Path, force: bool) -> Tuple[str, str]:
+    skill_dir = out_root / plan["name"]
+    if skill_dir.exists():
+        if not force:
+            return "skipped", "directory exists (use --force to overwrite)"
+        safe_rmtree(skill_dir)
+    generate_skill(skill_dir, **plan)
+    return "created", str(skill_dir)
+
+def run_manifest(manifest: Path, out_root: Path, *, force: bool, jobs: int, summary_path: Path) -> Dict[str, int]:
+    results: List[Dict[str, Any]] = []
+    work: List[Tuple[Dict[str, Any], Dict[str, str]]] = []
+    claimed: Dict[str, str] = {}
+    for row in read_manifest(manifest):
+        result: Dict[str, Any] = {"line": int(row["_line"]), "name": row.get("name", ""), "status": "", "detail": ""}
+        results.append(result)
+        try:
+            plan = plan_row(row)
+        except ValueError as e:
+            result.update(status="failed", detail=str(e))
+            continue
+        result["name"] = plan["name"]
+        if plan["name"] in claimed:
+            result.update(status="failed", detail=f"duplicate name (first on line {claimed[plan['name']]})")
+            continue
+        claimed[plan["name"]] = row["_line"]
+        work.append((result, plan))
+
+    # Load each archetype's template tree once up front; worker threads then share it.
+    for archetype in {plan["archetype"] for _, plan in work}:
+        load_template_tree(Path(__file__).parent.parent / "templates" / archetype)
+
+    out_root.mkdir(parents=True, exist_ok=True)
+
+    def run(item: Tuple[Dict[str, Any], Dict[str, str]]) -> None:
+        result, plan = item
+        try:
+            status, detail = forge_row(plan, out_root, force)
+        except Exception as e:
+            status, detail = "failed", f"{type(e).__name__}: {e}"
+        result.update(status=status, detail=detail)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        list(pool.map(run, work))
+
+    counts = {k: sum(1 for r in results if r["status"] == k) for k in ("created", "skipped", "failed")}
+    summary_path.write_text(json.dumps({"manifest": str(manifest), "output_dir": str(out_root), **counts, "results": results}, indent=2), encoding="utf-8")
+    return counts
+
 def main() -> None:
     ap = argparse.ArgumentParser(description="Skill Forge: scaffold a new Skill folder using archetypes.")
     ap.add_argument("--name", help="Skill name (lowercase-hyphen). If omitted, interactive mode will ask.")
@@ -82,7 +215,24 @@ def main() -> None:
     ap.add_argument("--output-dir", default=".claude/skills", help="Where to create the skill folder")
     ap.add_argument("--force", action="store_true", help="Overwrite if the folder already exists")
     ap.add_argument("--interactive", action="store_true", help="Interactive mode (recommended)")
+    ap.add_argument("--manifest", help="Generate many skills from a JSONL or CSV file of name,title,description,archetype,risk rows")
+    ap.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Worker threads for --manifest (default: CPU count)")
+    ap.add_argument("--summary", help="Where --manifest writes its results (default: <manifest>.summary.json)")
+    add_timing_args(ap)
     args = ap.parse_args()
+    start_timing(args, "forge")
+
+    if args.manifest:
+        manifest = Path(args.manifest).expanduser()
+        if not manifest.exists():
+            raise SystemExit(f"Not found: {manifest}")
+        summary_path = Path(args.summary).expanduser() if args.summary else manifest.with_name(manifest.name + ".summary.json")
+        counts = run_manifest(manifest, Path(args.output_dir).expanduser(), force=args.force, jobs=args.jobs, summary_path=summary_path)
+        print(f"✅ Manifest processed: created={counts['created']} skipped={counts['skipped']} failed={counts['failed']}")
+        print(f"   Summary: {summary_path}")
+        if counts["failed"]:
+            raise SystemExit(1)
+        return
 
     interactive = args.interactive or (not args.title and not args.name)
 
@@ -127,33 +277,10 @@ def main() -> None:
             return
         safe_rmtree(skill_dir)
 
-    skill_dir.mkdir(parents=True, exist_ok=True)
-
-    variables: Dict[str, str] = {
-        "SKILL_NAME": name,
-        "SKILL_TITLE": title,
-        "DESCRIPTION": description,
-        "RISK_LEVEL": risk,
-        "ALLOWED_TOOLS": allowed_tools_for(risk),
-        "ARCHETYPE": archetype,
-        "ENTRY_POINT": ARCHETYPES[archetype]["entry_point"],
-    }
-
-    template_dir = Path(__file__).parent.parent / "templates" / archetype
-    copy_template_tree(template_dir, skill_dir, variables)
-
-    spec = {
-        "name": name,
-        "title": title,
-        "description": description,
-        "archetype": archetype,
-        "risk_level": risk,
-        "entry_point": ARCHETYPES[archetype]["entry_point"],
-        "triggers": ["TODO: add trigger 1", "TODO: add trigger 2", "TODO: add trigger 3"],
-        "anti_triggers": ["TODO: add anti-trigger 1", "TODO: add anti-trigger 2"],
-        "acceptance_tests": ["TODO: add acceptance test 1", "TODO: add acceptance test 2", "TODO: add acceptance test 3"],
-    }
-    (skill_dir / "skill.spec.json").write_text(json.dumps(spec, indent=2), encoding="utf-8")
+    try:
+        generate_skill(skill_dir, name=name, title=title, description=description, archetype=archetype, risk=risk)
+    except TemplateError as e:
+        raise SystemExit(f"Template error: {e}")
 
     print(f"\n✅ Created skill '{name}' at: {skill_dir}")
     print("Next:")
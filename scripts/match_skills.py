@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Rank which skills a prompt would activate, and find colliding triggers.
+
+Skills are scored with BM25 over their description plus skill.spec.json triggers
+(trigger terms count double, and a trigger whose every term appears in the prompt
+adds a fixed bonus). A skill is suppressed when all terms of one of its
+anti_triggers appear in the prompt. Placeholder "TODO" triggers written by
+forge.py are ignored.
+
+The inverted index is built from the skill catalog (see catalog.py) and persisted
+next to it; it is only rebuilt when an indexed SKILL.md or skill.spec.json changes.
+
+Examples:
+  python scripts/match_skills.py --skills-dir .claude/skills "summarize my staged diff"
+  python scripts/match_skills.py --prompts prompts.txt --json
+  python scripts/match_skills.py --collisions
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from _shared.timing import add_timing_args, phase, start_timing
+from catalog import Catalog
+
+INDEX_FILENAME = ".skill-forge-triggers.json"
+INDEX_SCHEMA = 1
+
+K1 = 1.2
+B = 0.75
+TRIGGER_WEIGHT = 2
+TRIGGER_BONUS = 2.0
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "i", "in", "is", "it",
+    "me", "my", "of", "on", "or", "please", "that", "the", "this", "to", "we", "with", "you", "your",
+}
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+def _phrases(items: List[str]) -> List[List[str]]:
+    out = []
+    for item in items:
+        if item.strip().upper().startswith("TODO"):
+            continue
+        toks = sorted(set(tokenize(item)))
+        if toks:
+            out.append(toks)
+    return out
+
+class TriggerIndex:
+    def __init__(self, data: Dict[str, Any]):
+        self.key: str = data["key"]
+        self.skills: List[str] = data["skills"]
+        self.lengths: List[int] = data["lengths"]
+        self.avgdl: float = data["avgdl"] or 1.0
+        self.postings: Dict[str, List[List[int]]] = data["postings"]
+        self.triggers: List[List[List[str]]] = data["triggers"]
+        self.anti: List[List[List[str]]] = data["anti"]
+        self.raw_triggers: List[List[str]] = data["raw_triggers"]
+
+    @classmethod
+    def build(cls, docs: List[Dict[str, Any]], key: str) -> "TriggerIndex":
+        postings: Dict[str, List[List[int]]] = defaultdict(list)
+        lengths: List[int] = []
+        for i, doc in enumerate(docs):
+            tf: Dict[str, int] = defaultdict(int)
+            for t in tokenize(doc["description"]):
+                tf[t] += 1
+            for phrase in doc["triggers"]:
+                if phrase.strip().upper().startswith("TODO"):
+                    continue
+                for t in tokenize(phrase):
+                    tf[t] += TRIGGER_WEIGHT
+            for t, n in tf.items():
+                postings[t].append([i, n])
+            lengths.append(sum(tf.values()))
+        return cls({
+            "key": key,
+            "skills": [d["skill"] for d in docs],
+            "lengths": lengths,
+            "avgdl": (sum(lengths) / len(lengths)) if lengths else 1.0,
+            "postings": dict(postings),
+            "triggers": [_phrases(d["triggers"]) for d in docs],
+            "anti": [_phrases(d["anti_triggers"]) for d in docs],
+            "raw_triggers": [[t for t in d["triggers"] if not t.strip().upper().startswith("TODO")] for d in docs],
+        })
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["TriggerIndex"]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("schema") != INDEX_SCHEMA:
+            return None
+        return cls(data)
+
+    def save(self, path: Path) -> None:
+        data = {"schema": INDEX_SCHEMA, "key": self.key, "skills": self.skills, "lengths": self.lengths, "avgdl": self.avgdl,
+                "postings": self.postings, "triggers": self.triggers, "anti": self.anti, "raw_triggers": self.raw_triggers}
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def rank(self, prompt: str, top: int = 5) -> Tuple[List[Tuple[str, float]], List[str]]:
+        """Return ([(skill, score)] best first, [suppressed skills])."""
+        terms = set(tokenize(prompt))
+        n = len(self.skills)
+        scores: Dict[int, float] = defaultdict(float)
+        for t in terms:
+            plist = self.postings.get(t)
+            if not plist:
+                continue
+            idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for i, tf in plist:
+                norm = tf + K1 * (1 - B + B * self.lengths[i] / self.avgdl)
+                scores[i] += idf * tf * (K1 + 1) / norm
+        ranked: List[Tuple[str, float]] = []
+        suppressed: List[str] = []
+        for i, score in scores.items():
+            if any(terms.issuperset(a) for a in self.anti[i]):
+                suppressed.append(self.skills[i])
+                continue
+            score += TRIGGER_BONUS * sum(1 for trig in self.triggers[i] if terms.issuperset(trig))
+            ranked.append((self.skills[i], round(score, 4)))
+        ranked.sort(key=lambda x: (-x[1], x[0]))
+        return ranked[:top], sorted(suppressed)
+
+    def collisions(self, min_jaccard: float = 0.8) -> List[Dict[str, Any]]:
+        """Triggers from different skills whose term sets overlap at least min_jaccard.
+
+        Triggers with identical term sets are grouped first and reported once with
+        every skill that uses them (jaccard 1.0), however many copies there are.
+        Near duplicates are then found among the distinct term sets by prefix
+        filtering: with terms ordered rarest first, two sets with jaccard >= t share
+        a term within each one's first len - ceil(t * len) + 1 terms. Only those
+        prefix terms are indexed, so no pair is missed because its terms are common.
+        """
+        groups: Dict[FrozenSet[str], List[Tuple[int, str]]] = defaultdict(list)
+        for i, raws in enumerate(self.raw_triggers):
+            for raw in raws:
+                toks = frozenset(tokenize(raw))
+                if toks:
+                    groups[toks].append((i, raw))
+        sets = list(groups)
+        out: List[Dict[str, Any]] = []
+        for toks in sets:
+            if len({i for i, _ in groups[toks]}) > 1:
+                out.append(self._collision(groups[toks], 1.0))
+
+        df = Counter(t for toks in sets for t in toks)
+        by_term: Dict[str, List[int]] = defaultdict(list)
+        for g, toks in enumerate(sets):
+            ordered = sorted(toks, key=lambda t: (df[t], t))
+            prefix = ordered[: len(ordered) - math.ceil(min_jaccard * len(ordered) - 1e-9) + 1]
+            candidates = {c for t in prefix for c in by_term[t]}
+            for t in prefix:
+                by_term[t].append(g)
+            for c in candidates:
+                other = sets[c]
+                jac = len(toks & other) / len(toks | other)
+                members = groups[other] + groups[toks]
+                if jac >= min_jaccard and len({i for i, _ in members}) > 1:
+                    out.append(self._collision(members, jac))
+        out.sort(key=lambda x: (-x["jaccard"], -len(x["skills"]), x["skills"]))
+        return out
+
+    def _collision(self, members: List[Tuple[int, str]], jaccard: float) -> Dict[str, Any]:
+        raws = list(dict.fromkeys(raw for _, raw in members))
+        return {"skills": sorted({self.skills[i] for i, _ in members}), "triggers": raws, "count": len(members), "jaccard": round(jaccard, 3)}
+
+def load_index(skills_dir: Path, *, refresh: bool = True, rebuild: bool = False) -> Tuple[TriggerIndex, bool]:
+    """Open (and refresh) the catalog, then load the persisted index or rebuild it. Returns (index, rebuilt)."""
+    catalog = Catalog.for_skills_dir(skills_dir)
+    try:
+        if refresh:
+            catalog.refresh(skills_dir)
+        key = catalog.content_key()
+        path = skills_dir / INDEX_FILENAME
+        index = None if rebuild else TriggerIndex.load(path)
+        if index is not None and index.key == key:
+            return index, False
+        with phase("index_build"):
+            index = TriggerIndex.build(catalog.trigger_docs(), key)
+    finally:
+        catalog.close()
+    index.save(path)
+    return index, True
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Rank skills for a prompt and report colliding triggers.")
+    ap.add_argument("prompt", nargs="?", help="Prompt to match")
+    ap.add_argument("--skills-dir", default=".claude/skills", help="Directory containing skill folders")
+    ap.add_argument("--prompts", help="File with one prompt per line (batch mode)")
+    ap.add_argument("--top", type=int, default=5, help="Skills shown per prompt (default: 5)")
+    ap.add_argument("--collisions", action="store_true", help="Report overlapping triggers between skills")
+    ap.add_argument("--min-jaccard", type=float, default=0.8, help="Term overlap that counts as a collision (default: 0.8)")
+    ap.add_argument("--no-refresh", action="store_true", help="Use the catalog as-is without rescanning the tree")
+    ap.add_argument("--rebuild", action="store_true", help="Rebuild the persisted index even if it looks current")
+    ap.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    add_timing_args(ap)
+    args = ap.parse_args()
+    start_timing(args, "match_skills")
+
+    if not (args.prompt or args.prompts or args.collisions):
+        raise SystemExit("Provide a prompt, --prompts FILE or --collisions.")
+    skills_dir = Path(args.skills_dir).expanduser().resolve()
+    if not skills_dir.exists():
+        raise SystemExit(f"Not found: {skills_dir}")
+
+    index, rebuilt = load_index(skills_dir, refresh=not args.no_refresh, rebuild=args.rebuild)
+    if not args.json:
+        print(f"Index: {len(index.skills)} skill(s), {len(index.postings)} term(s){' (rebuilt)' if rebuilt else ''}")
+
+    prompts: List[str] = []
+    if args.prompt:
+        prompts.append(args.prompt)
+    if args.prompts:
+        prompts += [l.strip() for l in Path(args.prompts).read_text(encoding="utf-8").splitlines() if l.strip()]
+
+    for prompt in prompts:
+        with phase("rank", prompt[:80]):
+            ranked, suppressed = index.rank(prompt, args.top)
+        if args.json:
+            print(json.dumps({"prompt": prompt, "matches": [{"skill": s, "score": sc} for s, sc in ranked], "suppressed": suppressed}, ensure_ascii=False))
+            continue
+        print(f"\nPrompt: {prompt[:120]!r}")
+        if not ranked:
+            print("  (no matching skills)")
+        for skill, score in ranked:
+            print(f"  {score:8.3f}  {skill}")
+        if suppressed:
+            print(f"  suppressed by anti-triggers: {', '.join(suppressed[:10])}{' ...' if len(suppressed) > 10 else ''}")
+
+    if args.collisions:
+        with phase("collisions"):
+            found = index.collisions(args.min_jaccard)
+        if args.json:
+            for c in found:
+                print(json.dumps(c, ensure_ascii=False))
+            return
+        print(f"\nTrigger collisions (jaccard >= {args.min_jaccard}): {len(found)}")
+        for c in found[:50]:
+            names = ", ".join(c["skills"][:4]) + (f" (+{len(c['skills']) - 4} more)" if len(c["skills"]) > 4 else "")
+            print(f"  {c['jaccard']:.2f}  {len(c['skills'])} skills, {c['count']} triggers: {names}")
+            print(f"        {'  <->  '.join(repr(t) for t in c['triggers'][:3])}")
+        if len(found) > 50:
+            print(f"  ... {len(found) - 50} more (use --json for all)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""List packaged skills from their zip manifests without extracting anything.
+
+package_skill.py writes a manifest (frontmatter, spec fields, per-file sha256
+and sizes, context-size estimate) into the zip comment. This reads only the
+archive tail for each zip, so listing a directory of packages costs one small
+read per file however large the archives are.
+
+Examples:
+  python scripts/package_index.py dist/
+  python scripts/package_index.py dist/*.zip --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from _shared.manifest import read_zip_manifest
+from _shared.timing import add_timing_args, phase, start_timing
+
+def iter_zips(paths: List[str]) -> Iterator[Path]:
+    for raw in paths:
+        p = Path(raw).expanduser().resolve()
+        if p.is_dir():
+            yield from sorted(q for q in p.iterdir() if q.suffix == ".zip" and q.is_file())
+        elif p.exists():
+            yield p
+        else:
+            raise SystemExit(f"Not found: {p}")
+
+def read_index(paths: List[str]) -> List[Tuple[Path, Optional[Dict[str, Any]], Optional[str]]]:
+    """(zip, manifest, error) for every zip; manifest is None for foreign or unreadable zips."""
+    rows = []
+    for z in iter_zips(paths):
+        with phase("read_manifest", z.name):
+            try:
+                rows.append((z, read_zip_manifest(z), None))
+            except (OSError, ValueError) as e:
+                rows.append((z, None, str(e)))
+    return rows
+
+def format_row(z: Path, manifest: Optional[Dict[str, Any]], error: Optional[str]) -> str:
+    if manifest is None:
+        return f"- {z.name}  ⚠️ {error or 'no skill-forge manifest'}"
+    spec = manifest.get("spec") or {}
+    ctx = manifest.get("context") or {}
+    files = manifest.get("file_count", len(manifest.get("files") or {}))
+    return (f"- {z.name}  skill={manifest.get('skill')} archetype={spec.get('archetype') or '?'} "
+            f"risk={spec.get('risk_level') or '?'} files={files} bytes={manifest.get('total_bytes', 0)} "
+            f"~tokens={ctx.get('frontmatter_tokens', 0)}/{ctx.get('skill_md_tokens', 0)}/{ctx.get('text_tokens', 0)}")
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="List packaged skills by reading only each zip's manifest.")
+    ap.add_argument("paths", nargs="+", help="Zip files or directories containing them")
+    ap.add_argument("--json", action="store_true", help="Print one manifest per line as JSON")
+    ap.add_argument("--files", action="store_true", help="Keep per-file hashes in --json output")
+    add_timing_args(ap)
+    args = ap.parse_args()
+    start_timing(args, "package_index")
+
+    rows = read_index(args.paths)
+    if args.json:
+        for z, manifest, error in rows:
+            if manifest is not None and not args.files:
+                manifest = {k: v for k, v in manifest.items() if k != "files"}
+            print(json.dumps({"zip": str(z), "manifest": manifest, "error": error}, ensure_ascii=False))
+        return
+    print(f"Packages: {len(rows)}  (~tokens = frontmatter/SKILL.md/all text)")
+    for z, manifest, error in rows:
+        print(format_row(z, manifest, error))
+        if args.files and manifest is not None:
+            for rel, entry in sorted((manifest.get("files") or {}).items()):
+                print(f"    {entry['size']:>10}  {entry['sha256'][:12]}  {rel}")
+
+if __name__ == "__main__":
+    main()
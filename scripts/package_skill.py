@@ -2,17 +2,216 @@
 from __future__ import annotations
 
 import argparse
-from pathlib import Path
+import hashlib
+import itertools
+import os
+import re
+import threading
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from _shared.manifest import MANIFEST_FILENAME, build_manifest, manifest_bytes, manifest_comment, parse_comment
+from _shared.snapshot import SkillFile, SkillSnapshot
+from _shared.timing import add_timing_args, phase, start_timing
+from _shared.zipwriter import RawMember, RawZipWriter, compress_member, fits_without_zip64, read_raw_member, zip_info
 
 EXCLUDE_DIRS = {"__pycache__", ".git", ".svn", ".hg", "workspace"}
 EXCLUDE_SUFFIXES = {".zip", ".pyc"}
+T = TypeVar("T")
+# An archive member for write_zip64: (arcname, uncompressed bytes, mode, deflate level).
+Source = Tuple[str, bytes, int, int]
+
+LEGACY_TAG_RE = re.compile(rb"skill-forge level=(\d) store=(\d+(?:\.\d+)?)")
+# Source bytes handed to compression threads but not yet written out. Memory
+# stays near this however large the skill is (one file, if it is larger).
+MAX_INFLIGHT_BYTES = 64 * 1024 * 1024
+
+def collect_files(skill_dir: Path, snapshot: Optional[SkillSnapshot] = None) -> List[Tuple[str, SkillFile]]:
+    """(arcname, file) pairs in sorted arcname order, so archives do not depend on rglob order."""
+    snapshot = snapshot or SkillSnapshot(skill_dir)
+    files: List[Tuple[str, SkillFile]] = []
+    for f in snapshot.files():
+        if any(part in EXCLUDE_DIRS for part in f.path.parts):
+            continue
+        if f.path.suffix in EXCLUDE_SUFFIXES or f.rel == MANIFEST_FILENAME:
+            continue
+        files.append((f"{skill_dir.name}/{f.rel}", f))
+    files.sort(key=lambda item: item[0])
+    return files
+
+def normalized_mode(f: SkillFile) -> int:
+    return 0o755 if f.stat.st_mode & 0o100 else 0o644
+
+def settings_tag(level: int, store_ratio: float) -> bytes:
+    """Zip comment written before archives carried a manifest; still recognised for reuse."""
+    return f"skill-forge level={level} store={store_ratio}".encode("ascii")
+
+def comment_settings(comment: bytes) -> Optional[Dict[str, Any]]:
+    """How an earlier archive's members were compressed, from its manifest (or legacy tag) comment."""
+    manifest = parse_comment(comment)
+    if manifest is not None:
+        return manifest.get("settings")
+    legacy = LEGACY_TAG_RE.fullmatch(comment)
+    if legacy is None:
+        return None
+    return {"level": int(legacy.group(1)), "store": float(legacy.group(2))}
+
+class PreviousArchive:
+    """Central directory of an earlier build, for copying unchanged members verbatim."""
+
+    def __init__(self, path: Path, infos: Dict[str, zipfile.ZipInfo], f: BinaryIO):
+        self.path = path
+        self._infos = infos
+        self._f = f
+        self._lock = threading.Lock()
+        self.reused = 0
+
+    @classmethod
+    def open(cls, path: Path, settings: Dict[str, Any]) -> Optional["PreviousArchive"]:
+        """Reuse is only safe when the earlier build used the same compression settings."""
+        try:
+            with zipfile.ZipFile(path) as zf:
+                if comment_settings(zf.comment) != settings:
+                    return None
+                infos = {i.filename: i for i in zf.infolist()}
+            return cls(path, infos, path.open("rb"))
+        except (OSError, zipfile.BadZipFile):
+            return None
+
+    def reuse(self, arcname: str, raw: bytes, mode: int, crc: int) -> Optional[RawMember]:
+        info = self._infos.get(arcname)
+        if info is None or info.file_size != len(raw) or info.CRC != crc:
+            return None
+        with self._lock:
+            self.reused += 1
+            return read_raw_member(self._f, info, mode)
+
+    def close(self) -> None:
+        self._f.close()
+
+def read_hashed(f: SkillFile, digest: Optional[str]) -> bytes:
+    """The file's bytes: the snapshot's own if memoised (the very bytes the manifest
+    hashed), else a fresh read checked against the manifest's sha256."""
+    raw = f.read()
+    if digest is not None and not f.memoised and hashlib.sha256(raw).hexdigest() != digest:
+        raise ValueError(f"{f.rel} changed while it was being packaged; run again")
+    return raw
+
+def build_member(arcname: str, f: SkillFile, level: int, store_ratio: float, previous: Optional[PreviousArchive] = None,
+                 digest: Optional[str] = None) -> RawMember:
+    raw = read_hashed(f, digest)
+    mode = normalized_mode(f)
+    crc = zlib.crc32(raw)
+    if previous is not None:
+        member = previous.reuse(arcname, raw, mode, crc)
+        if member is not None:
+            return member
+    return compress_member(arcname, raw, level=level, store_ratio=store_ratio, mode=mode, crc=crc)
+
+def bounded_map(build: Callable[[T], RawMember], items: Iterable[Tuple[T, int]], jobs: int) -> Iterator[RawMember]:
+    """build(item) for each (item, source size), in order, with at most MAX_INFLIGHT_BYTES queued."""
+    # zlib releases the GIL while compressing, so threads give real parallelism here.
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        window: Deque[Tuple[Future, int]] = deque()
+        inflight = 0
+        try:
+            for item, size in items:
+                while window and inflight + size > MAX_INFLIGHT_BYTES:
+                    done, n = window.popleft()
+                    inflight -= n
+                    yield done.result()
+                window.append((pool.submit(build, item), size))
+                inflight += size
+            while window:
+                yield window.popleft()[0].result()
+        finally:
+            # Closed early (a failed write): don't compress what will never be written.
+            for pending, _ in window:
+                pending.cancel()
+
+def iter_members(files: List[Tuple[str, SkillFile]], level: int, store_ratio: float, jobs: int,
+                 previous: Optional[PreviousArchive] = None, digests: Optional[Dict[str, str]] = None) -> Iterator[RawMember]:
+    """build_member for each file, in order, through bounded_map."""
+    def build(item: Tuple[str, SkillFile]) -> RawMember:
+        arcname, f = item
+        return build_member(arcname, f, level, store_ratio, previous, digests.get(f.rel) if digests else None)
+    return bounded_map(build, ((item, item[1].size) for item in files), jobs)
+
+def write_zip(out: Path, members: Iterable[RawMember], comment: bytes = b"") -> None:
+    # Write next to the target and rename, so a failed run never leaves a torn zip.
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("wb") as f, phase("write_zip", out.name):
+            zw = RawZipWriter(f)
+            for m in members:
+                zw.add(m)
+            zw.close(comment)
+        os.replace(tmp, out)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+def write_zip64(out: Path, sources: Iterable[Source], store_ratio: float, comment: bytes = b"") -> None:
+    """Fallback for archives past the classic zip limits (4 GiB, 65535 members).
+
+    RawZipWriter has no zip64 support, so zipfile writes these. `sources` is
+    consumed lazily, one member in memory at a time. Timestamps, modes, member
+    order and the store-or-deflate choice match what write_zip would have produced.
+    """
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    try:
+        with zipfile.ZipFile(tmp, "w", allowZip64=True) as zf, phase("write_zip64", out.name):
+            for arcname, raw, mode, level in sources:
+                # compress_member makes the store-or-deflate call; zipfile then
+                # deflates again itself, at the same level, for the same bytes.
+                method = compress_member(arcname, raw, level=level, store_ratio=store_ratio).method
+                zf.writestr(zip_info(arcname, method, mode), raw, compresslevel=level)
+            zf.comment = comment
+        os.replace(tmp, out)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+def package_skill(skill_dir: Path, out: Path, *, level: int = 6, store_ratio: float = 0.95, jobs: int = 1,
+                  incremental: bool = False, snapshot: Optional[SkillSnapshot] = None) -> Tuple[int, int]:
+    """Build `out` from `skill_dir`; returns (members, members reused from the previous zip)."""
+    files = collect_files(skill_dir, snapshot)
+    with phase("manifest", skill_dir.name):
+        manifest = build_manifest(skill_dir.name, [(f.rel, f) for _, f in files], level=level, store_ratio=store_ratio)
+    # The manifest goes first and STORED, so it can be read without inflating anything.
+    head = compress_member(f"{skill_dir.name}/{MANIFEST_FILENAME}", manifest_bytes(manifest), level=0)
+    comment = manifest_comment(manifest)
+    digests = {rel: entry["sha256"] for rel, entry in manifest["files"].items()}
+    if not fits_without_zip64([(head.name, head.file_size)] + [(name, f.size) for name, f in files]):
+        sources = ((arcname, read_hashed(f, digests[f.rel]), normalized_mode(f), level) for arcname, f in files)
+        write_zip64(out, itertools.chain([(head.name, head.data, head.mode, 0)], sources), store_ratio, comment)
+        return len(files), 0
+    previous = PreviousArchive.open(out, manifest["settings"]) if incremental and out.exists() else None
+    members = iter_members(files, level, store_ratio, jobs, previous, digests)
+    try:
+        # Members are written as they come back, so only a bounded window is in memory.
+        write_zip(out, itertools.chain([head], members), comment)
+    finally:
+        members.close()
+        if previous is not None:
+            previous.close()
+    return len(files), previous.reused if previous else 0
 
 def main() -> None:
     ap = argparse.ArgumentParser(description="Package a Skill folder into a shareable zip (folder at zip root).")
     ap.add_argument("skill_dir", help="Path to the skill folder")
     ap.add_argument("--out", help="Output zip path (default: <skill-name>.zip next to folder)")
+    ap.add_argument("--level", type=int, default=6, choices=range(0, 10), metavar="0-9", help="Deflate level; 0 stores everything (default: 6)")
+    ap.add_argument("--store-threshold", type=float, default=0.95, help="Store a file uncompressed unless deflate shrinks it below this ratio (default: 0.95)")
+    ap.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Compression threads (default: CPU count)")
+    ap.add_argument("--incremental", action="store_true", help="Copy unchanged members' compressed bytes from the existing output zip instead of recompressing")
+    add_timing_args(ap)
     args = ap.parse_args()
+    start_timing(args, "package_skill")
 
     skill_dir = Path(args.skill_dir).expanduser().resolve()
     if not skill_dir.exists() or not skill_dir.is_dir():
@@ -22,19 +221,15 @@ def main() -> None:
 
     out = Path(args.out).expanduser().resolve() if args.out else skill_dir.with_suffix(".zip")
 
-    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
-        for p in skill_dir.rglob("*"):
-            if p.is_dir():
-                continue
-            if any(part in EXCLUDE_DIRS for part in p.parts):
-                continue
-            if p.suffix in EXCLUDE_SUFFIXES:
-                continue
-            arcname = str(Path(skill_dir.name) / p.relative_to(skill_dir))
-            zf.write(p, arcname)
+    try:
+        members, reused = package_skill(skill_dir, out, level=args.level, store_ratio=args.store_threshold, jobs=args.jobs, incremental=args.incremental)
+    except ValueError as e:
+        raise SystemExit(f"Packaging failed: {e}")
 
     print(f"✅ Packaged: {out}")
     print(f"   Zip root folder: {skill_dir.name}/")
+    if args.incremental:
+        print(f"   Incremental: reused {reused}/{members} member(s), recompressed {members - reused}")
 
 if __name__ == "__main__":
     main()
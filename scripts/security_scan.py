@@ -2,64 +2,285 @@
 from __future__ import annotations
 
 import argparse
+import codecs
+import json
 import re
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+from _shared.cache import FileCache, fingerprint
+from _shared.snapshot import SkillFile, SkillSnapshot
+from _shared.timing import add_timing_args, phase, start_timing
 
 TEXT_EXTS = {".md", ".txt", ".py", ".js", ".ts", ".sh", ".json", ".yaml", ".yml"}
 
+# Large-file handling: files above STREAM_THRESHOLD are scanned in CHUNK_BYTES
+# pieces (with OVERLAP_CHARS carried over), and nothing past MAX_SCAN_BYTES is read.
+SNIFF_BYTES = 8192
+STREAM_THRESHOLD = 8 * 1024 * 1024
+MAX_SCAN_BYTES = 64 * 1024 * 1024
+CHUNK_BYTES = 1024 * 1024
+OVERLAP_CHARS = 4096
+# Bumped when the hits for unchanged input change (2: binary files give no hit).
+RESULT_VERSION = 2
+
+# (regex, label, prefilter literals). A rule's regex only runs when one of its
+# lowercase literals occurs in the lowercased file text; every literal must be
+# present in any text the regex can match.
 PATTERNS = [
-    (re.compile(r"-----BEGIN (?:RSA |EC |OPENSSH )?PRIVATE KEY-----"), "Private key material"),
-    (re.compile(r"\bAKIA[0-9A-Z]{16}\b"), "Access key pattern"),
-    (re.compile(r"\b(?:xoxb|xoxp|xoxa|xapp)-[0-9A-Za-z-]{10,}\b"), "Token-like string"),
-    (re.compile(r"ignore (all|any) (previous|prior) instructions", re.I), "Prompt injection phrase"),
-    (re.compile(r"system prompt", re.I), "Prompt injection phrase"),
-    (re.compile(r"exfiltrat(e|ion)", re.I), "Suspicious exfiltration wording"),
-    (re.compile(r"\brm\s+-rf\b"), "Destructive shell command"),
-    (re.compile(r"\bmkfs\b"), "Destructive shell command"),
-    (re.compile(r"\bcurl\b\s+.*\|\s*(sh|bash)\b"), "Pipe-to-shell pattern"),
-    (re.compile(r"\beval\s*\(", re.I), "Dangerous eval()"),
-    (re.compile(r"\bexec\s*\(", re.I), "Dangerous exec()"),
-    (re.compile(r"subprocess\..*shell\s*=\s*True", re.I), "shell=True (injection risk)"),
-    (re.compile(r"os\.system\(", re.I), "os.system (injection risk)"),
+    (re.compile(r"-----BEGIN (?:RSA |EC |OPENSSH )?PRIVATE KEY-----"), "Private key material", ("-----begin ",)),
+    (re.compile(r"\bAKIA[0-9A-Z]{16}\b"), "Access key pattern", ("akia",)),
+    (re.compile(r"\b(?:xoxb|xoxp|xoxa|xapp)-[0-9A-Za-z-]{10,}\b"), "Token-like string", ("xoxb-", "xoxp-", "xoxa-", "xapp-")),
+    (re.compile(r"ignore (all|any) (previous|prior) instructions", re.I), "Prompt injection phrase", ("ignore ",)),
+    (re.compile(r"system prompt", re.I), "Prompt injection phrase", ("system prompt",)),
+    (re.compile(r"exfiltrat(e|ion)", re.I), "Suspicious exfiltration wording", ("exfiltrat",)),
+    (re.compile(r"\brm\s+-rf\b"), "Destructive shell command", ("-rf",)),
+    (re.compile(r"\bmkfs\b"), "Destructive shell command", ("mkfs",)),
+    (re.compile(r"\bcurl\b\s+.*\|\s*(sh|bash)\b"), "Pipe-to-shell pattern", ("curl",)),
+    (re.compile(r"\beval\s*\(", re.I), "Dangerous eval()", ("eval",)),
+    (re.compile(r"\bexec\s*\(", re.I), "Dangerous exec()", ("exec",)),
+    (re.compile(r"subprocess\..*shell\s*=\s*True", re.I), "shell=True (injection risk)", ("subprocess.",)),
+    (re.compile(r"os\.system\(", re.I), "os.system (injection risk)", ("os.system(",)),
 ]
 
-def scan_file(path: Path) -> list[str]:
-    issues: list[str] = []
+class Hit(NamedTuple):
+    line: int  # 1-based; 0 when the finding is about the file as a whole
+    col: int   # 1-based
+    label: str
+
+@dataclass(frozen=True)
+class Rule:
+    regex: Pattern[str]
+    label: str
+    prefilter: Tuple[str, ...] = ()  # empty: always run the regex
+
+class ScanEngine:
+    """Compiled rule set that scans a text once per rule that can possibly match.
+
+    The text is lowercased once and checked for each rule's literals (a cheap
+    substring search); only gated rules run their regex, and every match is
+    reported with its line and column.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self.fingerprint = fingerprint([(r.regex.pattern, r.regex.flags, r.label, r.prefilter) for r in rules])
+
+    def scan_text(self, text: str, first_line: int = 1, first_col: int = 1) -> List[Hit]:
+        """Scan `text`; positions are offset as if it started at (first_line, first_col)."""
+        lowered = text.lower()
+        found: List[Tuple[int, str]] = []
+        for rule in self.rules:
+            if rule.prefilter and not any(lit in lowered for lit in rule.prefilter):
+                continue
+            found.extend((m.start(), rule.label) for m in rule.regex.finditer(text))
+        if not found:
+            return []
+        found.sort()
+        hits: List[Hit] = []
+        line, line_start, cursor = first_line, 1 - first_col, 0
+        for pos, label in found:
+            # Walk forward once; hits are sorted so the whole file is counted at most once.
+            line += text.count("\n", cursor, pos)
+            nl = text.rfind("\n", cursor, pos)
+            if nl != -1:
+                line_start = nl + 1
+            cursor = pos
+            hits.append(Hit(line, pos - line_start + 1, label))
+        return hits
+
+def load_rule_pack(path: Path) -> List[Rule]:
+    """Load extra rules from a JSON file.
+
+    Format: a list (or {"rules": [...]}) of objects with "pattern" and "label",
+    plus optional "ignore_case" (bool) and "prefilter" (list of literals).
+    """
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not load rule pack {path}: {e}")
+    items = raw.get("rules") if isinstance(raw, dict) else raw
+    if not isinstance(items, list):
+        raise ValueError(f"Rule pack {path} must be a list of rules or {{\"rules\": [...]}}")
+    rules: List[Rule] = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get("pattern") or not item.get("label"):
+            raise ValueError(f"Rule #{i} in {path} needs non-empty 'pattern' and 'label'")
+        try:
+            regex = re.compile(item["pattern"], re.I if item.get("ignore_case") else 0)
+        except re.error as e:
+            raise ValueError(f"Rule #{i} in {path} has an invalid pattern: {e}")
+        prefilter = tuple(str(lit).lower() for lit in item.get("prefilter") or ())
+        rules.append(Rule(regex, str(item["label"]), prefilter))
+    return rules
+
+@lru_cache(maxsize=None)
+def get_engine(rule_files: Tuple[str, ...] = ()) -> ScanEngine:
+    """Built-in rules plus any rule packs, compiled once per process."""
+    rules = [Rule(pat, label, prefilter) for pat, label, prefilter in PATTERNS]
+    for f in rule_files:
+        rules.extend(load_rule_pack(Path(f)))
+    return ScanEngine(rules)
+
+@dataclass(frozen=True)
+class ScanLimits:
+    stream_threshold: int = STREAM_THRESHOLD
+    max_bytes: int = MAX_SCAN_BYTES
+
+def looks_binary(head: bytes) -> bool:
+    return b"\0" in head
+
+def _iter_chunks(f: BinaryIO, head: bytes, budget: int) -> Iterator[bytes]:
+    chunk = head[:budget]
+    while chunk:
+        budget -= len(chunk)
+        yield chunk
+        if budget <= 0:
+            return
+        chunk = f.read(min(CHUNK_BYTES, budget))
+
+def _scan_stream(f: BinaryIO, head: bytes, engine: ScanEngine, budget: int) -> List[Hit]:
+    """Scan fixed-size chunks, carrying an overlap so boundary-crossing matches are found.
+
+    Memory stays around CHUNK_BYTES + OVERLAP_CHARS regardless of file size. Hits that
+    fall inside the overlap are seen twice and dropped the second time.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    hits: List[Hit] = []
+    previous: Set[Hit] = set()
+    tail, line, col = "", 1, 1  # (line, col) is the position of tail[0]
+
+    def scan_window(window: str) -> None:
+        nonlocal previous
+        current = engine.scan_text(window, line, col)
+        hits.extend(h for h in current if h not in previous)
+        previous = set(current)
+
+    for chunk in _iter_chunks(f, head, budget):
+        window = tail + decoder.decode(chunk)
+        scan_window(window)
+        cut = max(0, len(window) - OVERLAP_CHARS)
+        nl = window.rfind("\n", 0, cut)
+        if nl == -1:
+            col += cut
+        else:
+            line += window.count("\n", 0, cut)
+            col = cut - nl
+        tail = window[cut:]
+    rest = decoder.decode(b"", final=True)
+    if rest:
+        scan_window(tail + rest)
+    return hits
+
+def scan_file(path: Path, engine: Optional[ScanEngine] = None, limits: ScanLimits = ScanLimits()) -> List[Hit]:
+    engine = engine or get_engine()
     try:
-        text = path.read_text(encoding="utf-8", errors="replace")
+        size = path.stat().st_size
+        with path.open("rb") as f, phase("scan", path):
+            head = f.read(SNIFF_BYTES)
+            if looks_binary(head):
+                return []  # images, fonts and other assets: nothing to scan, nothing to report
+            if size <= limits.stream_threshold and size <= limits.max_bytes:
+                hits = engine.scan_text((head + f.read()).decode("utf-8", errors="replace"))
+            else:
+                hits = _scan_stream(f, head, engine, limits.max_bytes)
     except Exception as e:
-        return [f"Could not read file: {e}"]
-    for pat, label in PATTERNS:
-        if pat.search(text):
-            issues.append(label)
-    return issues
+        return [Hit(0, 0, f"Could not read file: {e}")]
+    if size > limits.max_bytes:
+        hits.append(Hit(0, 0, f"Scan capped: only the first {limits.max_bytes} of {size} bytes were scanned"))
+    return hits
+
+def scan_source(f: SkillFile, engine: Optional[ScanEngine] = None, limits: ScanLimits = ScanLimits()) -> List[Hit]:
+    """Like scan_file, but reuses bytes/text already loaded into a snapshot.
+
+    Files the snapshot would not keep (over MEMO_MAX_BYTES) and files that need the
+    streaming path are scanned straight from disk, read once and never pulled into
+    the snapshot, so one huge fixture cannot pin its whole content in memory.
+    """
+    engine = engine or get_engine()
+    try:
+        if not f.memoised or f.size > limits.stream_threshold or f.size > limits.max_bytes:
+            return scan_file(f.path, engine, limits)
+        head = f.data[:SNIFF_BYTES]
+    except Exception as e:
+        return [Hit(0, 0, f"Could not read file: {e}")]
+    if looks_binary(head):
+        return []
+    text = f.lossy_text
+    with phase("scan", f.path):
+        return engine.scan_text(text)
+
+def format_hit(rel: Path, hit: Hit) -> str:
+    if hit.line:
+        return f"{rel}:{hit.line}:{hit.col}: {hit.label}"
+    return f"{rel}: {hit.label}"
+
+def iter_scan_targets(snapshot: SkillSnapshot) -> Iterator[SkillFile]:
+    for f in snapshot.files():
+        if f.path.suffix.lower() not in TEXT_EXTS and f.path.name != "SKILL.md":
+            continue
+        yield f
+
+def scan_skill(root: Path, cache: Optional[FileCache] = None, engine: Optional[ScanEngine] = None, limits: ScanLimits = ScanLimits(), snapshot: Optional[SkillSnapshot] = None) -> list[str]:
+    cache = cache or FileCache.disabled()
+    engine = engine or get_engine()
+    snapshot = snapshot or SkillSnapshot(root)
+    version = fingerprint(RESULT_VERSION, engine.fingerprint, limits.max_bytes)
+    findings: list[str] = []
+    with phase("scan_skill", root.name):
+        for f in iter_scan_targets(snapshot):
+            try:
+                small = f.memoised and f.size <= limits.stream_threshold
+            except OSError:
+                small = False
+            load = (lambda: f.data) if small else None
+            # Cached hits come back from JSON as plain lists.
+            for hit in cache.memo(f.path, "scan", version, lambda: scan_source(f, engine, limits), load):
+                findings.append(format_hit(Path(f.rel), Hit(*hit)))
+    return findings
+
+def add_limit_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--max-bytes", type=int, default=MAX_SCAN_BYTES, help=f"Scan at most this many bytes per file; larger files are reported (default: {MAX_SCAN_BYTES})")
+    ap.add_argument("--stream-threshold", type=int, default=STREAM_THRESHOLD, help=f"Files larger than this are scanned in chunks (default: {STREAM_THRESHOLD})")
+
+def limits_from_args(args: argparse.Namespace) -> ScanLimits:
+    if args.max_bytes <= 0 or args.stream_threshold < 0:
+        raise SystemExit("--max-bytes must be positive and --stream-threshold non-negative")
+    return ScanLimits(stream_threshold=args.stream_threshold, max_bytes=args.max_bytes)
+
+def report_lines(findings: list[str]) -> list[str]:
+    if not findings:
+        return ["✅ Security scan passed (heuristic)."]
+    lines = ["⚠️  Security scan findings (review required):\n"]
+    lines.extend(f"- {f}" for f in findings)
+    lines.append("\nNote: heuristic scanner. Manual review still matters.")
+    return lines
 
 def main() -> None:
     ap = argparse.ArgumentParser(description="Heuristic security scan for a Skill folder.")
     ap.add_argument("skill_dir", help="Path to the skill folder")
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and do not update the per-file result cache")
+    ap.add_argument("--rules", action="append", default=[], metavar="FILE", help="Extra JSON rule pack (repeatable)")
+    add_limit_args(ap)
+    add_timing_args(ap)
     args = ap.parse_args()
+    start_timing(args, "security_scan")
 
     root = Path(args.skill_dir).expanduser().resolve()
     if not root.exists() or not root.is_dir():
         raise SystemExit(f"Not a directory: {root}")
 
-    findings: list[str] = []
-    for p in root.rglob("*"):
-        if p.is_dir():
-            continue
-        if p.suffix.lower() not in TEXT_EXTS and p.name != "SKILL.md":
-            continue
-        for issue in scan_file(p):
-            findings.append(f"{p.relative_to(root)}: {issue}")
-
-    if not findings:
-        print("✅ Security scan passed (heuristic).")
-        return
+    try:
+        engine = get_engine(tuple(str(Path(f).expanduser().resolve()) for f in args.rules))
+    except ValueError as e:
+        raise SystemExit(str(e))
 
-    print("⚠️  Security scan findings (review required):\n")
-    for f in findings:
-        print(f"- {f}")
-    print("\nNote: heuristic scanner. Manual review still matters.")
+    cache = FileCache.for_skills_dir(root.parent, enabled=not args.no_cache)
+    findings = scan_skill(root, cache, engine, limits_from_args(args))
+    cache.save()
+    print("\n".join(report_lines(findings)))
 
 if __name__ == "__main__":
     main()
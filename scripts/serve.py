@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Long-lived JSON-RPC 2.0 server over stdio for editor integrations.
+
+Framing matches the MCP stdio transport: one compact JSON object per line on
+stdin/stdout, no Content-Length headers. Diagnostics go to stderr.
+
+Methods (params are JSON objects):
+  initialize                      -> {server, version, methods}
+  validate  {skill_dir}           -> {ok, errors, warnings}
+  scan      {skill_dir, rules?}   -> {findings}
+  check     {skill_dir, rules?}   -> validate + scan in one call (on-save)
+  package   {skill_dir, out?, level?, store_threshold?, incremental?}
+                                  -> {out, members, reused}
+  catalog   {skills_dir, archetype?, risk?, allows?, name?, trigger?, limit?, refresh?}
+                                  -> {refreshed, rows}
+  stats                           -> warm-state counters
+  invalidate {path?}              -> drop warm state (all, or under path)
+  shutdown                        -> saves caches, replies, then exits
+
+What stays warm between requests:
+- compiled scan rules (security_scan.get_engine is memoised per rule set)
+- SkillFile objects (bytes, text, frontmatter, JSON, AST) for files whose
+  (size, mtime, inode, ctime) signature has not changed since the last request
+- the per-file result cache of each skills directory, re-checked against the
+  filesystem at the start of every request and saved on shutdown / EOF
+- one open catalog connection per skills directory
+
+Example:
+  printf '%s\\n' '{"jsonrpc":"2.0","id":1,"method":"check","params":{"skill_dir":".claude/skills/my-skill"}}' | python scripts/serve.py
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import stat
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from _shared.cache import FileCache
+from _shared.snapshot import SkillFile, SkillSnapshot
+from _shared.timing import TIMINGS, add_timing_args, phase, start_timing
+from catalog import Catalog
+from package_skill import package_skill
+from security_scan import ScanLimits, add_limit_args, get_engine, limits_from_args, scan_skill
+from validate_skill import validate_skill
+
+SERVER_NAME = "skill-forge"
+# Bigger files are never pinned in memory; the scanner streams them from disk anyway.
+WARM_MAX_FILE_BYTES = 2 * 1024 * 1024
+# The server runs until the editor closes it: with --timings/--trace, keep at most
+# this many raw events (older ones only survive in the per-phase totals).
+MAX_TIMING_EVENTS = 100_000
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+Signature = Tuple[int, int, int, int]
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+def _version() -> str:
+    try:
+        return (Path(__file__).resolve().parent.parent / "VERSION.txt").read_text(encoding="utf-8").strip()
+    except OSError:
+        return "unknown"
+
+def _signature(st: os.stat_result) -> Signature:
+    return st.st_size, st.st_mtime_ns, st.st_ino, st.st_ctime_ns
+
+class WarmSnapshot(SkillSnapshot):
+    """A fresh walk each request, but unchanged files keep their parsed SkillFile."""
+
+    def __init__(self, root: Path, pool: "WarmFiles"):
+        super().__init__(root)
+        self.pool = pool
+
+    def _walk(self) -> Dict[str, SkillFile]:
+        if self._files is None:
+            with phase("walk", self.root):
+                self._files = self.pool.files_under(self.root)
+        return self._files
+
+class WarmFiles:
+    def __init__(self) -> None:
+        self._files: Dict[Path, Tuple[Signature, SkillFile]] = {}
+        self.reused = 0
+        self.loaded = 0
+
+    def files_under(self, root: Path) -> Dict[str, SkillFile]:
+        files: Dict[str, SkillFile] = {}
+        seen = set()
+        for p in sorted(root.rglob("*")):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                continue
+            seen.add(p)
+            rel = p.relative_to(root).as_posix()
+            sig = _signature(st)
+            cached = self._files.get(p)
+            if cached is not None and cached[0] == sig:
+                files[rel] = cached[1]
+                self.reused += 1
+                continue
+            f = SkillFile(p, rel)
+            files[rel] = f
+            self.loaded += 1
+            if st.st_size <= WARM_MAX_FILE_BYTES:
+                self._files[p] = (sig, f)
+            else:
+                self._files.pop(p, None)
+        # Deleted files under this root.
+        for p in [p for p in self._files if p not in seen and root in p.parents]:
+            del self._files[p]
+        return files
+
+    def invalidate(self, under: Optional[Path] = None) -> int:
+        victims = [p for p in self._files if under is None or p == under or under in p.parents]
+        for p in victims:
+            del self._files[p]
+        return len(victims)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+class Server:
+    def __init__(self, *, use_cache: bool = True, limits: ScanLimits = ScanLimits()):
+        self.use_cache = use_cache
+        self.limits = limits
+        self.files = WarmFiles()
+        self.caches: Dict[Path, FileCache] = {}
+        self.catalogs: Dict[Path, Catalog] = {}
+        self.requests = 0
+        self.running = True
+        self.methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "initialize": self.initialize,
+            "validate": self.validate,
+            "scan": self.scan,
+            "check": self.check,
+            "package": self.package,
+            "catalog": self.catalog,
+            "stats": self.stats,
+            "invalidate": self.invalidate,
+            "shutdown": self.shutdown,
+        }
+
+    # --- helpers -----------------------------------------------------------
+
+    @staticmethod
+    def _dir(params: Dict[str, Any], key: str) -> Path:
+        raw = params.get(key)
+        if not isinstance(raw, str) or not raw:
+            raise RpcError(INVALID_PARAMS, f"'{key}' (string path) is required")
+        path = Path(raw).expanduser().resolve()
+        if not path.is_dir():
+            raise RpcError(SERVER_ERROR, f"Not a directory: {path}")
+        return path
+
+    def _cache(self, skills_dir: Path) -> FileCache:
+        if not self.use_cache:
+            return FileCache.disabled()
+        cache = self.caches.get(skills_dir)
+        if cache is None:
+            cache = self.caches[skills_dir] = FileCache.for_skills_dir(skills_dir)
+        cache.recheck()
+        return cache
+
+    def _rules(self, params: Dict[str, Any]) -> Tuple[str, ...]:
+        rules = params.get("rules") or []
+        if not isinstance(rules, list) or not all(isinstance(r, str) for r in rules):
+            raise RpcError(INVALID_PARAMS, "'rules' must be a list of paths")
+        try:
+            rule_files = tuple(str(Path(r).expanduser().resolve()) for r in rules)
+            get_engine(rule_files)
+        except (OSError, ValueError) as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+        return rule_files
+
+    def save_caches(self) -> None:
+        for cache in self.caches.values():
+            cache.save()
+
+    def close(self) -> None:
+        self.save_caches()
+        for catalog in self.catalogs.values():
+            catalog.close()
+        self.catalogs.clear()
+
+    # --- methods -----------------------------------------------------------
+
+    def initialize(self, params: Dict[str, Any]) -> Any:
+        return {"server": SERVER_NAME, "version": _version(), "methods": sorted(self.methods)}
+
+    def validate(self, params: Dict[str, Any], snapshot: Optional[SkillSnapshot] = None) -> Any:
+        skill = self._dir(params, "skill_dir")
+        result = validate_skill(skill, self._cache(skill.parent), snapshot or WarmSnapshot(skill, self.files))
+        return {"ok": result.ok, "errors": result.errors, "warnings": result.warnings, "context": [asdict(c) for c in result.context]}
+
+    def scan(self, params: Dict[str, Any], snapshot: Optional[SkillSnapshot] = None) -> Any:
+        skill = self._dir(params, "skill_dir")
+        engine = get_engine(self._rules(params))
+        findings = scan_skill(skill, self._cache(skill.parent), engine, self.limits, snapshot or WarmSnapshot(skill, self.files))
+        return {"findings": findings}
+
+    def check(self, params: Dict[str, Any]) -> Any:
+        skill = self._dir(params, "skill_dir")
+        snapshot = WarmSnapshot(skill, self.files)  # one walk shared by both checks
+        return {"validate": self.validate(params, snapshot), "scan": self.scan(params, snapshot)}
+
+    def package(self, params: Dict[str, Any]) -> Any:
+        skill = self._dir(params, "skill_dir")
+        if not (skill / "SKILL.md").exists():
+            raise RpcError(SERVER_ERROR, "Missing SKILL.md in skill folder")
+        out = Path(params["out"]).expanduser().resolve() if params.get("out") else skill.with_suffix(".zip")
+        try:
+            level = int(params.get("level", 6))
+            store_ratio = float(params.get("store_threshold", 0.95))
+        except (TypeError, ValueError):
+            raise RpcError(INVALID_PARAMS, "'level' must be an int and 'store_threshold' a number")
+        if not 0 <= level <= 9:
+            raise RpcError(INVALID_PARAMS, "'level' must be 0-9")
+        members, reused = package_skill(skill, out, level=level, store_ratio=store_ratio, jobs=os.cpu_count() or 1,
+                                        incremental=bool(params.get("incremental")), snapshot=WarmSnapshot(skill, self.files))
+        return {"out": str(out), "members": members, "reused": reused}
+
+    def catalog(self, params: Dict[str, Any]) -> Any:
+        skills_dir = self._dir(params, "skills_dir")
+        catalog = self.catalogs.get(skills_dir)
+        if catalog is None:
+            catalog = self.catalogs[skills_dir] = Catalog.for_skills_dir(skills_dir)
+        refreshed = catalog.refresh(skills_dir) if params.get("refresh", True) else None
+        allows = params.get("allows")
+        if isinstance(allows, str):
+            allows = [allows]
+        rows = catalog.query(archetype=params.get("archetype"), risk=params.get("risk"), allows=allows,
+                             name=params.get("name"), trigger=params.get("trigger"), limit=params.get("limit"))
+        cols = ("dir", "name", "title", "description", "archetype", "risk_level", "entry_point", "allowed_tools", "error")
+        return {"refreshed": refreshed, "rows": [{k: row[k] for k in cols} for row in rows]}
+
+    def stats(self, params: Dict[str, Any]) -> Any:
+        return {
+            "requests": self.requests,
+            "warm_files": len(self.files),
+            "files_reused": self.files.reused,
+            "files_loaded": self.files.loaded,
+            "result_cache": {str(d): {"hits": c.hits, "misses": c.misses} for d, c in self.caches.items()},
+            "catalogs": [str(d) for d in self.catalogs],
+        }
+
+    def invalidate(self, params: Dict[str, Any]) -> Any:
+        raw = params.get("path")
+        under = Path(raw).expanduser().resolve() if isinstance(raw, str) and raw else None
+        dropped = self.files.invalidate(under)
+        if under is None:
+            self.save_caches()
+            self.caches.clear()
+        return {"dropped_files": dropped}
+
+    def shutdown(self, params: Dict[str, Any]) -> Any:
+        self.running = False
+        self.save_caches()
+        return {"ok": True}
+
+    # --- dispatch ----------------------------------------------------------
+
+    def handle(self, line: str) -> Optional[Dict[str, Any]]:
+        """One request line -> one response (None for notifications)."""
+        try:
+            msg = json.loads(line)
+        except ValueError as e:
+            return _error(None, PARSE_ERROR, f"Parse error: {e}")
+        if not isinstance(msg, dict) or not isinstance(msg.get("method"), str):
+            return _error(msg.get("id") if isinstance(msg, dict) else None, INVALID_REQUEST, "Invalid request")
+        msg_id = msg.get("id")
+        params = msg.get("params") or {}
+        method = self.methods.get(msg["method"])
+        self.requests += 1
+        t0 = time.perf_counter()
+        try:
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {msg['method']}")
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            # Library code must never write to stdout: that is the protocol channel.
+            with phase("rpc", msg["method"]), contextlib.redirect_stdout(sys.stderr):
+                result = method(params)
+        except RpcError as e:
+            return None if msg_id is None else _error(msg_id, e.code, str(e))
+        except SystemExit as e:  # library helpers raise SystemExit(message) for user errors
+            return None if msg_id is None else _error(msg_id, SERVER_ERROR, str(e.code))
+        except Exception as e:
+            return None if msg_id is None else _error(msg_id, SERVER_ERROR, f"{type(e).__name__}: {e}")
+        if msg_id is None:
+            return None
+        if isinstance(result, dict):
+            result = {**result, "elapsed_ms": round((time.perf_counter() - t0) * 1000, 3)}
+        return {"jsonrpc": "2.0", "id": msg_id, "result": result}
+
+def _error(msg_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": code, "message": message}}
+
+def serve(server: Server, stdin: Any = None, stdout: Any = None) -> None:
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    try:
+        for line in stdin:
+            if not line.strip():
+                continue
+            response = server.handle(line)
+            if response is not None:
+                stdout.write(json.dumps(response, ensure_ascii=False, separators=(",", ":")) + "\n")
+                stdout.flush()
+            if not server.running:
+                break
+    finally:
+        server.close()
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="JSON-RPC server over stdio (newline-delimited) for editor integrations.")
+    ap.add_argument("--no-cache", action="store_true", help="Do not read or write the per-file result cache (in-memory parses stay warm)")
+    add_limit_args(ap)
+    add_timing_args(ap)
+    args = ap.parse_args()
+    start_timing(args, "serve")
+    TIMINGS.max_events = MAX_TIMING_EVENTS
+    limits = limits_from_args(args)
+    print(f"{SERVER_NAME} serve {_version()}: JSON-RPC on stdio", file=sys.stderr)
+    serve(Server(use_cache=not args.no_cache, limits=limits))
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ Checks:
 4) requirements.txt present when archetype usually needs deps (warn)
 5) Python syntax checks (AST parse) for scripts/*.py
 6) Basic dependency hints (warn if imports suggest missing requirements)
+7) Context budget: estimated tokens for frontmatter, SKILL.md body and linked
+   files, plus (with --run-entry) the entry point's stdout size
 
 This is intentionally conservative and stdlib-only.
 """
@@ -15,14 +17,22 @@ This is intentionally conservative and stdlib-only.
 from __future__ import annotations
 
 import argparse
-import ast
-import json
+import re
+import shlex
+import subprocess
 import sys
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List, Set
+from typing import List, Optional, Set
 
-from _shared.frontmatter import extract_frontmatter, validate_frontmatter, parse_allowed_tools
-from _shared.imports import imported_top_levels
+from _shared.cache import FileCache, fingerprint
+from _shared.frontmatter import Frontmatter, validate_frontmatter, parse_allowed_tools
+from _shared.imports import imported_top_levels_from_tree
+from _shared.snapshot import SkillFile, SkillSnapshot
+from _shared.timing import add_timing_args, phase, start_timing
+from _shared.tokens import estimate_tokens, estimate_tokens_for_bytes, skill_md_split
 
 VALID_TOOL_NAMES = {"Read", "Write", "Grep", "Glob", "Bash"}
 ARCHETYPES_REQUIRING_REQS = {"api-wrapper", "mcp-bridge"}
@@ -35,59 +45,232 @@ COMMON_THIRD_PARTY = {
     "mcp": "mcp",
 }
 
-def check_links(skill_dir: Path, skill_md_text: str) -> List[str]:
-    import re
-    errors: List[str] = []
-    for m in re.finditer(r"\[[^\]]+\]\(([^)]+)\)", skill_md_text):
+LINK_RE = re.compile(r"\[[^\]]+\]\(([^)]+)\)")
+
+# Context budgets. Frontmatter is in context for every conversation (discovery),
+# the SKILL.md body once the skill activates, linked files only when read, and
+# the entry point's stdout on every run (the filesystem pattern says < 1KB).
+MAX_FRONTMATTER_TOKENS = 300
+MAX_BODY_TOKENS = 5000
+MAX_FILE_TOKENS = 10000
+MAX_TOTAL_TOKENS = 25000
+MAX_STDOUT_BYTES = 1024
+ENTRY_TIMEOUT_S = 30.0
+
+# Bumps whenever the rules (or the Python grammar) behind cached results change.
+CACHE_VERSION = fingerprint(sys.version_info[:2], sorted(VALID_TOOL_NAMES), COMMON_THIRD_PARTY)
+
+def link_targets(skill_md_text: str) -> List[str]:
+    targets: List[str] = []
+    for m in LINK_RE.finditer(skill_md_text):
         target = m.group(1).strip()
         if "://" in target or target.startswith("#"):
             continue
         target = target.split("#", 1)[0]
         if not target:
             continue
-        p = (skill_dir / target).resolve()
-        if not p.exists():
-            errors.append(f"Broken link target: {target}")
+        targets.append(target)
+    return targets
+
+def check_link_targets(skill_dir: Path, targets: List[str]) -> List[str]:
+    errors: List[str] = []
+    with phase("links", skill_dir.name):
+        for target in targets:
+            p = (skill_dir / target).resolve()
+            if not p.exists():
+                errors.append(f"Broken link target: {target}")
     return errors
 
-def check_python_syntax(file_path: Path) -> List[str]:
+def check_links(skill_dir: Path, skill_md_text: str) -> List[str]:
+    return check_link_targets(skill_dir, link_targets(skill_md_text))
+
+def check_python_syntax(file_path: Path, source: Optional[SkillFile] = None) -> List[str]:
     try:
-        ast.parse(file_path.read_text(encoding="utf-8"))
+        (source or SkillFile(file_path)).tree
         return []
     except SyntaxError as e:
         return [f"Python syntax error in {file_path.name}: {e.msg} (line {e.lineno})"]
     except Exception as e:
         return [f"Could not parse {file_path.name}: {e}"]
 
-def load_spec(path: Path) -> dict:
-    return json.loads(path.read_text(encoding="utf-8"))
+def analyze_imports(file_path: Path, source: Optional[SkillFile] = None) -> dict:
+    try:
+        tree = (source or SkillFile(file_path)).tree
+        with phase("imports", file_path):
+            return {"modules": sorted(imported_top_levels_from_tree(tree))}
+    except Exception as e:
+        return {"error": str(e)}
 
-def read_requirements(req_path: Path) -> str:
+def parse_skill_md(skill_md: Path, source: Optional[SkillFile] = None) -> dict:
+    f = source or SkillFile(skill_md)
+    fm = f.frontmatter
+    links = f.derived["links"] if "links" in f.derived else link_targets(f.text)
+    return {"frontmatter": asdict(fm) if fm else None, "links": links}
+
+def load_spec(path: Path, source: Optional[SkillFile] = None) -> dict:
+    return (source or SkillFile(path)).json()
+
+def read_requirements(req_path: Path, source: Optional[SkillFile] = None) -> str:
     try:
-        return req_path.read_text(encoding="utf-8")
+        return (source or SkillFile(req_path)).text
     except Exception:
         return ""
 
-def main() -> None:
-    ap = argparse.ArgumentParser(description="Validate a Skill folder.")
-    ap.add_argument("skill_dir", help="Path to the skill folder")
-    args = ap.parse_args()
+@dataclass(frozen=True)
+class ContextBudgets:
+    """Context-size limits; 0 disables one. Overruns are warnings unless `strict`."""
+    frontmatter_tokens: int = MAX_FRONTMATTER_TOKENS
+    body_tokens: int = MAX_BODY_TOKENS
+    file_tokens: int = MAX_FILE_TOKENS
+    total_tokens: int = MAX_TOTAL_TOKENS
+    stdout_bytes: int = MAX_STDOUT_BYTES
+    strict: bool = False
 
-    skill_dir = Path(args.skill_dir).expanduser().resolve()
-    if not skill_dir.exists() or not skill_dir.is_dir():
-        raise SystemExit(f"Not a directory: {skill_dir}")
+@dataclass
+class ContextCost:
+    source: str  # "SKILL.md (frontmatter)", a linked path, or "<entry> stdout"
+    loaded: str  # "always" | "on activation" | "on demand" | "per run"
+    tokens: int
+    size: int  # bytes
 
-    errors: List[str] = []
-    warnings: List[str] = []
+@dataclass
+class EntryRun:
+    stdout_bytes: int
+    returncode: Optional[int]
+    error: Optional[str] = None
+
+def measure_entry_stdout(skill_dir: Path, entry: str, args: List[str], timeout: float = ENTRY_TIMEOUT_S) -> EntryRun:
+    """Run the entry point in a scratch cwd and count the stdout bytes it prints.
+
+    Stdout is counted as it streams, never held in memory; stderr is discarded.
+    Artifacts the script writes land in the scratch directory, not the skill.
+    """
+    path = skill_dir / entry
+    cmd = [sys.executable, str(path), *args] if path.suffix == ".py" else [str(path), *args]
+    with tempfile.TemporaryDirectory(prefix="skill-forge-entry-") as cwd, phase("entry_run", entry):
+        try:
+            proc = subprocess.Popen(cmd, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            return EntryRun(0, None, f"could not start: {e}")
+        killed: List[bool] = []
+        timer = threading.Timer(timeout, lambda: (killed.append(True), proc.kill()))
+        timer.start()
+        size = 0
+        try:
+            assert proc.stdout is not None
+            for chunk in iter(lambda: proc.stdout.read(65536), b""):
+                size += len(chunk)
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+    return EntryRun(size, returncode, f"killed after {timeout:g}s" if killed else None)
+
+def analyze_context(skill_dir: Path, snapshot: SkillSnapshot, skill_md: SkillFile, fm: Optional[Frontmatter], links: List[str]) -> List[ContextCost]:
+    """Estimated context cost of SKILL.md and every distinct file it links to."""
+    text = skill_md.text
+    front, body = skill_md_split(text, fm.end_line) if fm else ("", text)
+    costs = [
+        ContextCost("SKILL.md (frontmatter)", "always", estimate_tokens(front), len(front.encode("utf-8"))),
+        ContextCost("SKILL.md (body)", "on activation", estimate_tokens(body), len(body.encode("utf-8"))),
+    ]
+    root = skill_dir.resolve()
+    seen: Set[str] = set()
+    for target in links:
+        p = (skill_dir / target).resolve()
+        try:
+            rel = p.relative_to(root).as_posix()
+        except ValueError:
+            continue  # outside the skill: not shipped with it
+        f = snapshot.get(rel)
+        if f is None or rel in seen or rel == "SKILL.md":
+            continue
+        seen.add(rel)
+        size = f.stat.st_size
+        costs.append(ContextCost(rel, "on demand", estimate_tokens_for_bytes(size), size))
+    return costs
+
+def check_context_budgets(costs: List[ContextCost], budgets: ContextBudgets) -> List[str]:
+    problems: List[str] = []
+
+    def over(what: str, used: int, limit: int, unit: str = "tokens") -> None:
+        if limit and used > limit:
+            approx = "~" if unit == "tokens" else ""
+            problems.append(f"Context budget: {what} is {approx}{used} {unit} (budget {limit})")
+
+    total = 0
+    for c in costs:
+        if c.loaded == "always":
+            over("SKILL.md frontmatter", c.tokens, budgets.frontmatter_tokens)
+        elif c.loaded == "on activation":
+            over("SKILL.md body", c.tokens, budgets.body_tokens)
+        elif c.loaded == "on demand":
+            over(f"linked file {c.source}", c.tokens, budgets.file_tokens)
+        elif c.loaded == "per run":
+            over(c.source, c.size, budgets.stdout_bytes, "bytes")
+            continue
+        total += c.tokens
+    over("SKILL.md plus every linked file", total, budgets.total_tokens)
+    return problems
+
+def context_report_lines(costs: List[ContextCost], max_rows: int = 15) -> List[str]:
+    if not costs:
+        return []
+    ranked = sorted(costs, key=lambda c: -c.tokens)
+    docs = sum(c.tokens for c in costs if c.loaded != "per run")
+    lines = [f"\nContext cost (~{docs} tokens for SKILL.md plus every linked file):"]
+    lines.extend(f"  {c.tokens:>8}  {c.loaded:<13}  {c.source}" for c in ranked[:max_rows])
+    if len(ranked) > max_rows:
+        lines.append(f"  ... {len(ranked) - max_rows} more")
+    return lines
+
+@dataclass
+class ValidationResult:
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    context: List[ContextCost] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def report_lines(self) -> List[str]:
+        lines: List[str] = []
+        if self.errors:
+            lines.append("❌ Validation failed:\n")
+            lines.extend(f"- {e}" for e in self.errors)
+        else:
+            lines.append("✅ Validation passed.")
+        if self.warnings:
+            lines.append("\nWarnings:")
+            lines.extend(f"- {w}" for w in self.warnings)
+        return lines
+
+def validate_skill(skill_dir: Path, cache: Optional[FileCache] = None, snapshot: Optional[SkillSnapshot] = None,
+                   budgets: ContextBudgets = ContextBudgets(), run_entry: Optional[List[str]] = None) -> ValidationResult:
+    """Run every check against an existing skill folder and collect the results.
+
+    Files are read through `snapshot` (pass one to share reads/parses with the
+    scanner or packager). Per-file work (frontmatter parse, link extraction, AST
+    parse, import analysis) is looked up in `cache` first and stored back on a miss.
+    With `run_entry` (argument list), the entry point is executed to measure its stdout.
+    """
+    with phase("validate", skill_dir.name):
+        return _validate_skill(skill_dir, cache or FileCache.disabled(), snapshot or SkillSnapshot(skill_dir), budgets, run_entry)
+
+def _validate_skill(skill_dir: Path, cache: FileCache, snapshot: SkillSnapshot, budgets: ContextBudgets, run_entry: Optional[List[str]]) -> ValidationResult:
+    result = ValidationResult()
+    errors = result.errors
+    warnings = result.warnings
 
     # 1) Frontmatter
-    skill_md = skill_dir / "SKILL.md"
-    if not skill_md.exists():
+    skill_md = snapshot.get("SKILL.md")
+    if skill_md is None:
         errors.append("Missing SKILL.md")
-        raise SystemExit("\n".join(errors))
+        return result
 
-    skill_text = skill_md.read_text(encoding="utf-8")
-    fm = extract_frontmatter(skill_text)
+    parsed = cache.memo(skill_md.path, "skill_md", CACHE_VERSION, lambda: parse_skill_md(skill_md.path, skill_md), load=lambda: skill_md.data)
+    fm = Frontmatter(**parsed["frontmatter"]) if parsed["frontmatter"] else None
     if fm is None:
         errors.append("SKILL.md must start with YAML frontmatter delimited by --- lines")
     else:
@@ -99,16 +282,16 @@ def main() -> None:
             if unknown:
                 errors.append(f"Unknown tool(s) in allowed-tools: {unknown}. Known: {sorted(VALID_TOOL_NAMES)}")
 
-    errors.extend(check_links(skill_dir, skill_text))
+    errors.extend(check_link_targets(skill_dir, parsed["links"]))
 
     # 2) Spec
-    spec_path = skill_dir / "skill.spec.json"
+    spec_file = snapshot.get("skill.spec.json")
     spec = {}
-    if not spec_path.exists():
+    if spec_file is None:
         errors.append("Missing skill.spec.json")
     else:
         try:
-            spec = load_spec(spec_path)
+            spec = load_spec(spec_file.path, spec_file)
         except Exception as e:
             errors.append(f"Invalid skill.spec.json: {e}")
 
@@ -132,22 +315,24 @@ def main() -> None:
 
     # 5) requirements.txt expectations
     archetype = (spec.get("archetype") or "").strip()
-    reqs_path = skill_dir / "requirements.txt"
-    if archetype in ARCHETYPES_REQUIRING_REQS and not reqs_path.exists():
+    reqs_file = snapshot.get("requirements.txt")
+    if archetype in ARCHETYPES_REQUIRING_REQS and reqs_file is None:
         warnings.append(f"Archetype '{archetype}' typically needs requirements.txt (deps). Missing.")
 
-    req_text = read_requirements(reqs_path) if reqs_path.exists() else ""
+    req_text = read_requirements(reqs_file.path, reqs_file) if reqs_file else ""
 
     # 6) Python syntax + import hints
     scripts_dir = skill_dir / "scripts"
     if scripts_dir.exists():
         imports: Set[str] = set()
-        for py_file in scripts_dir.glob("*.py"):
-            errors.extend(check_python_syntax(py_file))
-            try:
-                imports |= imported_top_levels(py_file)
-            except Exception as e:
-                warnings.append(f"Could not analyze imports in {py_file.name}: {e}")
+        for py in snapshot.glob("scripts", ".py"):
+            load = lambda: py.data
+            errors.extend(cache.memo(py.path, "syntax", CACHE_VERSION, lambda: check_python_syntax(py.path, py), load))
+            analysis = cache.memo(py.path, "imports", CACHE_VERSION, lambda: analyze_imports(py.path, py), load)
+            if "error" in analysis:
+                warnings.append(f"Could not analyze imports in {py.path.name}: {analysis['error']}")
+            else:
+                imports.update(analysis["modules"])
 
         # Dependency hints (warn only)
         for mod, hint in COMMON_THIRD_PARTY.items():
@@ -156,21 +341,69 @@ def main() -> None:
     else:
         warnings.append("Missing scripts/ directory")
 
-    if errors:
-        print("❌ Validation failed:\n")
-        for e in errors:
-            print(f"- {e}")
-        if warnings:
-            print("\nWarnings:")
-            for w in warnings:
-                print(f"- {w}")
-        raise SystemExit(1)
+    # 7) Context budget
+    with phase("context", skill_dir.name):
+        result.context = analyze_context(skill_dir, snapshot, skill_md, fm, parsed["links"])
+    if run_entry is not None and entry and (skill_dir / entry).is_file():
+        run = measure_entry_stdout(skill_dir, entry, run_entry)
+        if run.error:
+            warnings.append(f"Entry point run: {run.error}")
+        elif run.returncode:
+            warnings.append(f"Entry point exited {run.returncode}; stdout measured anyway")
+        result.context.append(ContextCost(f"{entry} stdout", "per run", estimate_tokens_for_bytes(run.stdout_bytes), run.stdout_bytes))
+    (errors if budgets.strict else warnings).extend(check_context_budgets(result.context, budgets))
 
-    print("✅ Validation passed.")
-    if warnings:
-        print("\nWarnings:")
-        for w in warnings:
-            print(f"- {w}")
+    return result
+
+def add_budget_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--max-frontmatter-tokens", type=int, default=MAX_FRONTMATTER_TOKENS, help=f"Budget for SKILL.md frontmatter, always in context (default: {MAX_FRONTMATTER_TOKENS}; 0 disables)")
+    ap.add_argument("--max-body-tokens", type=int, default=MAX_BODY_TOKENS, help=f"Budget for the SKILL.md body (default: {MAX_BODY_TOKENS})")
+    ap.add_argument("--max-file-tokens", type=int, default=MAX_FILE_TOKENS, help=f"Budget per file linked from SKILL.md (default: {MAX_FILE_TOKENS})")
+    ap.add_argument("--max-total-tokens", type=int, default=MAX_TOTAL_TOKENS, help=f"Budget for SKILL.md plus every linked file (default: {MAX_TOTAL_TOKENS})")
+    ap.add_argument("--max-stdout-bytes", type=int, default=MAX_STDOUT_BYTES, help=f"Budget for entry-point stdout with --run-entry (default: {MAX_STDOUT_BYTES})")
+    ap.add_argument("--strict-budgets", action="store_true", help="Report budget overruns as errors instead of warnings")
+
+def budgets_from_args(args: argparse.Namespace) -> ContextBudgets:
+    values = (args.max_frontmatter_tokens, args.max_body_tokens, args.max_file_tokens, args.max_total_tokens, args.max_stdout_bytes)
+    if min(values) < 0:
+        raise SystemExit("Budgets must be non-negative (0 disables one)")
+    return ContextBudgets(*values, strict=args.strict_budgets)
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Validate a Skill folder.")
+    ap.add_argument("skill_dir", help="Path to the skill folder")
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and do not update the per-file result cache")
+    ap.add_argument("--catalog", action="store_true", help="Reuse frontmatter/spec parses from the skills-dir catalog when still current")
+    ap.add_argument("--context-report", action="store_true", help="Print the estimated context cost of SKILL.md and linked files, largest first")
+    ap.add_argument("--run-entry", nargs="?", const="", metavar="ARGS", help="Run the entry point (with ARGS, shell-quoted) in a scratch directory and check its stdout size")
+    add_budget_args(ap)
+    add_timing_args(ap)
+    args = ap.parse_args()
+    start_timing(args, "validate_skill")
+    budgets = budgets_from_args(args)
+
+    skill_dir = Path(args.skill_dir).expanduser().resolve()
+    if not skill_dir.exists() or not skill_dir.is_dir():
+        raise SystemExit(f"Not a directory: {skill_dir}")
+
+    snapshot = SkillSnapshot(skill_dir)
+    if args.catalog:
+        # Imported here: catalog itself imports this module.
+        from catalog import CATALOG_FILENAME, Catalog, prime_snapshot
+        if (skill_dir.parent / CATALOG_FILENAME).exists():
+            catalog = Catalog.for_skills_dir(skill_dir.parent)
+            prime_snapshot(snapshot, catalog.primer(skill_dir))
+            catalog.close()
+
+    cache = FileCache.for_skills_dir(skill_dir.parent, enabled=not args.no_cache)
+    run_entry = shlex.split(args.run_entry) if args.run_entry is not None else None
+    result = validate_skill(skill_dir, cache, snapshot, budgets, run_entry)
+    cache.save()
+    print("\n".join(result.report_lines()))
+    if args.context_report:
+        print("\n".join(context_report_lines(result.context)))
+    if not result.ok:
+        raise SystemExit(1)
 
 if __name__ == "__main__":
     main()
@@ -27,6 +27,10 @@ Do not use when:
 python scripts/wrapper.py "search query"
 ```
 
+Items are streamed into `workspace/<name>_<timestamp>.ndjson` (one JSON value per line) as pages arrive. Use `--max-items N` to stop early and `--prefetch` to fetch the next page while the current one is written. Set `BASE_URL` in `scripts/wrapper.py` and pick the paging style with `--pagination cursor|offset|link`. The strategies live in `scripts/pagination.py`. If a page fails, the items fetched so far are kept, the last line is an `{"_error": ...}` marker, and the run exits 1.
+
+Re-running the same queries? Add `--cache` to keep responses in `workspace/.http_cache`. It honours `Cache-Control` and revalidates with ETag/Last-Modified, and `--cache-mb` caps its size (LRU). The summary line reports hits, revalidations and misses.
+
 ## Setup
 - Install optional deps:
   ```bash
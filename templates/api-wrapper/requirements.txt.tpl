@@ -1,2 +1,2 @@
-# Optional. The wrapper will fall back to stdlib urllib if requests isn't installed.
-requests>=2.31.0
+# None required: scripts/http_client.py is stdlib-only (http.client keep-alive pools, gzip, retries).
+# Add your API's SDK here if you prefer it over raw HTTP.
@@ -0,0 +1,230 @@
+"""Opt-in on-disk HTTP response cache (stdlib-only).
+
+Lives under workspace/.http_cache/, one <key>.json (metadata) + <key>.body per entry.
+
+- key: method + URL + the request headers that change the response
+  (Accept, Accept-Language, Authorization; hashed, never stored in clear)
+- freshness: Cache-Control max-age (or Expires); no-store is never cached;
+  no-cache is always revalidated
+- revalidation: If-None-Match (ETag) / If-Modified-Since (Last-Modified); a 304
+  refreshes the stored entry instead of downloading the body again
+- size cap: least-recently-used entries are evicted past max_bytes
+- stats: hits / revalidated / misses / stores / evictions for the summary line
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_DIR = Path("workspace") / ".http_cache"
+KEY_HEADERS = ("accept", "accept-language", "authorization")
+# Response headers worth keeping with the body (others are connection-specific).
+STORED_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "expires", "vary", "date", "link")
+
+def _h(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    out: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            out[name.lower()] = arg.strip('"') if arg else None
+    return out
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def summary(self) -> str:
+        return f"hits={self.hits} revalidated={self.revalidated} misses={self.misses} stores={self.stores} evictions={self.evictions}"
+
+@dataclass
+class CachedEntry:
+    key: str
+    meta: Dict[str, Any]
+    body: bytes
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.meta.get("fresh_until", 0)
+
+    def validators(self) -> Dict[str, str]:
+        headers = self.meta.get("headers", {})
+        out: Dict[str, str] = {}
+        if headers.get("etag"):
+            out["If-None-Match"] = headers["etag"]
+        if headers.get("last-modified"):
+            out["If-Modified-Since"] = headers["last-modified"]
+        return out
+
+@dataclass
+class HttpCache:
+    root: Path = DEFAULT_DIR
+    max_bytes: int = 100 * 1024 * 1024
+    default_ttl_s: float = 0.0  # freshness for responses that give none (0: revalidate or skip)
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None  # key -> (bytes on disk, last used)
+
+    def count(self, stat: str) -> None:
+        with self._lock:
+            setattr(self.stats, stat, getattr(self.stats, stat) + 1)
+
+    # --- keys / index ---
+
+    @staticmethod
+    def key_for(method: str, url: str, headers: Dict[str, str]) -> str:
+        lowered = {k.lower(): v for k, v in headers.items()}
+        parts = [method.upper(), url] + [f"{h}:{_h(lowered[h])}" for h in KEY_HEADERS if h in lowered]
+        return _h("\n".join(parts))
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.root / f"{key}.json", self.root / f"{key}.body"
+
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        # Caller holds self._lock.
+        if self._index is None:
+            index: Dict[str, Tuple[int, float]] = {}
+            if self.root.is_dir():
+                for meta in self.root.glob("*.json"):
+                    body = meta.with_suffix(".body")
+                    try:
+                        st = body.stat()
+                        index[meta.stem] = (st.st_size + meta.stat().st_size, st.st_mtime)
+                    except OSError:
+                        continue
+            self._index = index
+        return self._index
+
+    def _touch(self, key: str, size: Optional[int] = None) -> None:
+        now = time.time()
+        with self._lock:
+            index = self._load_index()
+            index[key] = (size if size is not None else index.get(key, (0, now))[0], now)
+        try:
+            os.utime(self._paths(key)[1], (now, now))  # LRU order survives restarts
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        with self._lock:
+            index = self._load_index()
+            total = sum(size for size, _ in index.values())
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for key, (size, _) in sorted(index.items(), key=lambda kv: kv[1][1]):
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= size
+            for key in victims:
+                del index[key]
+        for key in victims:
+            for p in self._paths(key):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            self.count("evictions")
+
+    # --- lookup / store ---
+
+    def lookup(self, key: str, headers: Dict[str, str]) -> Optional[CachedEntry]:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        lowered = {k.lower(): v for k, v in headers.items()}
+        for name, digest in meta.get("vary", {}).items():
+            if _h(lowered.get(name, "")) != digest:
+                return None
+        return CachedEntry(key, meta, body)
+
+    def _freshness(self, headers: Dict[str, str], now: float) -> Optional[float]:
+        """Seconds the response stays fresh; None if it must not be stored."""
+        cc = parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in cc:  # "private" is fine: this is a private, per-user cache
+            return None
+        if "no-cache" in cc:
+            return 0.0
+        if cc.get("max-age") is not None:
+            try:
+                return max(0.0, float(cc["max-age"]) - float(headers.get("age", 0) or 0))
+            except ValueError:
+                return 0.0
+        expires = _http_date(headers.get("expires"))
+        if expires is not None:
+            date = _http_date(headers.get("date")) or now
+            return max(0.0, expires - date)
+        return self.default_ttl_s
+
+    def store(self, key: str, url: str, status: int, headers: Dict[str, str], body: bytes, request_headers: Dict[str, str]) -> bool:
+        now = time.time()
+        ttl = self._freshness(headers, now)
+        has_validator = bool(headers.get("etag") or headers.get("last-modified"))
+        vary = [v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()]
+        if ttl is None or "*" in vary or (ttl <= 0 and not has_validator):
+            return False
+        lowered = {k.lower(): v for k, v in request_headers.items()}
+        meta = {
+            "url": url,
+            "status": status,
+            "headers": {k: headers[k] for k in STORED_HEADERS if k in headers},
+            "stored_at": now,
+            "fresh_until": now + ttl,
+            "vary": {name: _h(lowered.get(name, "")) for name in vary},
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._paths(key)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        for path, data in ((body_path, body), (meta_path, json.dumps(meta).encode("utf-8"))):
+            tmp = path.with_name(path.name + suffix)
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        self.count("stores")
+        self._touch(key, len(body) + meta_path.stat().st_size)
+        self._evict()
+        return True
+
+    def refresh(self, entry: CachedEntry, headers: Dict[str, str]) -> None:
+        """Apply a 304's headers: new validators/freshness, same body."""
+        merged = {**entry.meta.get("headers", {}), **{k: headers[k] for k in STORED_HEADERS if k in headers}}
+        now = time.time()
+        ttl = self._freshness(merged, now) or 0.0
+        entry.meta.update(headers=merged, stored_at=now, fresh_until=now + ttl)
+        meta_path = self._paths(entry.key)[0]
+        tmp = meta_path.with_name(meta_path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(json.dumps(entry.meta), encoding="utf-8")
+            os.replace(tmp, meta_path)
+        except OSError:
+            pass
+        self._touch(entry.key)
+
+    def hit(self, entry: CachedEntry) -> None:
+        self._touch(entry.key)
@@ -1,25 +1,306 @@
-"""HTTP client helper.
+"""HTTP client helper (stdlib-only).
 
-Tries to use `requests` if installed, otherwise falls back to `urllib`.
-This keeps the template runnable in a bare Python environment.
+HttpClient keeps a small pool of keep-alive `http.client` connections per host,
+asks for gzip, retries transient failures (connection errors, 429/5xx) with
+jittered exponential backoff that honours `Retry-After`, follows redirects
+(credentials are dropped when the origin changes; https -> http is refused),
+and fans out with fetch_many(urls, concurrency=N).
+
+Pass cache=HttpCache() to keep GET responses on disk and revalidate them
+(see http_cache.py). get_json() keeps the old one-call signature on top of a
+shared, uncached client.
 """
 from __future__ import annotations
 
+import gzip
+import http.client
 import json
-from typing import Any, Dict, Optional, Tuple
+import queue
+import random
+import ssl
+import threading
+import time
+import urllib.parse
+import urllib.request
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-def get_json(url: str, headers: Optional[Dict[str, str]] = None, timeout_s: int = 30) -> Tuple[int, Any]:
+from http_cache import HttpCache
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+MAX_REDIRECTS = 5
+# Credentials a redirect must not carry to another origin (lower-cased names).
+CREDENTIAL_HEADERS = frozenset({"authorization", "cookie", "proxy-authorization", "x-api-key"})
+USER_AGENT = "skill-forge-http/0.1"
+
+HostKey = Tuple[str, str, int]
+
+def _origin(url: str) -> HostKey:
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    return (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+
+def redirect_headers(headers: Dict[str, str], from_url: str, to_url: str) -> Dict[str, str]:
+    """Headers to re-send to a redirect target; credentials stay with the original origin.
+
+    Raises ValueError for an https -> http downgrade.
+    """
+    src, dst = _origin(from_url), _origin(to_url)
+    if src[0] == "https" and dst[0] != "https":
+        raise ValueError(f"Refusing redirect from https to {dst[0]}: {to_url}")
+    if src == dst:
+        return headers
+    return {k: v for k, v in headers.items() if k.lower() not in CREDENTIAL_HEADERS}
+
+@dataclass
+class Response:
+    status: int
+    headers: Dict[str, str]  # lower-cased names
+    body: bytes
+    url: str
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+def _decode_body(data: bytes, encoding: str) -> bytes:
+    encoding = encoding.strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(data)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(data)
+        except zlib.error:
+            return zlib.decompress(data, -zlib.MAX_WBITS)  # raw deflate, as some servers send
+    return data
+
+def retry_after_s(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
     try:
-        import requests  # type: ignore
-        r = requests.get(url, headers=headers, timeout=timeout_s)
-        return r.status_code, r.json()
-    except ModuleNotFoundError:
-        return _urllib_get_json(url, headers=headers, timeout_s=timeout_s)
-
-def _urllib_get_json(url: str, headers: Optional[Dict[str, str]] = None, timeout_s: int = 30) -> Tuple[int, Any]:
-    import urllib.request
-    req = urllib.request.Request(url, headers=headers or {})
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        status = getattr(resp, "status", 200)
-        data = resp.read().decode("utf-8", errors="replace")
-        return status, json.loads(data)
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class HttpClient:
+    def __init__(self, *, timeout_s: float = 30.0, retries: int = 3, backoff_s: float = 0.5, max_backoff_s: float = 30.0,
+                 max_retry_after_s: float = 120.0, max_idle_per_host: int = 8, headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[HttpCache] = None):
+        self.timeout_s = timeout_s
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.max_retry_after_s = max_retry_after_s
+        self.max_idle_per_host = max_idle_per_host
+        self.headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate", **(headers or {})}
+        self.cache = cache
+        self._ssl = ssl.create_default_context()
+        self._pools: Dict[HostKey, "queue.LifoQueue[http.client.HTTPConnection]"] = {}
+        self._lock = threading.Lock()
+
+    # --- connection pool ---
+
+    def _pool(self, key: HostKey) -> "queue.LifoQueue[http.client.HTTPConnection]":
+        with self._lock:
+            return self._pools.setdefault(key, queue.LifoQueue())
+
+    @staticmethod
+    def _proxy(scheme: str, host: str) -> Optional[urllib.parse.SplitResult]:
+        """Proxy from the environment (HTTP_PROXY/HTTPS_PROXY/NO_PROXY), like urllib."""
+        proxy = urllib.request.getproxies().get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        return urllib.parse.urlsplit(proxy)
+
+    def _new_connection(self, key: HostKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        proxy = self._proxy(scheme, host)
+        if proxy is not None:
+            host_, port_ = proxy.hostname or "", proxy.port or 80
+        else:
+            host_, port_ = host, port
+        if scheme == "https":
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(host_, port_, timeout=self.timeout_s, context=self._ssl)
+            if proxy is not None:
+                conn.set_tunnel(host, port)
+            return conn
+        return http.client.HTTPConnection(host_, port_, timeout=self.timeout_s)
+
+    def _acquire(self, key: HostKey) -> Tuple[http.client.HTTPConnection, bool]:
+        """(connection, reused?)"""
+        try:
+            return self._pool(key).get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(key), False
+
+    def _release(self, key: HostKey, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        pool = self._pool(key)
+        if reusable and pool.qsize() < self.max_idle_per_host:
+            pool.put(conn)
+        else:
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # --- requests ---
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": spreads retries from many workers instead of synchronising them.
+        return random.uniform(0, min(self.max_backoff_s, self.backoff_s * (2 ** attempt)))
+
+    def _send_once(self, method: str, url: str, headers: Dict[str, str], body: Optional[bytes]) -> Response:
+        parts = urllib.parse.urlsplit(url)
+        key = _origin(url)
+        scheme = key[0]
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        if scheme == "http" and self._proxy(scheme, key[1]) is not None:
+            target = url  # plain-HTTP proxies take absolute-form request targets
+        else:
+            target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        while True:
+            conn, reused = self._acquire(key)
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if reused:
+                    continue  # the server dropped an idle keep-alive connection; try a fresh one
+                raise
+            except Exception:
+                conn.close()
+                raise
+            self._release(key, conn, reusable=not resp.will_close)
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            data = _decode_body(data, resp_headers.get("content-encoding", ""))
+            return Response(resp.status, resp_headers, data, url)
+
+    def request(self, method: str, url: str, *, headers: Optional[Dict[str, str]] = None, body: Optional[bytes] = None) -> Response:
+        method = method.upper()
+        merged = {**self.headers, **(headers or {})}
+        if self.cache is not None and method == "GET" and body is None:
+            return self._cached_get(url, merged)
+        return self._request(method, url, merged, body)
+
+    def _cached_get(self, url: str, headers: Dict[str, str]) -> Response:
+        cache = self.cache
+        assert cache is not None
+        key = cache.key_for("GET", url, headers)
+        entry = cache.lookup(key, headers)
+        if entry is not None and entry.fresh:
+            cache.count("hits")
+            cache.hit(entry)
+            return Response(entry.meta["status"], dict(entry.meta["headers"]), entry.body, url)
+
+        conditional = {**headers, **entry.validators()} if entry is not None else headers
+        resp = self._request("GET", url, conditional, None)
+        if resp.status == 304 and entry is not None:
+            cache.count("revalidated")
+            cache.refresh(entry, resp.headers)
+            return Response(entry.meta["status"], dict(entry.meta["headers"]), entry.body, url)
+        cache.count("misses")
+        if resp.status == 200:
+            cache.store(key, url, resp.status, resp.headers, resp.body, headers)
+        return resp
+
+    def _request(self, method: str, url: str, merged: Dict[str, str], body: Optional[bytes]) -> Response:
+        retryable = method in IDEMPOTENT_METHODS
+        attempt = 0
+        redirects = 0
+        while True:
+            try:
+                resp = self._send_once(method, url, merged, body)
+            except (OSError, http.client.HTTPException):
+                if not retryable or attempt >= self.retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if resp.status in REDIRECT_STATUSES and "location" in resp.headers and redirects < MAX_REDIRECTS:
+                redirects += 1
+                target = urllib.parse.urljoin(url, resp.headers["location"])
+                merged = redirect_headers(merged, url, target)
+                url = target
+                if resp.status == 303 or (resp.status in (301, 302) and method == "POST"):
+                    method, body = "GET", None
+                continue
+
+            if resp.status in RETRY_STATUSES and retryable and attempt < self.retries:
+                wait = retry_after_s(resp.headers.get("retry-after"))
+                if wait is None:
+                    wait = self._backoff(attempt)
+                elif wait > self.max_retry_after_s:
+                    return resp  # server asked for a longer pause than we are willing to block
+                time.sleep(wait)
+                attempt += 1
+                continue
+            return resp
+
+    def get(self, url: str, *, headers: Optional[Dict[str, str]] = None) -> Response:
+        return self.request("GET", url, headers=headers)
+
+    def get_json(self, url: str, *, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Any]:
+        resp = self.get(url, headers=headers)
+        try:
+            return resp.status, resp.json()
+        except ValueError:
+            if resp.status >= 400:
+                return resp.status, resp.text  # error pages are often HTML/plain text
+            raise
+
+    def fetch_many(self, urls: Iterable[str], *, concurrency: int = 8, headers: Optional[Dict[str, str]] = None) -> List[Union[Response, Exception]]:
+        """GET every URL over the shared pools; results in input order, failures as exceptions."""
+        def one(url: str) -> Union[Response, Exception]:
+            try:
+                return self.get(url, headers=headers)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            return list(pool.map(one, urls))
+
+_default: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+def default_client() -> HttpClient:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpClient()
+        return _default
+
+def get_json(url: str, headers: Optional[Dict[str, str]] = None, timeout_s: int = 30) -> Tuple[int, Any]:
+    client = default_client()
+    if timeout_s != client.timeout_s:
+        with HttpClient(timeout_s=timeout_s) as one_off:
+            return one_off.get_json(url, headers=headers)
+    return client.get_json(url, headers=headers)
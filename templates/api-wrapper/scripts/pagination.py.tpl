@@ -0,0 +1,154 @@
+"""Generator-based pagination over HttpClient (stdlib-only).
+
+Pick the strategy your API uses and stream pages or items from it:
+
+    strategy = CursorPagination("https://api.example.com/items?q=x", items_key="data", next_key="next_cursor")
+    for item in iter_items(client, strategy, prefetch=True):
+        ...
+
+Pages are fetched lazily, so only one page (two with prefetch) is in memory.
+With prefetch=True the next request is in flight while the caller processes the
+current page, which overlaps network waits with disk writes.
+"""
+from __future__ import annotations
+
+import re
+import urllib.parse
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from http_client import HttpClient, Response
+
+LINK_NEXT_RE = re.compile(r'<([^>]+)>\s*;[^,]*?\brel="?next"?', re.I)
+
+def set_query_params(url: str, **params: Any) -> str:
+    parts = urllib.parse.urlsplit(url)
+    query = dict(urllib.parse.parse_qsl(parts.query, keep_blank_values=True))
+    query.update({k: str(v) for k, v in params.items()})
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+def dig(payload: Any, dotted: str) -> Any:
+    """payload["a"]["b"] for "a.b"; None if any step is missing."""
+    for part in dotted.split(".") if dotted else []:
+        if not isinstance(payload, dict):
+            return None
+        payload = payload.get(part)
+    return payload
+
+class Pagination(ABC):
+    """Base strategy: where the first page is, which items a page holds, and where the next one is."""
+
+    items_key = ""
+
+    @abstractmethod
+    def first_url(self) -> str:
+        ...
+
+    def items(self, payload: Any) -> List[Any]:
+        found = dig(payload, self.items_key) if self.items_key else payload
+        return found if isinstance(found, list) else []
+
+    @abstractmethod
+    def next_url(self, url: str, resp: Response, payload: Any, items: List[Any]) -> Optional[str]:
+        ...
+
+class CursorPagination(Pagination):
+    """Next page = same URL with ?<cursor_param>=<payload[next_key]>; stops when the cursor is empty."""
+
+    def __init__(self, url: str, *, items_key: str = "results", next_key: str = "next_cursor", cursor_param: str = "cursor"):
+        self.url = url
+        self.items_key = items_key
+        self.next_key = next_key
+        self.cursor_param = cursor_param
+
+    def first_url(self) -> str:
+        return self.url
+
+    def next_url(self, url: str, resp: Response, payload: Any, items: List[Any]) -> Optional[str]:
+        cursor = dig(payload, self.next_key)
+        return set_query_params(self.url, **{self.cursor_param: cursor}) if cursor else None
+
+class OffsetPagination(Pagination):
+    """?offset=N&limit=M; stops on a short page (or when offset reaches payload[total_key])."""
+
+    def __init__(self, url: str, *, items_key: str = "results", page_size: int = 100, offset_param: str = "offset",
+                 limit_param: str = "limit", start: int = 0, total_key: str = ""):
+        self.url = url
+        self.items_key = items_key
+        self.page_size = page_size
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+        self.start = start
+        self.total_key = total_key
+        self._offset = start
+
+    def _url(self, offset: int) -> str:
+        return set_query_params(self.url, **{self.offset_param: offset, self.limit_param: self.page_size})
+
+    def first_url(self) -> str:
+        self._offset = self.start
+        return self._url(self._offset)
+
+    def next_url(self, url: str, resp: Response, payload: Any, items: List[Any]) -> Optional[str]:
+        self._offset += len(items)
+        total = dig(payload, self.total_key) if self.total_key else None
+        if len(items) < self.page_size or (isinstance(total, int) and self._offset >= total):
+            return None
+        return self._url(self._offset)
+
+class LinkHeaderPagination(Pagination):
+    """RFC 8288 `Link: <...>; rel="next"` (GitHub-style)."""
+
+    def __init__(self, url: str, *, items_key: str = ""):
+        self.url = url
+        self.items_key = items_key
+
+    def first_url(self) -> str:
+        return self.url
+
+    def next_url(self, url: str, resp: Response, payload: Any, items: List[Any]) -> Optional[str]:
+        m = LINK_NEXT_RE.search(resp.headers.get("link", ""))
+        return urllib.parse.urljoin(url, m.group(1)) if m else None
+
+class PageError(RuntimeError):
+    def __init__(self, url: str, resp: Response):
+        super().__init__(f"HTTP {resp.status} for {url}: {resp.text[:200]}")
+        self.url = url
+        self.response = resp
+
+def iter_pages(client: HttpClient, strategy: Pagination, *, headers: Optional[Dict[str, str]] = None,
+               prefetch: bool = False, max_pages: Optional[int] = None) -> Iterator[List[Any]]:
+    """Yield each page's items; raises PageError on a non-2xx page."""
+
+    def get(url: str) -> Tuple[str, Response]:
+        return url, client.get(url, headers=headers)
+
+    def parse(url: str, resp: Response) -> Tuple[List[Any], Optional[str]]:
+        if not 200 <= resp.status < 300:
+            raise PageError(url, resp)
+        payload = resp.json()
+        items = strategy.items(payload)
+        return items, strategy.next_url(url, resp, payload, items)
+
+    pool = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        pending: Optional[Future] = None
+        url: Optional[str] = strategy.first_url()
+        pages = 0
+        while url is not None and (max_pages is None or pages < max_pages):
+            fetched = pending.result() if pending is not None else get(url)
+            items, url = parse(*fetched)
+            pages += 1
+            more = url is not None and (max_pages is None or pages < max_pages)
+            # Start the next request before handing this page to the caller.
+            pending = pool.submit(get, url) if pool is not None and more else None
+            yield items
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+def iter_items(client: HttpClient, strategy: Pagination, *, headers: Optional[Dict[str, str]] = None,
+               prefetch: bool = False, max_pages: Optional[int] = None) -> Iterator[Any]:
+    for page in iter_pages(client, strategy, headers=headers, prefetch=prefetch, max_pages=max_pages):
+        yield from page
@@ -3,50 +3,98 @@
 
 PATTERN: Filesystem Pattern (Input -> Fetch -> Save -> Summarize)
 
-- Raw responses are saved to workspace/
+- Items are streamed page by page into an NDJSON artifact in workspace/
+  (one JSON value per line), never held in memory all at once
+- If a page fails, the items already fetched are kept and the last line is an
+  {"_error": ...} marker; the run exits 1
 - Stdout is summaries + artifact paths + tiny previews (capped)
+- --cache keeps responses in workspace/.http_cache and revalidates them, so
+  repeated runs with the same query skip the download
 """
 from __future__ import annotations
 
 import argparse
 import os
 from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
 
-from _fs import write_json, safe_preview_json
-from http_client import get_json
+from _fs import open_ndjson, safe_preview_json
+from http_cache import HttpCache
+from http_client import HttpClient
+from pagination import CursorPagination, LinkHeaderPagination, OffsetPagination, Pagination, iter_items, set_query_params
 
-def fetch(query: str) -> dict:
-    # TODO: Replace with your API endpoint.
-    # Use env vars for keys, never hard-code secrets.
-    # Example:
-    #   api_key = os.environ["EXAMPLE_API_KEY"]
-    #   url = f"https://api.example.com/search?q={query}"
-    #   status, payload = get_json(url, headers={"Authorization": f"Bearer {api_key}"})
-    #   if status != 200: raise RuntimeError(payload)
-    #   return payload
+PREVIEW_ITEMS = 2
+ERROR_KEY = "_error"
 
-    # Placeholder payload:
-    return {"query": query, "results": [f"item-{i}" for i in range(1, 101)]}
+# TODO: Set your API endpoint and the env var holding its key (never hard-code secrets).
+# While BASE_URL is empty, fetch_items() yields placeholder items so the skill runs offline.
+BASE_URL = ""
+API_KEY_ENV = "EXAMPLE_API_KEY"
+ITEMS_KEY = "results"
+
+def make_strategy(query: str, style: str) -> Pagination:
+    url = set_query_params(BASE_URL, q=query)
+    if style == "offset":
+        return OffsetPagination(url, items_key=ITEMS_KEY, page_size=100)
+    if style == "link":
+        return LinkHeaderPagination(url, items_key=ITEMS_KEY)  # Link: <...>; rel="next"
+    return CursorPagination(url, items_key=ITEMS_KEY, next_key="next_cursor")
+
+def fetch_items(query: str, client: HttpClient, *, style: str = "cursor", prefetch: bool = False) -> Iterator[Any]:
+    # Many unrelated URLs (fan-out) instead of pages: client.fetch_many(urls, concurrency=8)
+    # returns a Response or Exception per URL over the same keep-alive connections.
+    if not BASE_URL:
+        # Placeholder: four pages of 25 items.
+        for page in range(4):
+            yield from (f"item-{page * 25 + i}" for i in range(1, 26))
+        return
+    api_key = os.environ.get(API_KEY_ENV)
+    headers: Dict[str, str] = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    yield from iter_items(client, make_strategy(query, style), headers=headers, prefetch=prefetch)
 
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("query", help="Query string")
-    ap.add_argument("--out", default="", help="Optional output filename under workspace/")
+    ap.add_argument("--out", default="", help="Optional output filename under workspace/ (NDJSON)")
+    ap.add_argument("--max-items", type=int, default=None, help="Stop after this many items")
+    ap.add_argument("--pagination", choices=["cursor", "offset", "link"], default="cursor", help="How the API pages its results (default: cursor)")
+    ap.add_argument("--prefetch", action="store_true", help="Fetch the next page while the current one is being written")
+    ap.add_argument("--cache", action="store_true", help="Cache HTTP responses in workspace/.http_cache (honours Cache-Control, revalidates)")
+    ap.add_argument("--cache-mb", type=float, default=100.0, help="Cache size cap; least recently used entries are evicted (default: 100)")
     args = ap.parse_args()
 
-    payload = fetch(args.query)
-
     ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    filename = args.out.strip() or f"{{SKILL_NAME}}_{ts}.json"
-    path = write_json(filename, payload)
+    filename = args.out.strip() or f"{{SKILL_NAME}}_{ts}.ndjson"
 
-    results = payload.get("results", [])
-    preview = results[:2] if isinstance(results, list) else results
+    preview: List[Any] = []
+    error: Optional[str] = None
+    cache = HttpCache(max_bytes=int(args.cache_mb * 1024 * 1024)) if args.cache else None
+    with HttpClient(cache=cache) as client, open_ndjson(filename) as out:
+        items = fetch_items(args.query, client, style=args.pagination, prefetch=args.prefetch)
+        try:
+            for item in islice(items, args.max_items):
+                out.write(item)
+                if len(preview) < PREVIEW_ITEMS:
+                    preview.append(item)
+        except Exception as e:
+            # Keep what was fetched; the marker line says the artifact is incomplete.
+            error = f"{type(e).__name__}: {e}"
+            out.write({ERROR_KEY: error, "items_before_error": out.count})
+    path, count = out.path, out.count - (error is not None)
 
-    print(f"✅ Saved raw payload to: {path}")
-    print(f"Summary: results_count={len(results) if isinstance(results, list) else 'n/a'} query={args.query!r}")
+    if error is not None:
+        print(f"⚠️  Stopped after {count} item(s): {safe_preview_json(error, max_bytes=200)}")
+        print(f"Partial results (last line is an {ERROR_KEY!r} marker): {path}")
+    else:
+        print(f"✅ Saved {count} item(s) to: {path}")
+    print(f"Summary: results_count={count} query={args.query!r}")
     print("Preview (capped):")
     print(safe_preview_json(preview, max_bytes=512))
+    if cache is not None:
+        print(f"HTTP cache: {cache.stats.summary()}")
+    if error is not None:
+        raise SystemExit(1)
 
 if __name__ == "__main__":
     main()
@@ -32,6 +32,30 @@ Call a tool:
 python scripts/bridge.py --server "uvx some-mcp-server@latest" --tool "tool_name" --args '{"k":"v"}'
 ```
 
+Call a tool many times in one session (one JSON object per line: `{"tool": "...", "args": {...}, "id": ...}`; `"tool"` defaults to `--tool`):
+```bash
+python scripts/bridge.py --server "uvx some-mcp-server@latest" --tool "tool_name" --batch calls.jsonl --concurrency 8 --retries 2
+```
+Each result is appended to one `workspace/*_batch_*.ndjson` file as it arrives. stdout gets only counts, error rate and p50/p95 latency.
+
+Results larger than `--spool-mb` (default 8) are streamed to disk as they arrive and never held in memory. The artifact is the raw response. The printed preview and the batch NDJSON record hold a `_spooled` summary (path, size, content types, preview).
+
+Keep servers warm across runs (optional; bridge.py uses the pool automatically when it is running and spawns the server itself otherwise):
+```bash
+python scripts/_mcp_pool.py serve --idle-timeout 600 --max-sessions 8 &
+python scripts/_mcp_pool.py status
+python scripts/_mcp_pool.py stop
+```
+Pooled servers are started with the bridge's working directory and environment, and a session is only reused by callers with the same command, directory and environment. Pass `--no-pool` to bridge.py to bypass the pool.
+
+Many calls in one session (requests are pipelined, not one round trip at a time):
+```python
+from _mcp_pool import open_client
+client, _ = open_client("uvx some-mcp-server@latest")
+results = client.call_tools_concurrently([("tool_name", {"k": v}) for v in values], max_in_flight=8)
+```
+Failed or timed-out calls come back as exception objects in `results`. `AsyncMcpStdioClient` offers the same API for asyncio.
+
 ## References
 - Decision rubric: [../docs/decision-rubric.md](../docs/decision-rubric.md)
 - Filesystem Pattern: [../docs/filesystem-pattern.md](../docs/filesystem-pattern.md)
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""Warm MCP server pool (stdlib-only, Unix only).
+
+Servers started via `uvx`/`node` can take seconds to boot. This daemon keeps
+initialized McpStdioClient sessions alive, keyed by (command, cwd, env), and
+serves JSON-RPC requests to them over a Unix domain socket. Repeated bridge
+runs against the same server skip process startup and the initialize handshake.
+
+Run it:
+    python scripts/_mcp_pool.py serve [--idle-timeout 600] [--max-sessions 8]
+    python scripts/_mcp_pool.py status
+    python scripts/_mcp_pool.py stop
+
+Clients call open_client(), which uses the pool when the daemon is reachable and
+otherwise spawns the server directly (plain McpStdioClient).
+
+Wire format: one JSON object per line in each direction. Client lines carry a
+"tag"; replies echo it, so many requests can be in flight on one connection.
+Clients always send their resolved cwd and full environment; the daemon starts
+each server with them and keys sessions on (command, cwd, env digest), so a
+pooled server sees exactly what a directly spawned one would, and callers with
+different credentials never share a session.
+Oversized results are spooled to the daemon's spool dir and forwarded as a
+spool summary; clients move the file into their own workspace (claim_spool).
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from _mcp_spool import spooled
+from _mcp_stdio import JSON, McpInitResult, McpStdioClient, ToolCall
+
+SOCKET_ENV = "MCP_POOL_SOCKET"
+CONNECT_TIMEOUT_S = 0.5
+MiB = 1024 * 1024
+ORPHAN_SPOOL_AGE_S = 3600.0
+
+def default_socket_path() -> Path:
+    if os.environ.get(SOCKET_ENV):
+        return Path(os.environ[SOCKET_ENV])
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(base) / f"skill-forge-mcp-pool-{os.getuid()}.sock"
+
+def default_spool_dir() -> Path:
+    return Path(tempfile.gettempdir()) / f"skill-forge-mcp-pool-spool-{os.getuid()}"
+
+SessionKey = Tuple[str, str, str]
+
+def env_digest(env: Dict[str, str]) -> str:
+    # Hashed so status output and the key itself never carry secret values.
+    return hashlib.sha256(json.dumps(sorted(env.items()), ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def session_key(command: str, cwd: str, env: Dict[str, str]) -> SessionKey:
+    return (command, cwd, env_digest(env))
+
+def caller_context(cwd: Optional[str], env: Optional[Dict[str, str]]) -> Tuple[str, Dict[str, str]]:
+    """The cwd and environment a directly spawned server would get from this process."""
+    return os.path.abspath(cwd or os.getcwd()), dict(os.environ if env is None else env)
+
+class PoolError(RuntimeError):
+    pass
+
+# --- daemon -----------------------------------------------------------------
+
+@dataclass
+class _Session:
+    client: McpStdioClient
+    init: McpInitResult
+    env_keys: List[str] = field(default_factory=list)
+    last_used: float = field(default_factory=time.monotonic)
+    inflight: int = 0
+
+    def alive(self) -> bool:
+        proc = self.client._proc
+        return proc is not None and proc.poll() is None
+
+class SessionPool:
+    def __init__(self, *, max_sessions: int, idle_timeout_s: float, timeout_s: float, spool_threshold: Optional[int] = None, spool_dir: Optional[Path] = None):
+        self.max_sessions = max_sessions
+        self.idle_timeout_s = idle_timeout_s
+        self.timeout_s = timeout_s
+        self.spool_threshold = spool_threshold
+        self.spool_dir = spool_dir or default_spool_dir()
+        self._lock = threading.Lock()
+        self._sessions: Dict[SessionKey, _Session] = {}
+        self._starting: Dict[SessionKey, threading.Lock] = {}
+
+    def acquire(self, command: str, cwd: str, env: Dict[str, str], client_name: str) -> _Session:
+        """Return a live, initialized session (starting one if needed) with inflight += 1.
+
+        The server is started with the caller's cwd and env, never the daemon's.
+        """
+        if not isinstance(cwd, str) or not os.path.isabs(cwd):
+            raise PoolError("cwd must be an absolute path")
+        if not isinstance(env, dict):
+            raise PoolError("env is required")
+        key = session_key(command, cwd, env)
+        with self._lock:
+            start_lock = self._starting.setdefault(key, threading.Lock())
+        # Per-key lock: a slow server start does not block requests for other servers.
+        with start_lock:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is not None and not session.alive():
+                    del self._sessions[key]
+                    session = None
+                if session is None:
+                    self._make_room()
+            if session is None:
+                client = McpStdioClient(command, cwd=cwd, env=env, timeout_s=self.timeout_s, spool_threshold=self.spool_threshold, spool_dir=self.spool_dir)
+                try:
+                    init = client.initialize(client_name=client_name)
+                except Exception:
+                    client.close()
+                    raise
+                session = _Session(client, init, env_keys=sorted(env))
+                with self._lock:
+                    self._sessions[key] = session
+            with self._lock:
+                session.inflight += 1
+                session.last_used = time.monotonic()
+            return session
+
+    def release(self, session: _Session) -> None:
+        with self._lock:
+            session.inflight -= 1
+            session.last_used = time.monotonic()
+
+    def _make_room(self) -> None:
+        # Caller holds self._lock.
+        if len(self._sessions) < self.max_sessions:
+            return
+        idle = [(s.last_used, k) for k, s in self._sessions.items() if s.inflight == 0]
+        if not idle:
+            raise PoolError(f"pool full ({self.max_sessions} busy sessions)")
+        _, key = min(idle)
+        self._sessions.pop(key).client.close()
+
+    def evict_idle(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            stale = [k for k, s in self._sessions.items() if (s.inflight == 0 and now - s.last_used > self.idle_timeout_s) or not s.alive()]
+            closing = [self._sessions.pop(k) for k in stale]
+        for s in closing:
+            s.client.close()
+        return len(closing)
+
+    def clean_spool(self) -> None:
+        """Remove spool files no client claimed (e.g. the bridge died mid-run)."""
+        cutoff = time.time() - max(ORPHAN_SPOOL_AGE_S, self.idle_timeout_s)
+        for p in self.spool_dir.glob("mcp_spool_*.json"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+            except OSError:
+                pass
+
+    def status(self) -> List[JSON]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {"command": k[0], "cwd": k[1], "env_keys": s.env_keys, "inflight": s.inflight, "idle_s": round(now - s.last_used, 1), "server": s.init.serverInfo}
+                for k, s in self._sessions.items()
+            ]
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for s in sessions:
+            s.client.close()
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_PoolServer"
+
+    def handle(self) -> None:
+        write_lock = threading.Lock()
+        session: Optional[_Session] = None
+
+        def reply(msg: JSON) -> bool:
+            data = (json.dumps(msg, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+            with write_lock:
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                    return True
+                except (OSError, ValueError):
+                    # Client went away: a broken pipe, or wfile already closed
+                    # because handle() returned before this late response.
+                    return False
+
+        def deliver(tag: Any, f: "Future[JSON]") -> None:
+            if f.exception() is not None:
+                reply({"tag": tag, "ok": False, "error": f"{type(f.exception()).__name__}: {f.exception()}"})
+                return
+            resp = f.result()
+            if not reply({"tag": tag, "ok": True, "response": resp}):
+                info = spooled(resp)
+                if info is not None:
+                    # Nobody will claim it now; don't wait for clean_spool.
+                    try:
+                        os.unlink(info["path"])
+                    except OSError:
+                        pass
+
+        try:
+            for line in self.rfile:
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                tag = msg.get("tag")
+                op = msg.get("op")
+                try:
+                    if op == "initialize":
+                        if session is not None:
+                            raise PoolError("connection already bound to a session")
+                        session = self.server.pool.acquire(msg["command"], msg.get("cwd"), msg.get("env"), msg.get("client_name", "skill-forge-bridge"))
+                        init = session.init
+                        reply({"tag": tag, "ok": True, "init": {"protocolVersion": init.protocolVersion, "capabilities": init.capabilities, "serverInfo": init.serverInfo, "instructions": init.instructions}})
+                    elif op == "request":
+                        if session is None:
+                            raise PoolError("initialize first")
+                        fut = session.client.request_future(msg["method"], msg.get("params"), timeout_s=msg.get("timeout_s"))
+                        fut.add_done_callback(lambda f, tag=tag: deliver(tag, f))
+                    elif op == "status":
+                        reply({"tag": tag, "ok": True, "sessions": self.server.pool.status()})
+                    elif op == "stop":
+                        reply({"tag": tag, "ok": True})
+                        threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    else:
+                        raise PoolError(f"unknown op: {op!r}")
+                except Exception as e:
+                    reply({"tag": tag, "ok": False, "error": f"{type(e).__name__}: {e}"})
+        finally:
+            if session is not None:
+                self.server.pool.release(session)
+
+class _PoolServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, pool: SessionPool):
+        self.pool = pool
+        super().__init__(str(path), _Handler)
+
+def serve(path: Path, *, max_sessions: int, idle_timeout_s: float, timeout_s: float, spool_threshold: Optional[int] = None) -> None:
+    if path.exists():
+        if _probe(path):
+            raise SystemExit(f"Pool already running at {path}")
+        path.unlink()  # stale socket from a dead daemon
+    pool = SessionPool(max_sessions=max_sessions, idle_timeout_s=idle_timeout_s, timeout_s=timeout_s, spool_threshold=spool_threshold)
+    old_umask = os.umask(0o177)  # socket is owner-only: it can launch commands
+    try:
+        server = _PoolServer(path, pool)
+    finally:
+        os.umask(old_umask)
+
+    stop = threading.Event()
+
+    def evictor() -> None:
+        while not stop.wait(max(1.0, min(30.0, idle_timeout_s / 4))):
+            pool.evict_idle()
+            pool.clean_spool()
+
+    threading.Thread(target=evictor, daemon=True).start()
+    print(f"MCP pool listening on {path} (max_sessions={max_sessions}, idle_timeout={idle_timeout_s:g}s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        pool.close_all()
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+# --- client -----------------------------------------------------------------
+
+def _connect(path: Path) -> Optional[socket.socket]:
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT_S)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+def _probe(path: Path) -> bool:
+    sock = _connect(path)
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+class PooledMcpClient:
+    """Same request API as McpStdioClient, served by a warm session in the pool daemon."""
+
+    def __init__(self, sock: socket.socket, command: str, *, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None, timeout_s: float = 60.0):
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.timeout_s = timeout_s
+        self._sock = sock
+        self._rfile = sock.makefile("rb")
+        self._lock = threading.Lock()
+        self._tag = 0
+        self._pending: Dict[int, Future] = {}
+        self._closed = False
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    def _reader(self) -> None:
+        for line in self._rfile:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                fut = self._pending.pop(msg.get("tag"), None)
+            if fut is not None:
+                fut.set_result(msg)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            fut.set_exception(ConnectionError("MCP pool connection closed"))
+
+    def _call(self, op: str, **fields: Any) -> "Future[JSON]":
+        fut: "Future[JSON]" = Future()
+        with self._lock:
+            if self._closed:
+                raise ConnectionError("client is closed")
+            self._tag += 1
+            tag = self._tag
+            self._pending[tag] = fut
+            data = (json.dumps({"tag": tag, "op": op, **fields}, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+            self._sock.sendall(data)
+        return fut
+
+    @staticmethod
+    def _unwrap(reply: JSON) -> Any:
+        if not reply.get("ok"):
+            raise PoolError(reply.get("error", "pool error"))
+        return reply
+
+    def initialize(self, *, client_name: str = "skill-forge-bridge", **_: Any) -> McpInitResult:
+        reply = self._unwrap(self._call("initialize", command=self.command, cwd=self.cwd, env=self.env, client_name=client_name).result())
+        return McpInitResult.from_response({"result": reply["init"]})
+
+    def request_future(self, method: str, params: Optional[JSON] = None, *, timeout_s: Optional[float] = None) -> "Future[JSON]":
+        out: "Future[JSON]" = Future()
+
+        def done(f: "Future[JSON]") -> None:
+            exc = f.exception()
+            if exc is not None:
+                out.set_exception(exc)
+                return
+            reply = f.result()
+            if reply.get("ok"):
+                out.set_result(reply["response"])
+            elif reply.get("error", "").startswith("TimeoutError"):
+                out.set_exception(TimeoutError(reply["error"]))
+            else:
+                out.set_exception(PoolError(reply.get("error", "pool error")))
+
+        self._call("request", method=method, params=params, timeout_s=self.timeout_s if timeout_s is None else timeout_s).add_done_callback(done)
+        return out
+
+    def request(self, method: str, params: Optional[JSON] = None) -> JSON:
+        return self.request_future(method, params).result()
+
+    def list_tools(self) -> JSON:
+        return self.request("tools/list")
+
+    def call_tool(self, name: str, arguments: JSON) -> JSON:
+        return self.request("tools/call", {"name": name, "arguments": arguments})
+
+    # Identical pipelining logic; only request_future differs.
+    call_tools_concurrently = McpStdioClient.call_tools_concurrently
+
+    def close(self) -> None:
+        """Disconnect; the server session stays warm in the daemon."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+AnyClient = Union[McpStdioClient, PooledMcpClient]
+
+def open_client(command: str, *, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None, timeout_s: float = 60.0,
+                client_name: str = "skill-forge-bridge", use_pool: bool = True, socket_path: Optional[Path] = None,
+                spool_threshold: Optional[int] = None) -> Tuple[AnyClient, McpInitResult]:
+    """Initialized client: pooled if the daemon answers, otherwise a directly spawned server.
+
+    spool_threshold only applies to a directly spawned server; the daemon has its own.
+    """
+    if use_pool:
+        sock = _connect(socket_path or default_socket_path())
+        if sock is not None:
+            pool_cwd, pool_env = caller_context(cwd, env)
+            pooled = PooledMcpClient(sock, command, cwd=pool_cwd, env=pool_env, timeout_s=timeout_s)
+            try:
+                return pooled, pooled.initialize(client_name=client_name)
+            except (PoolError, ConnectionError, OSError):
+                pooled.close()  # pool full or unhealthy: fall through to spawning
+    client = McpStdioClient(command, cwd=cwd, env=env, timeout_s=timeout_s, spool_threshold=spool_threshold)
+    return client, client.initialize(client_name=client_name)
+
+def _admin(path: Path, op: str) -> JSON:
+    sock = _connect(path)
+    if sock is None:
+        raise SystemExit(f"No MCP pool running at {path}")
+    client = PooledMcpClient(sock, "")
+    try:
+        return PooledMcpClient._unwrap(client._call(op).result(timeout=CONNECT_TIMEOUT_S * 10))
+    finally:
+        client.close()
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Keep MCP server sessions warm for bridge.py.")
+    ap.add_argument("--socket", default=None, help=f"Socket path (default: ${SOCKET_ENV} or a per-user path in the runtime/temp dir)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sv = sub.add_parser("serve", help="Run the pool daemon in the foreground")
+    sv.add_argument("--max-sessions", type=int, default=8, help="Most server sessions kept alive at once (default: 8)")
+    sv.add_argument("--idle-timeout", type=float, default=600.0, help="Close sessions unused for this many seconds (default: 600)")
+    sv.add_argument("--timeout", type=float, default=60.0, help="Default per-request timeout in seconds (default: 60)")
+    sv.add_argument("--spool-mb", type=float, default=8.0, help="Spool responses larger than this to disk instead of memory; 0 disables (default: 8)")
+    sub.add_parser("status", help="List warm sessions")
+    sub.add_parser("stop", help="Stop the daemon")
+    args = ap.parse_args()
+
+    path = Path(args.socket).expanduser() if args.socket else default_socket_path()
+    if args.cmd == "serve":
+        serve(path, max_sessions=max(1, args.max_sessions), idle_timeout_s=args.idle_timeout, timeout_s=args.timeout,
+              spool_threshold=int(args.spool_mb * MiB) or None)
+    elif args.cmd == "status":
+        print(json.dumps(_admin(path, "status")["sessions"], indent=2))
+    else:
+        _admin(path, "stop")
+        print(f"Stopped MCP pool at {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Spool oversized MCP responses to disk and read only their envelope.
+
+A multi-hundred-MB tool result should not be held in memory (several times over,
+once decoded). The stdio reader hands any line longer than a threshold to
+spool_line(), which streams it into a file. envelope_message() then walks that
+file through mmap with a small JSON scanner. It parses only the id, error and a
+summary of result.content, and skips string bodies without decoding them.
+
+The caller gets an ordinary response dict whose result is {"_spooled": {...}},
+holding the spool path, size, content summary and a short preview. Use
+claim_spool() to move the raw file to a final artifact path.
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import mmap
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple
+
+JSON = Dict[str, Any]
+
+SPOOL_KEY = "_spooled"
+CHUNK_BYTES = 1 << 20
+MAX_PARSE_BYTES = 1 << 20  # envelope fields larger than this are summarised, not parsed
+PREVIEW_BYTES = 2048
+
+_counter = itertools.count(1)
+
+_WS = re.compile(rb"[ \t\r\n]*")
+_SCALAR = re.compile(rb"-?[0-9][0-9.eE+-]*|true|false|null")
+_STRUCT = re.compile(rb'["{}\[\]]')
+
+def new_spool_path(spool_dir: Path) -> Path:
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    return spool_dir / f"mcp_spool_{os.getpid()}_{next(_counter)}.json"
+
+def spool_line(first: bytes, stream: BinaryIO, spool_dir: Path) -> Path:
+    """Write `first` plus the rest of the current line from `stream` to a new spool file."""
+    path = new_spool_path(spool_dir)
+    with path.open("wb") as f:
+        chunk = first
+        while chunk:
+            done = chunk.endswith(b"\n")
+            f.write(chunk.rstrip(b"\r\n") if done else chunk)
+            if done:
+                break
+            chunk = stream.readline(CHUNK_BYTES)
+    return path
+
+Visit = Callable[[Optional[str], int], int]
+
+class _Scanner:
+    """Just enough of a JSON walker to find value boundaries in a bytes-like buffer.
+
+    Containers are walked once: a visit callback gets each member's start offset
+    and returns its end, either by descending into it or by skipping it. String
+    bodies are skipped with find(), so huge strings cost a memchr, not a regex.
+    """
+
+    def __init__(self, buf: Any):
+        self.buf = buf
+
+    def ws(self, pos: int) -> int:
+        return _WS.match(self.buf, pos).end()
+
+    def char(self, pos: int) -> bytes:
+        return self.buf[pos:pos + 1]
+
+    def string_end(self, pos: int) -> int:
+        i = pos + 1
+        while True:
+            j = self.buf.find(b'"', i)
+            if j == -1:
+                raise ValueError(f"unterminated string at {pos}")
+            k = j
+            while self.buf[k - 1:k] == b"\\":
+                k -= 1
+            if (j - k) % 2 == 0:  # not escaped
+                return j + 1
+            i = j + 1
+
+    def skip(self, pos: int) -> int:
+        """End offset of the value starting at pos."""
+        c = self.char(pos)
+        if c == b'"':
+            return self.string_end(pos)
+        if c in (b"{", b"["):
+            depth = 0
+            while True:
+                m = _STRUCT.search(self.buf, pos)
+                if not m:
+                    raise ValueError("unbalanced JSON")
+                if m.group() == b'"':
+                    pos = self.string_end(m.start())
+                    continue
+                depth += 1 if m.group() in (b"{", b"[") else -1
+                pos = m.end()
+                if depth == 0:
+                    return pos
+        m = _SCALAR.match(self.buf, pos)
+        if not m:
+            raise ValueError(f"unexpected byte at {pos}")
+        return m.end()
+
+    def parse(self, pos: int, limit: int = MAX_PARSE_BYTES) -> Tuple[Any, int]:
+        """(value, end) for a value expected to be small; None if it exceeds limit."""
+        end = self.skip(pos)
+        return (json.loads(self.buf[pos:end]) if end - pos <= limit else None), end
+
+    def walk(self, pos: int, visit: Optional[Visit] = None) -> int:
+        """Visit each member of the object/array at pos (key is None in arrays); returns its end."""
+        visit = visit or (lambda _key, p: self.skip(p))
+        open_ = self.char(pos)
+        if open_ not in (b"{", b"["):
+            return self.skip(pos)
+        close = b"}" if open_ == b"{" else b"]"
+        pos = self.ws(pos + 1)
+        if self.char(pos) == close:
+            return pos + 1
+        while True:
+            key = None
+            if open_ == b"{":
+                end = self.string_end(pos)
+                key = json.loads(self.buf[pos:end])
+                pos = self.ws(end)
+                if self.char(pos) != b":":
+                    raise ValueError(f"expected ':' at {pos}")
+                pos = self.ws(pos + 1)
+            pos = self.ws(visit(key, pos))
+            c = self.char(pos)
+            if c == close:
+                return pos + 1
+            if c != b",":
+                raise ValueError(f"expected ',' at {pos}")
+            pos = self.ws(pos + 1)
+
+def _string_preview(buf: Any, start: int, end: int, max_bytes: int) -> str:
+    """Decode the head of the JSON string at [start, end) without reading the rest."""
+    body_end = end - 1
+    stop = min(body_end, start + 1 + max_bytes)
+    raw = bytes(buf[start + 1:stop])
+    if stop < body_end:
+        cut = raw.rfind(b"\\", max(0, len(raw) - 6))
+        if cut != -1:
+            raw = raw[:cut]  # drop a possibly truncated escape
+    try:
+        return json.loads(b'"' + raw + b'"')
+    except ValueError:
+        return raw.decode("utf-8", errors="replace")
+
+def _summarise_result(sc: _Scanner, start: int) -> Tuple[JSON, int]:
+    summary: JSON = {}
+    other: Dict[str, int] = {}
+    types: Dict[str, int] = {}
+    item_type = ["?"]  # type of the content item being walked
+
+    def item_member(key: Optional[str], pos: int) -> int:
+        if key == "type":
+            value, end = sc.parse(pos)
+            item_type[0] = str(value)
+            return end
+        end = sc.skip(pos)
+        if key == "text" and "preview" not in summary and sc.char(pos) == b'"':
+            summary["preview"] = _string_preview(sc.buf, pos, end, PREVIEW_BYTES)
+        return end
+
+    def content_item(_key: Optional[str], pos: int) -> int:
+        item_type[0] = "?"
+        end = sc.walk(pos, item_member) if sc.char(pos) == b"{" else sc.skip(pos)
+        types[item_type[0]] = types.get(item_type[0], 0) + 1
+        return end
+
+    def result_member(key: Optional[str], pos: int) -> int:
+        if key == "isError":
+            summary["isError"], end = sc.parse(pos)
+        elif key == "content" and sc.char(pos) == b"[":
+            end = sc.walk(pos, content_item)
+            summary["content"] = {"items": sum(types.values()), "types": types, "bytes": end - pos}
+        else:
+            end = sc.skip(pos)
+            other[str(key)] = end - pos
+        return end
+
+    end = sc.walk(start, result_member) if sc.char(start) == b"{" else sc.skip(start)
+    if other:
+        summary["other_bytes"] = other
+    return summary, end
+
+def envelope_message(path: Path) -> JSON:
+    """Response dict for a spooled line: envelope fields parsed, result summarised."""
+    size = path.stat().st_size
+    if size == 0:
+        raise ValueError("empty spool file")
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        sc = _Scanner(buf)
+        msg: JSON = {}
+
+        def member(key: Optional[str], pos: int) -> int:
+            if key in ("jsonrpc", "id", "method"):
+                msg[key], end = sc.parse(pos)
+            elif key == "error":
+                msg["error"], end = sc.parse(pos)
+                if msg["error"] is None:
+                    msg["error"] = {"code": -32603, "message": f"error payload of {end - pos} bytes (see {path})"}
+            elif key == "result":
+                summary, end = _summarise_result(sc, pos)
+                msg["result"] = {SPOOL_KEY: {"path": str(path), "bytes": size, **summary}}
+            else:
+                end = sc.skip(pos)
+            return end
+
+        pos = sc.ws(0)
+        if sc.char(pos) != b"{":
+            raise ValueError("spooled line is not a JSON object")
+        sc.walk(pos, member)
+    return msg
+
+def spooled(resp: Any) -> Optional[JSON]:
+    """The spool summary if this response's result was spooled, else None."""
+    if isinstance(resp, dict) and isinstance(resp.get("result"), dict):
+        info = resp["result"].get(SPOOL_KEY)
+        return info if isinstance(info, dict) else None
+    return None
+
+def claim_spool(resp: JSON, dest: Path) -> Path:
+    """Move a spooled response's raw file to `dest` and point the summary at it."""
+    info = spooled(resp)
+    if info is None:
+        raise ValueError("response was not spooled")
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(info["path"], dest)  # the pool daemon may spool on another filesystem
+    info["path"] = str(dest)
+    return dest
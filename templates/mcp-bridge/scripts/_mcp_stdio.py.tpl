@@ -4,31 +4,73 @@ Implements:
 - initialize
 - notifications/initialized
 - tools/list
-- tools/call
+- tools/call (one at a time, or many in flight over one session)
 - ping response (if server pings us)
 
 Notes:
 - stdio transport messages are newline-delimited JSON, with NO embedded newlines.
 - server must not write non-JSON to stdout (stderr is for logs).
+- every request gets its own future keyed by id, so requests can be pipelined;
+  a response that arrives after its request timed out is dropped.
+- with spool_threshold set, response lines longer than that are streamed to a
+  file under spool_dir and only their envelope is parsed (see _mcp_spool.py).
+- AsyncMcpStdioClient is the same client for asyncio callers. Lines over its
+  stream limit (spool_threshold, or ASYNC_LINE_LIMIT) are spooled the same way;
+  without spool_threshold the matching request fails instead of receiving them.
 
 This is a pragmatic bridge template, not a full client framework.
 """
 from __future__ import annotations
 
+import asyncio
+import heapq
 import json
 import shlex
 import subprocess
+import tempfile
 import threading
 import time
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from _mcp_spool import envelope_message, new_spool_path, spool_line
 
 JSON = Dict[str, Any]
+ToolCall = Tuple[str, JSON]
+
+# Big enough for large tool results on one line (asyncio's default is 64 KiB).
+ASYNC_LINE_LIMIT = 64 * 1024 * 1024
 
 def _dumps(msg: JSON) -> str:
     # No embedded newlines. Compact separators.
     return json.dumps(msg, ensure_ascii=False, separators=(",", ":"))
 
+def _is_response(msg: JSON) -> bool:
+    return "id" in msg and ("result" in msg or "error" in msg) and "method" not in msg
+
+def _server_request_reply(msg: JSON) -> Optional[JSON]:
+    """Reply to a server->client request (has method + id); None for notifications."""
+    if "method" not in msg or "id" not in msg:
+        return None
+    method = msg.get("method")
+    if method == "ping":
+        return {"jsonrpc": "2.0", "id": msg["id"], "result": {}}
+    # Unsupported server request: reply with method not found
+    return {
+        "jsonrpc": "2.0",
+        "id": msg["id"],
+        "error": {"code": -32601, "message": f"Method not supported by bridge: {method}"},
+    }
+
+def _init_params(client_name: str, client_version: str, protocol_version: str) -> JSON:
+    return {
+        "protocolVersion": protocol_version,
+        "capabilities": {},
+        "clientInfo": {"name": client_name, "version": client_version},
+    }
+
 @dataclass
 class McpInitResult:
     protocolVersion: str
@@ -36,18 +78,36 @@ class McpInitResult:
     serverInfo: Dict[str, Any]
     instructions: Optional[str] = None
 
+    @classmethod
+    def from_response(cls, resp: JSON) -> "McpInitResult":
+        if "error" in resp:
+            raise RuntimeError(resp["error"])
+        result = resp.get("result") or {}
+        return cls(
+            protocolVersion=result.get("protocolVersion", ""),
+            capabilities=result.get("capabilities", {}),
+            serverInfo=result.get("serverInfo", {}),
+            instructions=result.get("instructions"),
+        )
+
 class McpStdioClient:
-    def __init__(self, command: str, *, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None, timeout_s: float = 60.0):
+    def __init__(self, command: str, *, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None, timeout_s: float = 60.0,
+                 spool_threshold: Optional[int] = None, spool_dir: Optional[Path] = None):
         self.command = command
         self.cwd = cwd
         self.env = env
         self.timeout_s = timeout_s
+        self.spool_threshold = spool_threshold
+        self.spool_dir = spool_dir or Path("workspace")
 
-        self._proc: Optional[subprocess.Popen[str]] = None
+        self._proc: Optional[subprocess.Popen[bytes]] = None
         self._id = 0
         self._lock = threading.Lock()
         self._cv = threading.Condition(self._lock)
-        self._responses: Dict[str, JSON] = {}
+        self._write_lock = threading.Lock()
+        # In-flight requests by id, plus a deadline heap the reaper thread expires them from.
+        self._pending: Dict[str, Future] = {}
+        self._deadlines: List[Tuple[float, str]] = []
         self._closed = False
 
     def start(self) -> None:
@@ -59,29 +119,54 @@ class McpStdioClient:
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
             cwd=self.cwd,
             env=self.env,
-            bufsize=1,
         )
         assert self._proc.stdout and self._proc.stdin
 
         threading.Thread(target=self._reader_stdout, daemon=True).start()
         threading.Thread(target=self._reader_stderr, daemon=True).start()
+        threading.Thread(target=self._reaper, daemon=True).start()
 
     def _reader_stdout(self) -> None:
         assert self._proc and self._proc.stdout
-        for line in self._proc.stdout:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                msg = json.loads(line)
-            except Exception:
-                # Protocol violation: ignore
-                continue
-            self._handle_message(msg)
+        stdout = self._proc.stdout
+        limit = self.spool_threshold or -1
+        try:
+            while True:
+                line = stdout.readline(limit)
+                if not line:
+                    break
+                if limit > 0 and len(line) >= limit and not line.endswith(b"\n"):
+                    self._handle_spooled(line)
+                    continue
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    msg = json.loads(line)
+                except Exception:
+                    # Protocol violation: ignore
+                    continue
+                self._handle_message(msg)
+        except Exception as e:
+            # Spooling (disk full), a reply to a server request or a done callback
+            # failed. Nothing reads stdout any more, so fail every request now
+            # and close the session instead of leaving them to their timeouts.
+            self._fail_pending(ConnectionError(f"MCP stdout reader failed: {type(e).__name__}: {e}"))
+            self.close()
+            return
+        self._fail_pending(ConnectionError("MCP server closed stdout"))
+
+    def _handle_spooled(self, head: bytes) -> None:
+        assert self._proc and self._proc.stdout
+        path = spool_line(head, self._proc.stdout, self.spool_dir)
+        try:
+            msg = envelope_message(path)
+        except (ValueError, OSError):
+            msg = None  # Protocol violation: ignore
+        if msg is None or not self._handle_message(msg):
+            path.unlink()
 
     def _reader_stderr(self) -> None:
         assert self._proc and self._proc.stderr
@@ -90,49 +175,89 @@ class McpStdioClient:
             # You can route this to a log file if you want.
             pass
 
-    def _handle_message(self, msg: JSON) -> None:
-        # Response
-        if "id" in msg and ("result" in msg or "error" in msg) and "method" not in msg:
+    def _reaper(self) -> None:
+        """Fail requests whose deadline passed; sleeps until the next deadline.
+
+        Expired futures are taken out under the lock but failed after releasing it:
+        done callbacks (e.g. the pool's socket reply, or one that sends another
+        request) must not run while the session lock is held.
+        """
+        while True:
+            expired: List[Tuple[str, Future]] = []
             with self._cv:
-                self._responses[str(msg["id"])] = msg
-                self._cv.notify_all()
-            return
+                if self._closed:
+                    return
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, req_id = heapq.heappop(self._deadlines)
+                    fut = self._pending.pop(req_id, None)
+                    if fut is not None:
+                        expired.append((req_id, fut))
+                if not expired:
+                    self._cv.wait(timeout=self._deadlines[0][0] - now if self._deadlines else None)
+            for req_id, fut in expired:
+                fut.set_exception(TimeoutError(f"Timed out waiting for response id={req_id}"))
 
-        # Server request (has method + id)
-        if "method" in msg and "id" in msg:
-            method = msg.get("method")
-            req_id = msg.get("id")
-            if method == "ping":
-                self._send({"jsonrpc": "2.0", "id": req_id, "result": {}})
-                return
-            # Unsupported server request: reply with method not found
-            self._send({
-                "jsonrpc": "2.0",
-                "id": req_id,
-                "error": {"code": -32601, "message": f"Method not supported by bridge: {method}"},
-            })
-            return
+    def _fail_pending(self, exc: BaseException) -> None:
+        # Same rule as the reaper: fail outside the lock.
+        with self._cv:
+            pending, self._pending = self._pending, {}
+            self._deadlines.clear()
+        for fut in pending.values():
+            fut.set_exception(exc)
+
+    def _handle_message(self, msg: JSON) -> bool:
+        """Dispatch one message; True if it completed a pending request."""
+        if _is_response(msg):
+            with self._cv:
+                fut = self._pending.pop(str(msg["id"]), None)
+            # Late (already timed out) or unknown ids are dropped.
+            if fut is None:
+                return False
+            fut.set_result(msg)
+            return True
 
+        reply = _server_request_reply(msg)
+        if reply is not None:
+            self._send(reply)
         # Notification (method without id): ignore by default
-        return
+        return False
 
     def _send(self, msg: JSON) -> None:
         if self._closed:
             return
         assert self._proc and self._proc.stdin
-        payload = _dumps(msg) + "\n"
-        self._proc.stdin.write(payload)
-        self._proc.stdin.flush()
+        payload = (_dumps(msg) + "\n").encode("utf-8")
+        with self._write_lock:
+            self._proc.stdin.write(payload)
+            self._proc.stdin.flush()
 
-    def request(self, method: str, params: Optional[JSON] = None) -> JSON:
-        with self._lock:
+    def request_future(self, method: str, params: Optional[JSON] = None, *, timeout_s: Optional[float] = None) -> "Future[JSON]":
+        """Send a request without waiting; the future fails with TimeoutError after timeout_s."""
+        fut: "Future[JSON]" = Future()
+        deadline = time.monotonic() + (self.timeout_s if timeout_s is None else timeout_s)
+        with self._cv:
+            if self._closed:
+                raise ConnectionError("client is closed")
             self._id += 1
             req_id = str(self._id)
+            self._pending[req_id] = fut
+            heapq.heappush(self._deadlines, (deadline, req_id))
+            self._cv.notify_all()
         req: JSON = {"jsonrpc": "2.0", "id": req_id, "method": method}
         if params is not None:
             req["params"] = params
-        self._send(req)
-        return self._wait_response(req_id)
+        try:
+            self._send(req)
+        except Exception as e:
+            with self._cv:
+                owned = self._pending.pop(req_id, None) is not None
+            if owned:
+                fut.set_exception(e)
+        return fut
+
+    def request(self, method: str, params: Optional[JSON] = None) -> JSON:
+        return self.request_future(method, params).result()
 
     def notify(self, method: str, params: Optional[JSON] = None) -> None:
         msg: JSON = {"jsonrpc": "2.0", "method": method}
@@ -140,33 +265,11 @@ class McpStdioClient:
             msg["params"] = params
         self._send(msg)
 
-    def _wait_response(self, req_id: str) -> JSON:
-        deadline = time.time() + self.timeout_s
-        with self._cv:
-            while req_id not in self._responses:
-                remaining = deadline - time.time()
-                if remaining <= 0:
-                    raise TimeoutError(f"Timed out waiting for response id={req_id}")
-                self._cv.wait(timeout=min(remaining, 0.25))
-            return self._responses.pop(req_id)
-
     def initialize(self, *, client_name: str = "skill-forge-bridge", client_version: str = "0.1.0", protocol_version: str = "2025-06-18") -> McpInitResult:
         self.start()
-        resp = self.request("initialize", {
-            "protocolVersion": protocol_version,
-            "capabilities": {},
-            "clientInfo": {"name": client_name, "version": client_version},
-        })
-        if "error" in resp:
-            raise RuntimeError(resp["error"])
-        result = resp.get("result") or {}
+        init = McpInitResult.from_response(self.request("initialize", _init_params(client_name, client_version, protocol_version)))
         self.notify("notifications/initialized")
-        return McpInitResult(
-            protocolVersion=result.get("protocolVersion", ""),
-            capabilities=result.get("capabilities", {}),
-            serverInfo=result.get("serverInfo", {}),
-            instructions=result.get("instructions"),
-        )
+        return init
 
     def list_tools(self) -> JSON:
         return self.request("tools/list")
@@ -174,10 +277,33 @@ class McpStdioClient:
     def call_tool(self, name: str, arguments: JSON) -> JSON:
         return self.request("tools/call", {"name": name, "arguments": arguments})
 
+    def call_tools_concurrently(self, calls: Iterable[ToolCall], *, max_in_flight: int = 8) -> List[Union[JSON, BaseException]]:
+        """Pipeline many tools/call requests over this session.
+
+        At most `max_in_flight` requests are outstanding at once. Results come back
+        in input order; a call that timed out or lost its transport is returned as
+        the exception instead of raising, so one failure does not hide the rest.
+        """
+        slots = threading.BoundedSemaphore(max(1, max_in_flight))
+        futures: List["Future[JSON]"] = []
+        for name, arguments in calls:
+            slots.acquire()
+            fut = self.request_future("tools/call", {"name": name, "arguments": arguments})
+            fut.add_done_callback(lambda _f: slots.release())
+            futures.append(fut)
+        results: List[Union[JSON, BaseException]] = []
+        for fut in futures:
+            exc = fut.exception()
+            results.append(exc if exc is not None else fut.result())
+        return results
+
     def close(self) -> None:
         if self._closed:
             return
-        self._closed = True
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+        self._fail_pending(ConnectionError("client closed"))
         if not self._proc:
             return
         try:
@@ -189,4 +315,199 @@ class McpStdioClient:
             self._proc.terminate()
         except Exception:
             pass
-"""
\ No newline at end of file
+
+class AsyncMcpStdioClient:
+    """asyncio variant of McpStdioClient with the same request/response semantics."""
+
+    def __init__(self, command: str, *, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None, timeout_s: float = 60.0,
+                 spool_threshold: Optional[int] = None, spool_dir: Optional[Path] = None):
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.timeout_s = timeout_s
+        self.spool_threshold = spool_threshold
+        self.spool_dir = spool_dir or Path("workspace")
+
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._id = 0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._closed = False
+
+    async def start(self) -> None:
+        if self._proc is not None:
+            return
+        args = shlex.split(self.command)
+        self._proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            env=self.env,
+            limit=self.spool_threshold or ASYNC_LINE_LIMIT,
+        )
+        self._tasks = [asyncio.create_task(self._reader_stdout()), asyncio.create_task(self._reader_stderr())]
+
+    async def _reader_stdout(self) -> None:
+        try:
+            while True:
+                line = await self._next_line()
+                if line is None:
+                    break
+                if isinstance(line, Path):
+                    await self._handle_spooled(line)
+                    continue
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    msg = json.loads(line)
+                except Exception:
+                    # Protocol violation: ignore
+                    continue
+                await self._handle_message(msg)
+        except Exception as e:
+            # A dead reader would leave every request waiting for its timeout.
+            self._fail_pending(ConnectionError(f"MCP stdout reader failed: {type(e).__name__}: {e}"))
+            return
+        self._fail_pending(ConnectionError("MCP server closed stdout"))
+
+    async def _next_line(self) -> Union[bytes, Path, None]:
+        """Next stdout line; a spool file for lines over the stream limit; None at EOF."""
+        assert self._proc and self._proc.stdout
+        stdout = self._proc.stdout
+        try:
+            return await stdout.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial or None
+        except asyncio.LimitOverrunError:
+            pass  # the line is still buffered; stream it out below
+        # With spooling off the file is only read for its id, then deleted.
+        path = new_spool_path(self.spool_dir if self.spool_threshold else Path(tempfile.gettempdir()))
+        with path.open("wb") as f:
+            while True:
+                try:
+                    chunk = await stdout.readuntil(b"\n")
+                except asyncio.LimitOverrunError as e:
+                    f.write(await stdout.readexactly(e.consumed))
+                    continue
+                except asyncio.IncompleteReadError as e:
+                    f.write(e.partial)
+                    break
+                f.write(chunk.rstrip(b"\r\n"))
+                break
+        return path
+
+    async def _handle_spooled(self, path: Path) -> None:
+        try:
+            msg = envelope_message(path)
+        except (ValueError, OSError):
+            msg = None  # Protocol violation: ignore
+        if msg is not None and self.spool_threshold is None and _is_response(msg):
+            # Spooling is off: fail the request rather than hand back a file it did not ask for.
+            fut = self._pending.pop(str(msg["id"]), None)
+            if fut is not None and not fut.done():
+                fut.set_exception(ValueError(f"response id={msg['id']} is {path.stat().st_size} bytes, over the "
+                                             f"{ASYNC_LINE_LIMIT}-byte line limit; set spool_threshold to receive it"))
+            msg = None
+        if msg is None or not await self._handle_message(msg):
+            path.unlink()
+
+    async def _reader_stderr(self) -> None:
+        assert self._proc and self._proc.stderr
+        while await self._proc.stderr.readline():
+            pass
+
+    def _fail_pending(self, exc: BaseException) -> None:
+        pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    async def _handle_message(self, msg: JSON) -> bool:
+        """Dispatch one message; True if it completed a pending request."""
+        if _is_response(msg):
+            fut = self._pending.pop(str(msg["id"]), None)
+            # Late (already timed out) or unknown ids are dropped.
+            if fut is None or fut.done():
+                return False
+            fut.set_result(msg)
+            return True
+        reply = _server_request_reply(msg)
+        if reply is not None:
+            await self._send(reply)
+        return False
+
+    async def _send(self, msg: JSON) -> None:
+        if self._closed:
+            return
+        assert self._proc and self._proc.stdin
+        self._proc.stdin.write((_dumps(msg) + "\n").encode("utf-8"))
+        await self._proc.stdin.drain()
+
+    async def request(self, method: str, params: Optional[JSON] = None, *, timeout_s: Optional[float] = None) -> JSON:
+        if self._closed:
+            raise ConnectionError("client is closed")
+        self._id += 1
+        req_id = str(self._id)
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = fut
+        req: JSON = {"jsonrpc": "2.0", "id": req_id, "method": method}
+        if params is not None:
+            req["params"] = params
+        try:
+            await self._send(req)
+            return await asyncio.wait_for(fut, self.timeout_s if timeout_s is None else timeout_s)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Timed out waiting for response id={req_id}") from None
+        finally:
+            self._pending.pop(req_id, None)
+
+    async def notify(self, method: str, params: Optional[JSON] = None) -> None:
+        msg: JSON = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            msg["params"] = params
+        await self._send(msg)
+
+    async def initialize(self, *, client_name: str = "skill-forge-bridge", client_version: str = "0.1.0", protocol_version: str = "2025-06-18") -> McpInitResult:
+        await self.start()
+        init = McpInitResult.from_response(await self.request("initialize", _init_params(client_name, client_version, protocol_version)))
+        await self.notify("notifications/initialized")
+        return init
+
+    async def list_tools(self) -> JSON:
+        return await self.request("tools/list")
+
+    async def call_tool(self, name: str, arguments: JSON) -> JSON:
+        return await self.request("tools/call", {"name": name, "arguments": arguments})
+
+    async def call_tools_concurrently(self, calls: Iterable[ToolCall], *, max_in_flight: int = 8) -> List[Union[JSON, BaseException]]:
+        """Same contract as McpStdioClient.call_tools_concurrently."""
+        slots = asyncio.Semaphore(max(1, max_in_flight))
+
+        async def one(name: str, arguments: JSON) -> JSON:
+            async with slots:
+                return await self.call_tool(name, arguments)
+
+        return list(await asyncio.gather(*(one(n, a) for n, a in calls), return_exceptions=True))
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._fail_pending(ConnectionError("client closed"))
+        if not self._proc:
+            return
+        try:
+            if self._proc.stdin:
+                self._proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            self._proc.terminate()
+        except ProcessLookupError:
+            pass
+        await self._proc.wait()
+        for task in self._tasks:
+            task.cancel()
@@ -7,63 +7,262 @@ Use when you MUST use an MCP server (auth/network boundary), but still want:
 - minimal context flooding
 
 This script:
-- spawns an MCP server via stdio
+- uses a warm session from the MCP pool daemon if one is running
+  (scripts/_mcp_pool.py serve), otherwise spawns the MCP server via stdio
 - initializes session
-- calls a tool with JSON args
-- saves the raw result to workspace/
+- calls a tool with JSON args, or streams a --batch of calls through the session
+- saves the raw result(s) to workspace/; results over --spool-mb are streamed
+  to disk as they arrive and never held in memory whole
 """
 from __future__ import annotations
 
 import argparse
 import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from _fs import write_json, safe_preview_json
-from _mcp_stdio import McpStdioClient
+from _fs import NdjsonWriter, ensure_workspace, write_json, safe_preview_json, safe_preview_text
+from _mcp_pool import AnyClient, open_client
+from _mcp_spool import claim_spool, spooled
+
+# JSON-RPC errors worth retrying (generic server / internal error); timeouts are retried too.
+TRANSIENT_RPC_CODES = {-32000, -32603}
+MAX_ERROR_SAMPLES = 5
+MiB = 1024 * 1024
+
+def iter_batch(path: Path, default_tool: Optional[str]) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, call dict or error string) without loading the whole file."""
+    with path.open(encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            try:
+                call = json.loads(line)
+            except ValueError as e:
+                yield lineno, f"invalid JSON: {e}"
+                continue
+            if not isinstance(call, dict):
+                yield lineno, "line must be a JSON object"
+                continue
+            call.setdefault("tool", default_tool)
+            if not call["tool"]:
+                yield lineno, "no tool (set \"tool\" or pass --tool)"
+                continue
+            if not isinstance(call.setdefault("args", {}), dict):
+                yield lineno, "args must be a JSON object"
+                continue
+            yield lineno, call
+
+def _is_transient(resp_or_exc: Any) -> bool:
+    if isinstance(resp_or_exc, TimeoutError):
+        return True
+    if isinstance(resp_or_exc, dict):
+        return (resp_or_exc.get("error") or {}).get("code") in TRANSIENT_RPC_CODES
+    return False
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))  # nearest rank
+    return sorted_values[rank - 1]
+
+@dataclass
+class BatchStats:
+    total: int = 0
+    ok: int = 0
+    failed: int = 0
+    retries: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+        return {
+            "total": self.total,
+            "ok": self.ok,
+            "failed": self.failed,
+            "error_rate": round(self.failed / self.total, 4) if self.total else 0.0,
+            "retries": self.retries,
+            "p50_ms": round(_percentile(lat, 50), 1),
+            "p95_ms": round(_percentile(lat, 95), 1),
+        }
+
+def call_with_retry(client: AnyClient, tool: str, arguments: Dict[str, Any], retries: int) -> Tuple[Any, int]:
+    """Returns (response dict or exception, attempts used)."""
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            outcome: Any = client.call_tool(tool, arguments)
+        except Exception as e:
+            outcome = e
+        if attempt > retries or not _is_transient(outcome):
+            return outcome, attempt
+        time.sleep(min(8.0, 0.5 * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0))
+
+def run_batch(client: AnyClient, batch: Path, out: Path, *, default_tool: Optional[str], concurrency: int, retries: int) -> BatchStats:
+    """Stream calls through one session, writing one NDJSON record per call as it completes.
+
+    The artifact is renamed into place when the batch finishes, so it is never seen half-written.
+    """
+    stats = BatchStats()
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(max(1, concurrency))
+
+    with NdjsonWriter(out) as sink, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+
+        def count_failure(lineno: int, error: Any) -> None:
+            # Caller holds lock.
+            stats.failed += 1
+            if len(stats.errors) < MAX_ERROR_SAMPLES:
+                stats.errors.append(f"line {lineno}: {safe_preview_text(str(error), max_bytes=160)}")
+
+        def record(entry: Dict[str, Any], latency_ms: Optional[float], attempts: int) -> None:
+            with lock:
+                sink.write(entry)
+                stats.total += 1
+                stats.retries += max(0, attempts - 1)
+                if latency_ms is not None:
+                    stats.latencies_ms.append(latency_ms)
+                if entry["ok"]:
+                    stats.ok += 1
+                else:
+                    count_failure(entry["line"], entry.get("error"))
+
+        def one(lineno: int, call: Dict[str, Any]) -> None:
+            t0 = time.perf_counter()
+            attempts = 0
+            latency_ms: Optional[float] = None
+            entry: Dict[str, Any] = {"line": lineno, "id": call.get("id"), "tool": call["tool"]}
+            try:
+                outcome, attempts = call_with_retry(client, call["tool"], call["args"], retries)
+                latency_ms = (time.perf_counter() - t0) * 1000.0
+                entry.update(attempts=attempts, latency_ms=round(latency_ms, 1))
+                if isinstance(outcome, Exception):
+                    entry.update(ok=False, error=f"{type(outcome).__name__}: {outcome}")
+                elif "error" in outcome:
+                    entry.update(ok=False, error=outcome["error"])
+                else:
+                    info = spooled(outcome)
+                    if info is not None:
+                        claim_spool(outcome, out.with_name(f"{out.stem}_line{lineno}.json"))
+                    result = outcome.get("result", {})
+                    flags = info if info is not None else result
+                    entry.update(ok=not (isinstance(flags, dict) and flags.get("isError")), result=result)
+                    if not entry["ok"]:
+                        entry["error"] = "tool reported isError"
+            except Exception as e:
+                # E.g. claim_spool() hit a full disk or the response had an unexpected shape:
+                # still one failed record for this line, never a silently missing one.
+                entry.update(attempts=attempts, ok=False, error=f"{type(e).__name__}: {e}")
+                entry.pop("result", None)
+            record(entry, latency_ms, attempts)
+
+        def release(f: Any, lineno: int) -> None:
+            slots.release()
+            exc = f.exception()
+            if exc is not None:
+                # record() itself failed (the artifact could not be written): count it anyway.
+                with lock:
+                    stats.total += 1
+                    count_failure(lineno, f"{type(exc).__name__}: {exc}")
+
+        for lineno, call in iter_batch(batch, default_tool):
+            if isinstance(call, str):
+                record({"line": lineno, "ok": False, "error": call}, None, 1)
+                continue
+            slots.acquire()  # bounds in-flight calls and how much of the batch file is buffered
+            pool.submit(one, lineno, call).add_done_callback(lambda f, lineno=lineno: release(f, lineno))
+    return stats
 
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--server", required=True, help="Server command, e.g. 'uvx some-mcp-server@latest' or 'node server.js'")
-    ap.add_argument("--tool", required=True, help="Tool name to call (after discovery)")
+    ap.add_argument("--tool", help="Tool name to call (after discovery); default tool for --batch lines")
     ap.add_argument("--args", default="{}", help="JSON string of tool arguments")
     ap.add_argument("--list-tools", action="store_true", help="List tools and exit")
+    ap.add_argument("--batch", help='JSONL file of calls: {"tool": "...", "args": {...}, "id": optional}')
+    ap.add_argument("--concurrency", type=int, default=8, help="Batch calls in flight at once (default: 8)")
+    ap.add_argument("--retries", type=int, default=2, help="Retries per batch call on timeouts/transient errors (default: 2)")
+    ap.add_argument("--no-pool", action="store_true", help="Always spawn the server, even if the MCP pool daemon is running")
+    ap.add_argument("--spool-mb", type=float, default=8.0, help="Stream results larger than this straight to workspace/; 0 disables (default: 8)")
     args = ap.parse_args()
 
-    client = McpStdioClient(args.server)
+    if not (args.tool or args.list_tools or args.batch):
+        raise SystemExit("Provide --tool, --batch or --list-tools")
+    batch = Path(args.batch) if args.batch else None
+    if batch is not None and not batch.exists():
+        raise SystemExit(f"Batch file not found: {batch}")
 
-    init = client.initialize(client_name="{{SKILL_NAME}}-bridge", client_version="0.1.0")
+    client, init = open_client(args.server, client_name="{{SKILL_NAME}}-bridge", use_pool=not args.no_pool,
+                               spool_threshold=int(args.spool_mb * MiB) or None)
     # Optional: print server identity (small)
     print(f"Connected to server: {init.serverInfo.get('name','?')} protocol={init.protocolVersion}")
 
-    if args.list_tools:
-        tools = client.list_tools()
-        path = write_json("tools_list.json", tools)
-        print(f"✅ Saved tools list: {path}")
-        print("Preview (capped):")
-        # tools response can be large; preview only
-        print(safe_preview_json(tools.get("result", {}), max_bytes=512))
-        client.close()
-        return
-
     try:
-        tool_args = json.loads(args.args)
-        if not isinstance(tool_args, dict):
-            raise ValueError("args must be a JSON object")
-    except Exception as e:
-        raise SystemExit(f"Invalid --args JSON: {e}")
+        if args.list_tools:
+            tools = client.list_tools()
+            path = write_json("tools_list.json", tools)
+            print(f"✅ Saved tools list: {path}")
+            print("Preview (capped):")
+            # tools response can be large; preview only
+            print(safe_preview_json(tools.get("result", {}), max_bytes=512))
+            return
 
-    result = client.call_tool(args.tool, tool_args)
+        ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
 
-    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    out = write_json(f"{{SKILL_NAME}}_{args.tool}_{ts}.json", result)
+        if batch is not None:
+            out = ensure_workspace() / f"{{SKILL_NAME}}_batch_{ts}.ndjson"
+            t0 = time.perf_counter()
+            stats = run_batch(client, batch, out, default_tool=args.tool, concurrency=args.concurrency, retries=args.retries)
+            summary = stats.summary()
+            summary["wall_s"] = round(time.perf_counter() - t0, 2)
+            print(f"✅ Saved {stats.total} result(s): {out}")
+            print("Summary: " + json.dumps(summary))
+            for err in stats.errors:
+                print(f"  ✗ {err}")
+            if stats.failed > len(stats.errors):
+                print(f"  … {stats.failed - len(stats.errors)} more failure(s) in {out.name}")
+            return
 
-    print(f"✅ Saved tool result: {out}")
-    print("Preview (capped):")
-    # Tool result content can be huge; show tiny preview
-    preview = result.get("result", {})
-    print(safe_preview_json(preview, max_bytes=512))
+        try:
+            tool_args = json.loads(args.args)
+            if not isinstance(tool_args, dict):
+                raise ValueError("args must be a JSON object")
+        except Exception as e:
+            raise SystemExit(f"Invalid --args JSON: {e}")
 
-    client.close()
+        result = client.call_tool(args.tool, tool_args)
+
+        artifact = f"{{SKILL_NAME}}_{args.tool}_{ts}.json"
+        info = spooled(result)
+        if info is not None:
+            # Raw response line, already on disk; preview comes from the spool summary.
+            out = claim_spool(result, ensure_workspace() / artifact)
+            print(f"✅ Saved tool result ({info['bytes']} bytes, spooled): {out}")
+            if "error" in result:
+                print(f"Error: {safe_preview_json(result['error'], max_bytes=512)}")
+            print(f"Content: {json.dumps(info.get('content', {}))}")
+            print("Preview (capped):")
+            print(safe_preview_text(info.get("preview", ""), max_bytes=512))
+            return
+
+        out = write_json(artifact, result)
+
+        print(f"✅ Saved tool result: {out}")
+        print("Preview (capped):")
+        # Tool result content can be huge; show tiny preview
+        preview = result.get("result", {})
+        print(safe_preview_json(preview, max_bytes=512))
+    finally:
+        client.close()
 
 if __name__ == "__main__":
     main()